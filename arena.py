@@ -0,0 +1,188 @@
+"""Headless self-play arena.
+
+Plays N games between two engines without a display, spread over worker
+processes, and reports results, per-move latency percentiles and games/sec:
+
+    python arena.py alphabeta:4 random --games 200 --workers 4
+    python arena.py minimax:3 expecti:3 --games 50 --opening-plies 2 --json results.json
+    python arena.py alphabeta:4 alphabeta:6 --book opening_book.bin
+    python arena.py alphabeta:3 random --rows 10 --columns 12 --connect 5
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import AI_PIECE, PLAYER_PIECE, STANDARD, Position, get_geometry
+from book import OpeningBook
+from utils import expecti_minimax, minimax, minimax_alpha_beta
+
+
+def swap_pieces(board_str):
+    """Swap the two players' pieces, so any side can be searched as the AI."""
+    return board_str.translate(str.maketrans({str(PLAYER_PIECE): str(AI_PIECE), str(AI_PIECE): str(PLAYER_PIECE)}))
+
+
+_book = None  # OpeningBook consulted by the alpha-beta engine, opened per process
+
+
+def _open_book(path):
+    global _book
+    _book = OpeningBook(path) if path is not None else None
+
+
+# Engines choose a move for AI_PIECE on a board string of the given geometry;
+# the arena swaps colours for the side playing PLAYER_PIECE.
+def _random_engine(board_str, depth, rng, geometry):
+    return rng.choice(Position.from_string(board_str, geometry).valid_moves())
+
+def _minimax_engine(board_str, depth, rng, geometry):
+    return minimax(board_str, depth, True, geometry=geometry)[0]
+
+def _alpha_beta_engine(board_str, depth, rng, geometry):
+    if _book is not None and geometry is STANDARD:  # Books cover the standard board only
+        entry = _book.lookup(board_str)
+        if entry is not None:
+            return entry[0]
+    return minimax_alpha_beta(board_str, depth, -math.inf, math.inf, True, geometry=geometry)[0]
+
+def _expecti_engine(board_str, depth, rng, geometry):
+    return expecti_minimax(board_str, depth, -math.inf, math.inf, True, geometry=geometry)[0]
+
+ENGINES = {
+    "random": _random_engine,
+    "minimax": _minimax_engine,
+    "alphabeta": _alpha_beta_engine,
+    "expecti": _expecti_engine,
+}
+
+
+def parse_engine(spec):
+    """Parse ``name[:depth]`` into ``(name, depth)``."""
+    name, _, depth = spec.partition(":")
+    if name not in ENGINES:
+        raise argparse.ArgumentTypeError(f"unknown engine {name!r}; choose from {', '.join(ENGINES)}")
+    return name, int(depth) if depth else 4
+
+
+def play_game(engines, first, seed, opening_plies=0, geometry=None):
+    """Play one game on a board of ``geometry`` (STANDARD by default);
+    ``engines[first]`` moves first.
+
+    Returns a dict with the connected-four count of each engine, the winner
+    (0, 1 or None for a draw) and each engine's move latencies in seconds.
+    """
+    rng = random.Random(seed)
+    geometry = geometry if geometry is not None else STANDARD
+    position = Position(geometry)
+    pieces = {first: PLAYER_PIECE, 1 - first: AI_PIECE}  # PLAYER_PIECE always moves first
+    latencies = ([], [])
+    side = first
+    while not position.is_full():
+        if position.count < opening_plies:
+            col = rng.choice(position.valid_moves())
+        else:
+            name, depth = engines[side]
+            board_str = position.to_string()
+            if pieces[side] == PLAYER_PIECE:
+                board_str = swap_pieces(board_str)
+            start = time.perf_counter()
+            col = ENGINES[name](board_str, depth, rng, geometry)
+            latencies[side].append(time.perf_counter() - start)
+        position.play(col, pieces[side])
+        side = 1 - side
+
+    fours = [position.count_fours(pieces[0]), position.count_fours(pieces[1])]
+    winner = None if fours[0] == fours[1] else (0 if fours[0] > fours[1] else 1)
+    return {"fours": fours, "winner": winner, "latencies": latencies}
+
+
+def _play_game_task(args):
+    return play_game(*args)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def run_match(engines, games, workers=1, opening_plies=0, seed=0, book_path=None, geometry=None):
+    """Play ``games`` games, alternating who moves first, and summarise them.
+
+    With ``book_path`` the alpha-beta engines play from that opening book.
+    Games are played on boards of ``geometry``, the standard board by default.
+    """
+    tasks = [(engines, i % 2, seed + i, opening_plies, geometry) for i in range(games)]
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_open_book, initargs=(book_path,)) as executor:
+            results = list(executor.map(_play_game_task, tasks, chunksize=max(1, games // (workers * 4))))
+    else:
+        _open_book(book_path)
+        results = [play_game(*task) for task in tasks]
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "engines": [name if name == "random" else f"{name}:{depth}" for name, depth in engines],
+        "games": games,
+        "wins": [sum(1 for r in results if r["winner"] == side) for side in (0, 1)],
+        "draws": sum(1 for r in results if r["winner"] is None),
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else math.inf,
+        "latency": [],
+    }
+    for side in (0, 1):
+        moves = [t for r in results for t in r["latencies"][side]]
+        summary["latency"].append({
+            "moves": len(moves),
+            "p50": percentile(moves, 0.50),
+            "p90": percentile(moves, 0.90),
+            "p99": percentile(moves, 0.99),
+            "max": max(moves) if moves else math.nan,
+        })
+    return summary
+
+
+def print_summary(summary):
+    a, b = summary["engines"]
+    print(f"{a} vs {b}: {summary['games']} games in {summary['seconds']:.2f}s "
+          f"({summary['games_per_second']:.2f} games/s)")
+    print(f"  {a} wins {summary['wins'][0]}, {b} wins {summary['wins'][1]}, draws {summary['draws']}")
+    for name, latency in zip(summary["engines"], summary["latency"]):
+        print(f"  {name:<14} moves {latency['moves']:>6}  p50 {latency['p50'] * 1000:8.2f}ms  "
+              f"p90 {latency['p90'] * 1000:8.2f}ms  p99 {latency['p99'] * 1000:8.2f}ms  "
+              f"max {latency['max'] * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play engines against each other without a display.")
+    parser.add_argument("engine_a", type=parse_engine, help="engine[:depth], e.g. alphabeta:4")
+    parser.add_argument("engine_b", type=parse_engine, help="engine[:depth], e.g. random")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--opening-plies", type=int, default=0, help="random moves played before the engines take over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--book", help="opening book for the alpha-beta engines (see book.py)")
+    parser.add_argument("--rows", type=int, default=STANDARD.rows)
+    parser.add_argument("--columns", type=int, default=STANDARD.columns)
+    parser.add_argument("--connect", type=int, default=STANDARD.connect, help="pieces in a row that score a line")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    geometry = get_geometry(args.rows, args.columns, args.connect)
+    summary = run_match([args.engine_a, args.engine_b], args.games, args.workers, args.opening_plies, args.seed,
+                        args.book, geometry)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
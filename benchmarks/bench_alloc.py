@@ -0,0 +1,147 @@
+"""Memory allocated by the alpha-beta search, per searched node.
+
+Compares the in-place search (one Position mutated with play/undo) against a
+copy-make reference that copies the position for every child, as the search
+did when it copied the board array at each node. Both prune the mirror-image
+moves of symmetric roots, so they search the same tree.
+
+A search allocates what it needs at a node and keeps it while the node's
+children are searched. A tracemalloc snapshot taken on reaching the first
+leaf at full depth therefore holds the blocks of every node on the line down
+to it; the blocks allocated by search code, divided by the nodes on that
+line, are the blocks each node allocates. Counting blocks in a snapshot is
+exact, unlike peak-memory differences. Times are measured in a separate run
+without tracemalloc. Run from the repository root:
+
+    python -m benchmarks.bench_alloc --depth 6
+"""
+import argparse
+import math
+import os
+import time
+import tracemalloc
+
+from benchmarks.bench_ordering import POSITIONS, position_from_moves
+from ordering import MoveOrderer
+from transposition import TranspositionTable
+from utils import AI_PIECE, PLAYER_PIECE, SearchContext, _minimax_alpha_beta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Blocks allocated by these files are the search's; tracemalloc's own are not
+SEARCH_FILES = [tracemalloc.Filter(True, os.path.join(ROOT, name))
+                for name in ("utils.py", "bitboard.py", "ordering.py", "transposition.py",
+                             os.path.join("benchmarks", "bench_alloc.py"))]
+
+
+class Probe:
+    """Takes a tracemalloc snapshot when the ``at``-th node is entered."""
+
+    def __init__(self, at):
+        self.at = at
+        self.snapshot = None
+
+    def node(self, count):
+        if count == self.at and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+
+
+class ProbedContext(SearchContext):
+    def __init__(self, probe, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.probe = probe
+
+    def visit(self):
+        super().visit()
+        self.probe.node(self.nodes)
+
+
+def copy_make_alpha_beta(position, depth, alpha, beta, maximizingPlayer, counter, probe, ply=0):
+    """Reference alpha-beta that searches a fresh copy of the position per child."""
+    counter[0] += 1
+    probe.node(counter[0])
+    if depth == 0 or position.is_full():
+        return None, position.score(AI_PIECE)
+    # Mirrored root moves are worth the same, as in the in-place search
+    valid_moves = list(position.distinct_moves() if ply == 0 else position.valid_moves())
+    value = -math.inf if maximizingPlayer else math.inf
+    best_col = None
+    for col in valid_moves:
+        child = position.copy()
+        child.play(col, AI_PIECE if maximizingPlayer else PLAYER_PIECE)
+        _, new_score = copy_make_alpha_beta(child, depth - 1, alpha, beta, not maximizingPlayer, counter, probe,
+                                            ply + 1)
+        if maximizingPlayer:
+            if new_score > value:
+                value, best_col = new_score, col
+            alpha = max(alpha, value)
+        else:
+            if new_score < value:
+                value, best_col = new_score, col
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+    return best_col, value
+
+
+def in_place(position, depth, probe, tt=None, orderer=None):
+    context = ProbedContext(probe, tt, orderer=orderer)
+    result = _minimax_alpha_beta(position, depth, -math.inf, math.inf, True, context)
+    return result, context.nodes
+
+
+def copy_make(position, depth, probe):
+    counter = [0]
+    result = copy_make_alpha_beta(position, depth, -math.inf, math.inf, True, counter, probe)
+    return result, counter[0]
+
+
+def measure(search, position, depth, reset=None):
+    """Returns (result, nodes, seconds, blocks per node, bytes per node) of ``search``.
+
+    ``reset`` runs before each search, outside the measured region."""
+    if reset:
+        reset()
+    start = time.perf_counter()
+    result, nodes = search(position.copy(), depth, Probe(0))
+    seconds = time.perf_counter() - start
+
+    probe = Probe(depth + 1)  # The root and one node per ply below it
+    if reset:
+        reset()
+    tracemalloc.start()
+    search(position.copy(), depth, probe)
+    tracemalloc.stop()
+    stats = probe.snapshot.filter_traces(SEARCH_FILES).statistics("filename")
+    blocks = sum(stat.count for stat in stats)
+    size = sum(stat.size for stat in stats)
+    return result, nodes, seconds, blocks / probe.at, size / probe.at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=6)
+    args = parser.parse_args()
+
+    tt = TranspositionTable(4)  # Allocated up front, outside the measured region
+    orderer = MoveOrderer()
+
+    def reset_tables():
+        tt.clear()
+        orderer.new_search()
+
+    searches = {"copy-make": (copy_make, None), "in-place": (in_place, None),
+                "in-place+tt": (lambda p, d, probe: in_place(p, d, probe, tt, orderer), reset_tables)}
+    print(f"{'position':<10} {'search':<12} {'nodes':>8} {'us/node':>8} {'blocks/node':>11} {'bytes/node':>10}")
+    for name, moves in POSITIONS.items():
+        position = position_from_moves(moves)
+        depth = min(args.depth, 42 - position.count)
+        results = {}
+        for label, (search, reset) in searches.items():
+            result, nodes, seconds, blocks, size = measure(search, position, depth, reset)
+            results[label] = (result, nodes)
+            print(f"{name:<10} {label:<12} {nodes:>8} {seconds / nodes * 1e6:>8.1f} {blocks:>11.2f} {size:>10.0f}")
+        assert results["copy-make"] == results["in-place"], "copy-make and in-place searches disagree"
+
+
+if __name__ == "__main__":
+    main()
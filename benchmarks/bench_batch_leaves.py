@@ -0,0 +1,44 @@
+"""Compare batched frontier evaluation with per-leaf evaluation in minimax_alpha_beta.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_leaves --depth 6 --repeat 3
+"""
+import argparse
+import math
+import time
+
+from benchmarks.bench_ordering import POSITIONS, position_from_moves
+from utils import minimax_alpha_beta
+
+
+def best_time(board_str, depth, maximizing, batch_leaves, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        col, score, _ = minimax_alpha_beta(board_str, depth, -math.inf, math.inf, maximizing,
+                                           batch_leaves=batch_leaves)
+        best = min(best, time.perf_counter() - start)
+    return best, col, score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'position':<10} {'per-leaf':>10} {'batched':>10} {'speedup':>8}  move/score")
+    for name, moves in POSITIONS.items():
+        position = position_from_moves(moves)
+        board_str = position.to_string()
+        maximizing = position.count % 2 == 1
+        leaf_time, leaf_col, leaf_score = best_time(board_str, args.depth, maximizing, False, args.repeat)
+        batch_time, batch_col, batch_score = best_time(board_str, args.depth, maximizing, True, args.repeat)
+        assert (leaf_col, leaf_score) == (batch_col, batch_score), "batched search changed the result"
+        print(f"{name:<10} {leaf_time:>9.3f}s {batch_time:>9.3f}s {leaf_time / batch_time:>7.2f}x  "
+              f"{leaf_col}/{leaf_score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""What a persistent search cache saves a restarted worker.
+
+Searches every corpus position with iterative deepening, each phase in a
+fresh process with an empty transposition table, as after a worker restart:
+
+    no cache    the baseline
+    cold        an empty cache file being filled
+    restarted   a new process reading the cache the cold phase left behind
+
+and reports time, nodes, cache hits and how many moves agree with the
+baseline. Run from the repository root:
+
+    python -m benchmarks.bench_disk_cache --depth 7
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.suite import load_corpus
+from disk_cache import DiskCache
+from ordering import MoveOrderer
+from search import iterative_deepening
+from stats import SearchStats
+from transposition import TranspositionTable
+
+
+def run_phase(cache_path, depth):
+    """Search the corpus in this process; returns (moves, seconds, nodes, cache stats)."""
+    cache = DiskCache(cache_path) if cache_path is not None else None
+    tt = TranspositionTable()
+    orderer = MoveOrderer()
+    moves = []
+    nodes = 0
+    start = time.perf_counter()
+    for _, _, board_str in load_corpus():
+        stats = SearchStats()
+        col, _, _, _ = iterative_deepening(board_str, depth, tt=tt, orderer=orderer, stats=stats, cache=cache,
+                                           endgame_cells=None)
+        moves.append(col)
+        nodes += stats.nodes
+    seconds = time.perf_counter() - start
+    cache_stats = None
+    if cache is not None:
+        cache_stats = cache.stats()
+        cache.close()
+    return moves, seconds, nodes, cache_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "cache.sqlite")
+        print(f"{'phase':<10} {'seconds':>8} {'nodes':>9} {'hits':>7} {'stores':>7} {'entries':>8} {'agree':>6}")
+        baseline = None
+        for phase, path in (("no cache", None), ("cold", cache_path), ("restarted", cache_path)):
+            with ProcessPoolExecutor(1) as executor:  # A fresh process per phase
+                moves, seconds, nodes, cache_stats = executor.submit(run_phase, path, args.depth).result()
+            baseline = baseline or moves
+            agree = sum(a == b for a, b in zip(moves, baseline))
+            hits, stores, entries = ((cache_stats["hits"], cache_stats["stores"], cache_stats["entries"])
+                                     if cache_stats is not None else ("-", "-", "-"))
+            print(f"{phase:<10} {seconds:>8.2f} {nodes:>9} {hits:>7} {stores:>7} {entries:>8} "
+                  f"{agree:>3}/{len(moves)}")
+
+        with DiskCache(os.path.join(directory, "lookup.sqlite")) as cache:
+            keys = [(key * 0x9E3779B97F4A7C15) % (1 << 64) for key in range(1, 10001)]  # Spread over 64 bits
+            for key in keys:
+                cache.store(key, 6, 0, 0, 3)
+            cache.flush()
+            start = time.perf_counter()
+            for key in keys:
+                cache.lookup(key)
+            hit = (time.perf_counter() - start) / len(keys)
+            start = time.perf_counter()
+            for key in keys:
+                cache.lookup(key + 1)
+            miss = (time.perf_counter() - start) / len(keys)
+        print(f"lookup: hit {hit * 1e6:.1f}us, miss {miss * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
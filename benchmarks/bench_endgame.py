@@ -0,0 +1,50 @@
+"""Exact endgame solve time against the number of empty cells.
+
+Positions come from seeded random playouts, so runs are comparable. Run from
+the repository root:
+
+    python -m benchmarks.bench_endgame --max-empty 16 --positions 10
+"""
+import argparse
+import random
+import time
+
+from bitboard import AI_PIECE, BOARD_SIZE, PLAYER_PIECE, Position
+from endgame import EndgameSolver
+
+
+def random_position(empty, seed):
+    """Random playout stopped with ``empty`` cells left; returns (position, AI to move)."""
+    rng = random.Random(seed)
+    position = Position()
+    piece = PLAYER_PIECE
+    while BOARD_SIZE - position.count > empty:
+        position.play(rng.choice(position.valid_moves()), piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return position, piece == AI_PIECE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-empty", type=int, default=4)
+    parser.add_argument("--max-empty", type=int, default=16)
+    parser.add_argument("--positions", type=int, default=10, help="positions per empty-cell count")
+    args = parser.parse_args()
+
+    print(f"{'empty':>5} {'mean':>10} {'max':>10} {'nodes':>10}")
+    for empty in range(args.min_empty, args.max_empty + 1):
+        times = []
+        nodes = 0
+        for seed in range(args.positions):
+            position, maximizing = random_position(empty, seed)
+            solver = EndgameSolver()
+            start = time.perf_counter()
+            solver.solve(position, maximizing)
+            times.append(time.perf_counter() - start)
+            nodes += solver.nodes
+        print(f"{empty:>5} {sum(times) / len(times) * 1000:>8.2f}ms {max(times) * 1000:>8.2f}ms "
+              f"{nodes // len(times):>10}")
+
+
+if __name__ == "__main__":
+    main()
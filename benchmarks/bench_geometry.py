@@ -0,0 +1,82 @@
+"""Move, evaluation and search cost on boards of different sizes.
+
+For each geometry a seeded random game is played half way, then the bench
+times play/undo pairs and both evaluations: the incremental score, which only
+visits the windows through the moved cell, and full_score, which visits every
+window on the board. A fixed-depth alpha-beta search gives nodes per second.
+Run from the repository root:
+
+    python -m benchmarks.bench_geometry --depth 4
+"""
+import argparse
+import math
+import random
+import time
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position, get_geometry
+from ordering import MoveOrderer
+from transposition import TranspositionTable
+from utils import SearchContext, _minimax_alpha_beta
+
+GEOMETRIES = [(6, 7, 4), (8, 9, 4), (10, 12, 4), (10, 12, 5), (20, 20, 5)]
+
+
+def half_played(geometry, seed=0):
+    """Random playout stopped with half the board filled, AI to move."""
+    rng = random.Random(seed)
+    position = Position(geometry)
+    piece = PLAYER_PIECE
+    while position.count < geometry.size // 2 or piece != AI_PIECE:
+        position.play(rng.choice(position.valid_moves()), piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return position
+
+
+def per_call(function, repeat):
+    """Best-of-three seconds per call of ``function()``."""
+    best = math.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=4, help="alpha-beta depth of the search measurement")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'board':<10} {'windows':>7} {'per cell':>8} {'play+undo':>10} {'score':>8} {'full':>9} "
+          f"{'nodes':>8} {'nodes/s':>8}")
+    for rows, columns, connect in GEOMETRIES:
+        geometry = get_geometry(rows, columns, connect)
+        position = half_played(geometry)
+        moves = position.valid_moves()
+
+        def play_undo():
+            for col in moves:
+                position.play(col, AI_PIECE)
+                position.undo(col)
+
+        move_cost = per_call(play_undo, args.repeat) / len(moves)
+        score_cost = per_call(lambda: position.score(AI_PIECE), args.repeat)
+        full_cost = per_call(lambda: position.full_score(AI_PIECE), max(1, args.repeat // 10))
+        assert position.score(AI_PIECE) == position.full_score(AI_PIECE)
+
+        context = SearchContext(TranspositionTable(), orderer=MoveOrderer(geometry=geometry))
+        start = time.perf_counter()
+        _minimax_alpha_beta(position.copy(), args.depth, -math.inf, math.inf, True, context)
+        seconds = time.perf_counter() - start
+
+        windows_per_cell = sum(map(len, geometry.cell_windows)) / geometry.size
+        board = f"{rows}x{columns}/{connect}"
+        print(f"{board:<10} {len(geometry.window_masks):>7} {windows_per_cell:>8.1f} "
+              f"{move_cost * 1e6:>8.2f}us {score_cost * 1e6:>6.2f}us {full_cost * 1e6:>7.1f}us "
+              f"{context.nodes:>8} {context.nodes / seconds:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
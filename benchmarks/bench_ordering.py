@@ -0,0 +1,71 @@
+"""Compare alpha-beta node counts under each move-ordering heuristic.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ordering --depth 7
+"""
+import argparse
+import math
+import time
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position
+from ordering import MoveOrderer
+from transposition import TranspositionTable
+from utils import SearchContext, _minimax_alpha_beta
+
+# Human moves first, so move sequences alternate starting with PLAYER_PIECE
+POSITIONS = {
+    "empty": "",
+    "opening": "3342",
+    "early": "33224415",
+    "midgame": "3322441566015",
+}
+
+CONFIGS = {
+    "none": dict(center=False, killers=False, history=False, tt_move=False),
+    "center": dict(center=True, killers=False, history=False, tt_move=False),
+    "killers": dict(center=False, killers=True, history=False, tt_move=False),
+    "history": dict(center=False, killers=False, history=True, tt_move=False),
+    "tt_move": dict(center=False, killers=False, history=False, tt_move=True),
+    "all": dict(center=True, killers=True, history=True, tt_move=True),
+}
+
+
+def position_from_moves(moves):
+    position = Position()
+    for i, col in enumerate(moves):
+        position.play(int(col), PLAYER_PIECE if i % 2 == 0 else AI_PIECE)
+    return position
+
+
+def search_nodes(position, depth, orderer, use_tt):
+    """Iteratively deepen to ``depth`` and return (total nodes, best move, score, seconds)."""
+    tt = TranspositionTable(16) if use_tt else None
+    maximizing = position.count % 2 == 1  # AI to move after an odd number of pieces
+    nodes = 0
+    start = time.perf_counter()
+    for d in range(1, depth + 1):
+        context = SearchContext(tt, orderer=orderer)
+        col, score = _minimax_alpha_beta(position, d, -math.inf, math.inf, maximizing, context)
+        nodes += context.nodes
+    return nodes, col, score, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--no-tt", action="store_true", help="search without a transposition table")
+    args = parser.parse_args()
+
+    print(f"{'position':<10} {'ordering':<9} {'nodes':>10} {'ratio':>7} {'move':>5} {'score':>6} {'time':>8}")
+    for name, moves in POSITIONS.items():
+        baseline = None
+        for config_name, flags in CONFIGS.items():
+            position = position_from_moves(moves)
+            nodes, col, score, elapsed = search_nodes(position, args.depth, MoveOrderer(**flags), not args.no_tt)
+            baseline = baseline or nodes
+            print(f"{name:<10} {config_name:<9} {nodes:>10} {baseline / nodes:>6.2f}x {col:>5} {score:>6} {elapsed:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
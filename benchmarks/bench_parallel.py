@@ -0,0 +1,51 @@
+"""Scaling of the parallel root search with the number of worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel --depth 7 --workers 1 2 4 8 16
+"""
+import argparse
+import math
+import time
+
+from benchmarks.bench_ordering import POSITIONS, position_from_moves
+from parallel import ParallelSearcher
+from utils import minimax_alpha_beta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--split-ply", type=int, default=2, choices=(1, 2))
+    args = parser.parse_args()
+
+    boards = []
+    for name, moves in POSITIONS.items():
+        position = position_from_moves(moves)
+        boards.append((name, position.to_string(), position.count % 2 == 1))
+
+    start = time.perf_counter()
+    serial = {}
+    for name, board_str, maximizing in boards:
+        serial[name] = minimax_alpha_beta(board_str, args.depth, -math.inf, math.inf, maximizing)[:2]
+    serial_time = time.perf_counter() - start
+    print(f"serial alpha-beta: {serial_time:.3f}s for {len(boards)} positions at depth {args.depth}")
+
+    print(f"{'workers':>7} {'time':>9} {'speedup':>8} {'nodes':>10}  same result")
+    for workers in args.workers:
+        with ParallelSearcher(workers) as searcher:
+            searcher.search(boards[0][1], 2, boards[0][2])  # Start the worker processes
+            start = time.perf_counter()
+            nodes = 0
+            same = True
+            for name, board_str, maximizing in boards:
+                col, score, task_nodes = searcher.search(board_str, args.depth, maximizing, args.split_ply)
+                nodes += task_nodes
+                same = same and (col, score) == serial[name]
+            elapsed = time.perf_counter() - start
+        print(f"{workers:>7} {elapsed:>8.3f}s {serial_time / elapsed:>7.2f}x {nodes:>10}  {same}")
+
+
+if __name__ == "__main__":
+    main()
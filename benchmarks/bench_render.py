@@ -0,0 +1,169 @@
+"""Frame time of the GUI with cached, dirty-rectangle drawing.
+
+Runs ConnectFourGUI frames headless (SDL's dummy video driver) in four
+situations and compares each with redrawing the way the GUI used to:
+every cell with pygame.draw, every label rendered again and the whole
+window pushed to the display.
+
+    idle    a game in progress, nothing happening
+    hover   the mouse moving over the board every frame
+    moves   a piece added every frame
+    menu    the start menu
+
+Reports milliseconds per frame and the pixels passed to
+``pygame.display.update`` per frame. Run from the repository root:
+
+    python -m benchmarks.bench_render --frames 300
+    python -m benchmarks.bench_render --rows 10 --columns 12 --connect 5
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import gui
+from bitboard import STANDARD, get_geometry
+from render import TextCache
+
+pixels = 0  # Pixels passed to pygame.display.update since the last reset
+_update = pygame.display.update
+
+
+def counting_update(rects=None):
+    global pixels
+    if rects is None:
+        width, height = pygame.display.get_surface().get_size()
+        pixels += width * height
+        _update()
+    else:
+        pixels += sum(pygame.Rect(rect).width * pygame.Rect(rect).height for rect in rects)
+        _update(rects)
+
+
+pygame.display.update = counting_update
+
+
+def full_board(game, board):
+    """The board drawn the old way: every cell and piece with pygame.draw."""
+    square, radius = game.square, game.radius
+    for c in range(game.geometry.columns):
+        for r in range(game.geometry.rows):
+            pygame.draw.rect(game.screen, gui.BLUE, (c * square, r * square + square, square, square))
+            pygame.draw.circle(game.screen, gui.BLACK, (int(c * square + square / 2),
+                                                        int(r * square + square + square / 2)), radius)
+            if board[r][c]:
+                color = gui.RED if board[r][c] == gui.PLAYER_PIECE else gui.YELLOW
+                pygame.draw.circle(game.screen, color, (int(c * square + square / 2),
+                                                        game.height - int(r * square + square / 2)), radius)
+
+
+def full_menu(game):
+    """The menu drawn the old way: filled and every label rendered each frame."""
+    game.screen.fill(gui.BLACK)
+    for text, font, y in (("Connect 4", game.font, game.height // 4), ("Play", game.small_font, game.height // 2 - 95),
+                          ("Settings", game.small_font, game.height // 2 + 5)):
+        game.screen.blit(font.render(text, True, gui.WHITE), (game.total_width // 2 - 50, y))
+    pygame.display.update()
+
+
+def random_boards(geometry, count, seed=0):
+    """``count`` boards, each one piece further into a random game; a game
+    starts over before its board fills, which would end it."""
+    rng = np.random.default_rng(seed)
+    board = np.zeros((geometry.rows, geometry.columns))
+    boards = []
+    piece = gui.PLAYER_PIECE
+    while len(boards) < count:
+        if np.count_nonzero(board) == geometry.size - 1:
+            board = np.zeros((geometry.rows, geometry.columns))
+        col = rng.choice([c for c in range(geometry.columns) if board[geometry.rows - 1][c] == 0])
+        board[np.count_nonzero(board[:, col])][col] = piece
+        piece = gui.AI_PIECE if piece == gui.PLAYER_PIECE else gui.PLAYER_PIECE
+        boards.append(board.copy())
+    return boards
+
+
+def timed(frames, step):
+    """Run ``step(i)`` for every frame; returns (ms per frame, pixels per frame)."""
+    global pixels
+    pixels = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        step(i)
+    elapsed = time.perf_counter() - start
+    return elapsed / frames * 1000, pixels // frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=STANDARD.rows)
+    parser.add_argument("--columns", type=int, default=STANDARD.columns)
+    parser.add_argument("--connect", type=int, default=STANDARD.connect)
+    args = parser.parse_args()
+
+    game = gui.ConnectFourGUI(get_geometry(args.rows, args.columns, args.connect))
+    boards = random_boards(game.geometry, args.frames)
+    game.state = "game"  # The human to move, so no search starts
+
+    def cached_frame(i):
+        game.frame()
+        game.present()
+
+    def cached_hover(i):
+        x = (i * 7) % game.width
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, {"pos": (x, game.square // 2), "rel": (7, 0),
+                                                                 "buttons": (0, 0, 0)}))
+        cached_frame(i)
+
+    def cached_moves(i):
+        game.board = boards[i]
+        game.update_sidebar = True  # As after a move: new scores
+        cached_frame(i)
+
+    # What the loop did before: the board redrawn every frame, pushed to the
+    # display when the mouse moved or the sidebar changed, labels rendered anew
+    def full_idle(i):
+        full_board(game, game.board)
+
+    def full_hover(i):
+        full_board(game, game.board)
+        pygame.draw.rect(game.screen, gui.BLACK, (0, 0, game.width, game.square))
+        pygame.draw.circle(game.screen, gui.RED, ((i * 7) % game.width, game.square // 2), game.radius)
+        pygame.display.update()
+
+    def full_moves(i):
+        full_board(game, boards[i])
+        text, game.text = game.text, TextCache(0)  # Nothing cached
+        game.draw_sidebar()
+        game.text = text
+        game.dirty = []
+        pygame.display.update()
+
+    scenarios = [("idle", full_idle, cached_frame), ("hover", full_hover, cached_hover),
+                 ("moves", full_moves, cached_moves)]
+    print(f"{args.rows}x{args.columns} board, {args.frames} frames")
+    print(f"{'scenario':<8} {'full ms':>8} {'cached ms':>9} {'speedup':>7} {'full px':>9} {'cached px':>9}")
+    for name, full, cached in scenarios:
+        game.board = boards[len(boards) // 2].copy()
+        full_ms, full_px = timed(args.frames, full)
+        game.shown = None
+        cached_frame(0)  # Draw everything once, as on entering the game screen
+        cached_ms, cached_px = timed(args.frames, cached)
+        print(f"{name:<8} {full_ms:>8.3f} {cached_ms:>9.3f} {full_ms / cached_ms:>6.1f}x {full_px:>9} {cached_px:>9}")
+
+    game.state = "menu"
+    full_ms, full_px = timed(args.frames, lambda i: full_menu(game))
+    game.shown = None
+    cached_frame(0)
+    cached_ms, cached_px = timed(args.frames, cached_frame)
+    print(f"{'menu':<8} {full_ms:>8.3f} {cached_ms:>9.3f} {full_ms / cached_ms:>6.1f}x {full_px:>9} {cached_px:>9}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Memory per game and fairness of the asyncio session manager.
+
+Creates --games idle games, half of them one human move in, and reports the
+memory they hold per game, measured with tracemalloc. Then one owner asks for
+--bulk AI moves at once while --owners other owners ask for one each, all on
+distinct random positions, and the latency of each group shows the
+round-robin queue serving the small owners first. Run from the repository
+root:
+
+    python -m benchmarks.bench_sessions --games 10000 --bulk 16 --owners 4
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from arena import percentile
+from benchmarks.bench_endgame import random_position
+from sessions import SessionManager
+
+EMPTY_CELLS = 31  # Odd, so the AI is to move in the random positions
+
+
+async def idle_games(games):
+    """Bytes held per idle game, with the manager itself allocated beforehand."""
+    async with SessionManager(workers=1) as manager:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        for i in range(games):
+            game = await manager.new_game(owner=f"user{i % 100}")
+            if i % 2:
+                await manager.play(game, i % 7)
+        held = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        return held / games
+
+
+async def timed_move(manager, game):
+    start = time.perf_counter()
+    await manager.ai_move(game)
+    return time.perf_counter() - start
+
+
+async def fairness(bulk, owners, depth, move_time, workers):
+    """AI-move latencies of one owner's ``bulk`` games and of ``owners`` single-game owners."""
+    async with SessionManager(workers=workers, book_path=None) as manager:
+        boards = [random_position(EMPTY_CELLS, seed)[0].to_string() for seed in range(bulk + owners)]
+        games = [await manager.new_game(owner="bulk" if i < bulk else f"owner{i}", ai_first=True, depth=depth,
+                                        move_time=move_time, board=board)
+                 for i, board in enumerate(boards)]
+        # The bulk owner asks first, so a FIFO queue would serve all of its games before the others
+        latencies = await asyncio.gather(*(timed_move(manager, game) for game in games))
+        return latencies[:bulk], latencies[bulk:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--bulk", type=int, default=16, help="AI moves requested at once by one owner")
+    parser.add_argument("--owners", type=int, default=4, help="other owners requesting one AI move each")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--move-time", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    per_game = asyncio.run(idle_games(args.games))
+    print(f"{args.games} idle games: {per_game:.0f} bytes per game")
+
+    bulk, others = asyncio.run(fairness(args.bulk, args.owners, args.depth, args.move_time, args.workers))
+    for label, latencies in (("bulk owner", bulk), ("other owners", others)):
+        print(f"  {label:<13} {len(latencies):>4} moves  p50 {percentile(latencies, 0.5) * 1000:8.1f}ms  "
+              f"max {max(latencies) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
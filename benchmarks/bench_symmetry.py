@@ -0,0 +1,73 @@
+"""Early-game search work with mirror-symmetric keys.
+
+Searches the empty board and seeded random openings with iterative deepening
+and a fresh transposition table, then searches each position's mirror image
+with the same table. Reports nodes and time of the first search, the nodes
+the mirrored one still needs and the table entries used by both; the two
+searches must agree on the score. Run from the repository root:
+
+    python -m benchmarks.bench_symmetry --depth 9 --positions 12
+"""
+import argparse
+import random
+import time
+
+from bitboard import AI_PIECE, COLUMN_COUNT, PLAYER_PIECE, Position
+from ordering import MoveOrderer
+from search import iterative_deepening
+from stats import SearchStats
+from transposition import TranspositionTable
+
+
+def openings(count, seed=0):
+    """The empty board, then ``count - 1`` random openings of 1 to 6 plies, all with the AI to move."""
+    rng = random.Random(seed)
+    boards = [Position().to_string()]
+    while len(boards) < count:
+        position = Position()
+        piece = PLAYER_PIECE
+        for _ in range(rng.randint(1, 3) * 2):
+            position.play(rng.choice(position.valid_moves()), piece)
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        boards.append(position.to_string())
+    return boards
+
+
+def mirror(board_str):
+    """The board string reflected left to right."""
+    rows = [board_str[i:i + COLUMN_COUNT] for i in range(0, len(board_str), COLUMN_COUNT)]
+    return "".join(row[::-1] for row in rows)
+
+
+def search(board_str, depth, tt):
+    stats = SearchStats()
+    start = time.perf_counter()
+    col, score, _, _ = iterative_deepening(board_str, depth, tt=tt, orderer=MoveOrderer(), stats=stats,
+                                           endgame_cells=None)
+    return col, score, stats.nodes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=9)
+    parser.add_argument("--positions", type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'board':<44} {'sym':>3} {'nodes':>8} {'seconds':>7} {'mirror':>7} {'entries':>7}")
+    totals = [0, 0.0, 0, 0]
+    for board_str in openings(args.positions):
+        tt = TranspositionTable()
+        _, score, nodes, seconds = search(board_str, args.depth, tt)
+        _, mirror_score, mirror_nodes, _ = search(mirror(board_str), args.depth, tt)
+        entries = tt.stats()["used"]
+        if mirror_score != score:
+            print(f"score mismatch on {board_str}: {score} vs {mirror_score}")
+        symmetric = "yes" if mirror(board_str) == board_str else ""
+        print(f"{board_str:<44} {symmetric:>3} {nodes:>8} {seconds:>7.2f} {mirror_nodes:>7} {entries:>7}")
+        for i, value in enumerate((nodes, seconds, mirror_nodes, entries)):
+            totals[i] += value
+    print(f"{'total':<44} {'':>3} {totals[0]:>8} {totals[1]:>7.2f} {totals[2]:>7} {totals[3]:>7}")
+
+
+if __name__ == "__main__":
+    main()
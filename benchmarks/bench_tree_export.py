@@ -0,0 +1,82 @@
+"""Cost of writing a large search tree out, printed or exported.
+
+Uses the synthetic tree of bench_tree_view (``--nodes`` nodes, ``--branching``
+children per node, minimax-backed scores) and times:
+
+    print     utils.traverse_tree into a discarded stream
+    binary    export_tree to compact binary records
+    jsonl     export_tree to JSON lines
+    depth N   binary, ``--max-depth`` plies below the root
+    pv        binary, the principal variation only
+
+then reading the binary file back: opening it, one random node, iterating
+every record and loading it as a SearchTree. Run from the repository root:
+
+    python -m benchmarks.bench_tree_export --nodes 1000000 --branching 12
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_tree_view import synthetic_tree
+from tree_export import TreeReader, export_tree
+from utils import traverse_tree
+
+
+class Discard(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000000)
+    parser.add_argument("--branching", type=int, default=12)
+    parser.add_argument("--max-depth", type=int, default=3)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.nodes, args.branching)
+    tree.children(0)  # Index once, as a viewer would have
+    print(f"{len(tree)} nodes, branching {args.branching}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        def print_tree():
+            with contextlib.redirect_stdout(Discard()):
+                traverse_tree(tree.root())
+
+        _, seconds = timed(print_tree)
+        print(f"{'output':<9} {'nodes':>8} {'seconds':>8} {'MB':>8}")
+        print(f"{'print':<9} {len(tree):>8} {seconds:>8.3f} {'-':>8}")
+        binary = os.path.join(directory, "tree.c4t")
+        runs = [("binary", binary, {}), ("jsonl", os.path.join(directory, "tree.jsonl"), {"fmt": "jsonl"}),
+                (f"depth {args.max_depth}", os.path.join(directory, "depth.c4t"), {"max_depth": args.max_depth}),
+                ("pv", os.path.join(directory, "pv.c4t"), {"pv_only": True})]
+        for name, path, options in runs:
+            count, seconds = timed(lambda: export_tree(tree, path, **options))
+            print(f"{name:<9} {count:>8} {seconds:>8.3f} {os.path.getsize(path) / 1e6:>8.2f}")
+
+        reader, seconds = timed(lambda: TreeReader(binary))
+        print(f"\nopen {seconds * 1000:.3f} ms, {len(reader)} nodes")
+        rng = random.Random(0)
+        samples = [rng.randrange(len(reader)) for _ in range(10000)]
+        _, seconds = timed(lambda: [reader[i] for i in samples])
+        print(f"random node {seconds / len(samples) * 1e6:.2f} us")
+        _, seconds = timed(lambda: sum(1 for _ in reader))
+        print(f"iterate {seconds:.3f} s")
+        loaded, seconds = timed(reader.tree)
+        print(f"load as SearchTree {seconds:.3f} s, root score {loaded.root().score} (tree {tree.root().score})")
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Interaction latency of the tree visualizer on a synthetic million-node tree.
+
+Builds a SearchTree level by level with ``--branching`` children per node
+until it holds ``--nodes`` nodes, with random leaf scores backed up by
+minimax, so the principal variation runs to the deepest level. Then:
+
+    index   building the child index the view needs, and the same with the
+            pure-Python loop it replaces
+    open    the first frame of a new view
+    ...     a random session of clicks and keys, each followed by the
+            frame it causes, drawn headless into an 800x600 surface
+
+Reports milliseconds per action (mean and worst) against the 16.7 ms of a
+60 Hz frame. Run from the repository root:
+
+    python -m benchmarks.bench_tree_view --nodes 1000000 --branching 12
+"""
+import argparse
+import os
+import random
+import time
+from array import array
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from bitboard import AI_PIECE, PLAYER_PIECE
+from render import TextCache
+from tree import TREE_FULL, SearchTree
+from tree_view import TreeView
+
+FRAME_MS = 1000 / 60
+
+
+def synthetic_tree(nodes, branching, seed=0):
+    """A tree of exactly ``nodes`` nodes, filled one level at a time."""
+    rng = np.random.default_rng(seed)
+    parents = [np.array([-1], dtype=np.intc)]
+    levels = [np.array([0], dtype=np.intc)]
+    total = 1
+    while total < nodes:
+        children = np.repeat(levels[-1], branching)[:nodes - total]
+        parents.append(children)
+        levels.append(np.arange(total, total + len(children), dtype=np.intc))
+        total += len(children)
+    parent = np.concatenate(parents)
+    depth = np.concatenate([np.full(len(level), d, dtype=np.int8) for d, level in enumerate(levels)])
+    players = np.where(depth % 2 == 0, AI_PIECE, PLAYER_PIECE).astype(np.int8)
+    moves = np.concatenate([np.array([-1], dtype=np.int8)] +
+                           [((level - level[0]) % branching).astype(np.int8) for level in levels[1:]])
+
+    # Random leaves, then minimax from the deepest level up
+    has_children = np.zeros(nodes, dtype=bool)
+    has_children[parent[1:]] = True
+    scores = np.where(has_children, np.nan, rng.integers(-100, 101, nodes)).astype(np.float64)
+    for level in reversed(levels[1:]):
+        below = parent[level]
+        maximizing = players[below[0]] == AI_PIECE
+        best = np.full(nodes, -np.inf if maximizing else np.inf)
+        (np.maximum if maximizing else np.minimum).at(best, below, scores[level])
+        targets = np.unique(below)
+        scores[targets] = best[targets]
+
+    tree = SearchTree(TREE_FULL)
+    tree.parents = array('i', parent.tobytes())
+    tree.moves = array('b', moves.tobytes())
+    tree.players = array('b', players.tobytes())
+    tree.scores = array('d', scores.tobytes())
+    return tree
+
+
+def python_child_index(tree):
+    """The child index built the way SearchTree used to, one node at a time."""
+    count = len(tree.parents)
+    offsets = array('i', [0]) * (count + 1)
+    for parent in tree.parents:
+        if parent >= 0:
+            offsets[parent + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    fill = array('i', offsets)
+    indices = array('i', [0]) * offsets[count]
+    for i, parent in enumerate(tree.parents):
+        if parent >= 0:
+            indices[fill[parent]] = i
+            fill[parent] += 1
+    return offsets, indices
+
+
+def click(view, rng, action, argument=None):
+    """A left click on something drawn for ``action``, or None when nothing is."""
+    rects = [rect for rect, hit, value in view.hits if hit == action and (argument is None or value == argument)]
+    if not rects:
+        return None
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, {"pos": rng.choice(rects).center, "button": 1})
+
+
+def key(code):
+    return pygame.event.Event(pygame.KEYDOWN, {"key": code, "mod": 0, "unicode": "", "scancode": 0})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000000)
+    parser.add_argument("--branching", type=int, default=12)
+    parser.add_argument("--actions", type=int, default=2000)
+    args = parser.parse_args()
+
+    pygame.init()
+    surface = pygame.Surface((800, 600))
+    start = time.perf_counter()
+    tree = synthetic_tree(args.nodes, args.branching)
+    print(f"{len(tree)} nodes, branching {args.branching}, built in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    python_child_index(tree)
+    python_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    tree.children(0)
+    index_ms = (time.perf_counter() - start) * 1000
+    print(f"child index: {index_ms:.1f} ms (pure Python {python_ms:.1f} ms)")
+    print(f"principal variation: {len(tree.principal_variation())} plies")
+
+    view = TreeView(tree, text=TextCache())
+    start = time.perf_counter()
+    view.draw(surface)
+    print(f"first frame: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    rng = random.Random(0)
+    actions = {
+        "open child": lambda: click(view, rng, "open"),
+        "click node": lambda: click(view, rng, "up"),
+        "next page": lambda: click(view, rng, "page", 1),
+        "prev page": lambda: key(pygame.K_LEFT),
+        "pv step": lambda: key(pygame.K_p),
+        "pv end": lambda: key(pygame.K_END),
+        "home": lambda: key(pygame.K_HOME),
+    }
+    weights = [6, 3, 2, 1, 2, 1, 1]
+    times = {name: [] for name in actions}
+    for _ in range(args.actions):
+        name = rng.choices(list(actions), weights)[0]
+        event = actions[name]()
+        if event is None:
+            continue
+        start = time.perf_counter()
+        if view.handle_event(event):
+            view.draw(surface)
+        times[name].append((time.perf_counter() - start) * 1000)
+
+    print(f"{'action':<11} {'count':>6} {'mean ms':>8} {'worst ms':>8}   (60 Hz frame: {FRAME_MS:.1f} ms)")
+    for name, samples in times.items():
+        if samples:
+            print(f"{name:<11} {len(samples):>6} {sum(samples) / len(samples):>8.3f} {max(samples):>8.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Load test for the HTTP move service.
+
+Starts a server on a free localhost port (or uses the one at --url), then runs
+--clients threads that each send --requests ``POST /move`` requests for corpus
+positions over one kept-alive connection. Reports requests/sec, latency
+percentiles and how many requests were coalesced into a running search.
+Run from the repository root:
+
+    python -m benchmarks.load_test --clients 16 --requests 20 --workers 4
+    python -m benchmarks.load_test --positions 2 --depth 6   # Few distinct positions: mostly coalesced
+    python -m benchmarks.load_test --url http://127.0.0.1:8000
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from arena import percentile
+from benchmarks.suite import load_corpus
+from server import MoveServer
+
+
+def client(host, port, bodies, requests, seed, results):
+    """Send ``requests`` random bodies on one connection; appends (seconds, status, response) to results."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        for _ in range(requests):
+            body = rng.choice(bodies)
+            start = time.perf_counter()
+            connection.request("POST", "/move", body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+            results.append((time.perf_counter() - start, response.status, payload))
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes of the started server")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--positions", type=int, default=None, help="use only the first N corpus positions")
+    parser.add_argument("--algorithm", default="alphabeta")
+    parser.add_argument("--depth", type=int, default=5)
+    args = parser.parse_args()
+
+    positions = load_corpus()[:args.positions]
+    bodies = [json.dumps({"board": board_str, "algorithm": args.algorithm, "depth": args.depth})
+              for _, _, board_str in positions]
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = MoveServer(("127.0.0.1", 0), args.workers, book_path=None)  # No book: every request searches
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+
+    results = []
+    threads = [threading.Thread(target=client, args=(host, port, bodies, args.requests, seed, results))
+               for seed in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    latencies = [seconds for seconds, status, _ in results if status == 200]
+    errors = len(results) - len(latencies)
+    coalesced = sum(1 for _, status, payload in results if status == 200 and payload["coalesced"])
+    print(f"{len(results)} requests from {args.clients} clients over {len(bodies)} positions "
+          f"in {elapsed:.2f}s: {len(results) / elapsed:.1f} requests/s")
+    print(f"  errors {errors}, coalesced {coalesced} ({coalesced / max(1, len(latencies)):.0%})")
+    print(f"  latency p50 {percentile(latencies, 0.50) * 1000:.1f}ms  p90 {percentile(latencies, 0.90) * 1000:.1f}ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f}ms  max {max(latencies, default=0) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Search benchmark suite over the fixed position corpus.
+
+Runs each algorithm at depths 1..N on every position in corpus.txt and
+records wall time, nodes visited, nodes/sec, peak memory and the chosen move
+as JSON. A run can be compared against a saved baseline:
+
+    python -m benchmarks.suite --max-depth 5 --output baseline.json
+    python -m benchmarks.suite --max-depth 5 --output new.json --baseline baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from stats import SearchStats
+from utils import expecti_minimax, minimax, minimax_alpha_beta
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus.txt")
+MIN_DELTA = 0.005  # Seconds a search must slow down by before compare() flags it
+
+ALGORITHMS = {
+    "minimax": lambda board_str, depth, **kw: minimax(board_str, depth, True, **kw),
+    "alphabeta": lambda board_str, depth, **kw: minimax_alpha_beta(board_str, depth, -math.inf, math.inf, True, **kw),
+    "expecti": lambda board_str, depth, **kw: expecti_minimax(board_str, depth, -math.inf, math.inf, True, **kw),
+}
+
+
+def load_corpus(path=CORPUS):
+    """Return ``[(category, name, board_str), ...]`` from a corpus file."""
+    positions = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                category, name, board_str = line.split()
+                positions.append((category, name, board_str))
+    return positions
+
+
+def measure(algorithm, board_str, depth, repeat, trace_memory):
+    """Benchmark one search and return its result record."""
+    search = ALGORITHMS[algorithm]
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        col, score, _ = search(board_str, depth)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    # Nodes are counted in a separate run so the timed runs stay uninstrumented
+    stats = SearchStats()
+    search(board_str, depth, stats=stats)
+
+    peak_kib = None
+    if trace_memory:
+        tracemalloc.start()
+        search(board_str, depth)
+        peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "nodes": stats.nodes,
+        "nodes_per_second": stats.nodes / seconds if seconds > 0 else None,
+        "leaves": stats.leaves,
+        "cutoffs": stats.cutoffs,
+        "peak_kib": peak_kib,
+        "move": col,
+        "score": score,
+    }
+
+
+def run_suite(algorithms, max_depth, repeat=1, trace_memory=True, positions=None):
+    results = []
+    for category, name, board_str in positions or load_corpus():
+        for algorithm in algorithms:
+            for depth in range(1, max_depth + 1):
+                record = {"position": name, "category": category, "algorithm": algorithm, "depth": depth}
+                record.update(measure(algorithm, board_str, depth, repeat, trace_memory))
+                results.append(record)
+                print(f"{name:<12} {algorithm:<10} d{depth}  {record['seconds'] * 1000:9.2f}ms "
+                      f"{record['nodes']:>9} nodes  move {record['move']}", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, time_tolerance, min_delta=MIN_DELTA):
+    """Return human-readable regressions of ``results`` against ``baseline``.
+
+    A record regresses when it is more than ``time_tolerance`` (a fraction)
+    and more than ``min_delta`` seconds slower, visits more nodes, or picks a
+    different move. The absolute floor keeps timer noise on searches of a
+    millisecond or less from counting as slowdowns.
+    """
+    previous = {(r["position"], r["algorithm"], r["depth"]): r for r in baseline}
+    regressions = []
+    for record in results:
+        key = (record["position"], record["algorithm"], record["depth"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        label = f"{key[0]} {key[1]} depth {key[2]}"
+        slower = record["seconds"] - old["seconds"]
+        if record["seconds"] > old["seconds"] * (1 + time_tolerance) and slower > min_delta:
+            regressions.append(f"{label}: time {old['seconds'] * 1000:.2f}ms -> {record['seconds'] * 1000:.2f}ms")
+        if record["nodes"] > old["nodes"]:
+            regressions.append(f"{label}: nodes {old['nodes']} -> {record['nodes']}")
+        if record["move"] != old["move"]:
+            regressions.append(f"{label}: move {old['move']} -> {record['move']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--max-depth", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per search; the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging, as a fraction")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA,
+                        help="seconds a search must slow down by before flagging, whatever the fraction")
+    args = parser.parse_args()
+
+    results = run_suite(args.algorithms, args.max_depth, args.repeat, not args.no_memory, load_corpus(args.corpus))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "max_depth": args.max_depth,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        print(f"{len(regressions)} regression(s) against {args.baseline}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
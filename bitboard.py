@@ -0,0 +1,427 @@
+import random
+
+# Constants
+EMPTY = 0
+PLAYER_PIECE = 1
+AI_PIECE = 2
+
+# Window scores of the heuristic, for a line of `connect` cells
+LINE_SCORE = 100        # connect of own pieces
+OPEN_MINUS_ONE = 5      # connect - 1 own pieces and an empty cell
+OPEN_MINUS_TWO = 2      # connect - 2 own pieces and two empty cells
+BLOCK_PENALTY = -4      # connect - 1 opponent pieces and an empty cell
+
+# Bit layout: column-major, one bit per cell plus a sentinel bit on top of each
+# column so shifted masks never wrap from one column into the next. For the
+# standard 6x7 board:
+#
+#   6 13 20 27 34 41 48   <- sentinel row, always 0
+#   5 12 19 26 33 40 47
+#   ...
+#   0  7 14 21 28 35 42   <- bottom row (row 0)
+
+
+class _LazyTable(dict):
+    """Dict that computes missing entries with ``build(key)`` on first use."""
+
+    def __init__(self, build):
+        super().__init__()
+        self._build = build
+
+    def __missing__(self, key):
+        value = self[key] = self._build(key)
+        return value
+
+
+class Geometry:
+    """Board shape and every lookup table derived from it.
+
+    ``rows`` x ``columns`` cells, scored on lines (windows) of ``connect``
+    cells. Everything the search needs per cell or per window is computed
+    once here, so making a move only touches the windows through its cell and
+    costs the same on a 20x20 board as on 6x7. Use get_geometry to share one
+    instance per shape.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        if rows < 1 or columns < 1 or connect < 2 or connect > max(rows, columns):
+            raise ValueError(f"no {connect}-in-a-row lines fit on a {rows}x{columns} board")
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.h1 = rows + 1
+        self.size = rows * columns
+        self.bits = columns * self.h1
+        # Shifts for the four line directions: vertical, horizontal, "/" and "\"
+        self.directions = (1, self.h1, self.h1 + 1, self.h1 - 1)
+        self.board_mask = sum(self.cell_bit(r, c) for r in range(rows) for c in range(columns))
+        # Shifts that grow every cell into the line of `connect` cells starting
+        # there, per direction: runs of length k shifted by j <= k make runs of
+        # k + j, so lines of four take two shifts and lines of five three
+        steps = []
+        length = 1
+        while length < connect:
+            steps.append(min(length, connect - length))
+            length += steps[-1]
+        self.line_shifts = tuple(tuple(step * d for step in steps) for d in self.directions)
+
+        # Zobrist keys, one random 64-bit value per (piece, bit index). The
+        # generator is seeded so keys are identical in every process.
+        rng = random.Random(0xC4)
+        self.zobrist = tuple(tuple(rng.getrandbits(64) for _ in range(self.bits)) for _ in range(3))
+        self.side_key = rng.getrandbits(64)  # Mixed in when the maximizing player is to move
+        # mirror_zobrist[piece][index]: the key of the cell's mirror image in
+        # the center column, so a position also tracks its mirror image's key
+        self.mirror_zobrist = tuple(
+            tuple(keys[(columns - 1 - index // self.h1) * self.h1 + index % self.h1] for index in range(self.bits))
+            for keys in self.zobrist
+        )
+
+        self.window_cells = self._build_window_cells()
+        self.window_masks = tuple(
+            sum(self.cell_bit(i // columns, i % columns) for i in cells) for cells in self.window_cells)
+        self.window_scores = self._build_window_scores()
+        # cell_windows[index]: the windows (positions in window_masks) containing bit `index`
+        self.cell_windows = tuple(
+            tuple(w for w, mask in enumerate(self.window_masks) if mask >> index & 1)
+            for index in range(self.bits)
+        )
+        # Score changes when a piece lands in a window already holding `own`
+        # pieces of its colour and `opp` of the other: own_gain[own][opp] for
+        # the mover's score, opp_change[own][opp] for the opponent's.
+        n = connect
+        scores = self.window_scores
+        self.own_gain = tuple(
+            tuple(scores[own + 1][opp] - scores[own][opp] if own + opp < n else 0 for opp in range(n + 1))
+            for own in range(n + 1)
+        )
+        self.opp_change = tuple(
+            tuple(scores[opp][own + 1] - scores[opp][own] if own + opp < n else 0 for opp in range(n + 1))
+            for own in range(n + 1)
+        )
+
+        # Columns sorted by distance from the center, left before right on ties
+        self.center_order = tuple(sorted(range(columns), key=lambda c: abs(c - columns // 2)))
+        # valid_moves[full]: playable columns, left to right, when the columns
+        # set in the bitmask `full` are full. Shared tuples, so listing moves
+        # allocates nothing; filled on first use since wide boards have too
+        # many combinations to build up front.
+        self.valid_moves = _LazyTable(lambda full: tuple(c for c in range(columns) if not full >> c & 1))
+        # center_moves[moves]: a valid_moves tuple in center-first order
+        self.center_moves = _LazyTable(lambda moves: tuple(c for c in self.center_order if c in moves))
+
+    def __reduce__(self):
+        return get_geometry, (self.rows, self.columns, self.connect)
+
+    def __repr__(self):
+        return f"Geometry(rows={self.rows}, columns={self.columns}, connect={self.connect})"
+
+    def cell_bit(self, row, col):
+        """Return the single-bit mask of a cell."""
+        return 1 << (col * self.h1 + row)
+
+    def _build_window_cells(self):
+        # Row-major cell indices (row * columns + col) of every line
+        rows, columns, n = self.rows, self.columns, self.connect
+        windows = []
+        # Horizontal
+        for r in range(rows):
+            for c in range(columns - n + 1):
+                windows.append(tuple(r * columns + c + i for i in range(n)))
+        # Vertical
+        for c in range(columns):
+            for r in range(rows - n + 1):
+                windows.append(tuple((r + i) * columns + c for i in range(n)))
+        # Positive sloped diagonal
+        for r in range(rows - n + 1):
+            for c in range(columns - n + 1):
+                windows.append(tuple((r + i) * columns + c + i for i in range(n)))
+        # Negative sloped diagonal
+        for r in range(n - 1, rows):
+            for c in range(columns - n + 1):
+                windows.append(tuple((r - i) * columns + c + i for i in range(n)))
+        return tuple(windows)
+
+    def _build_window_scores(self):
+        # window_scores[own][opp] is the evaluation of a window holding `own`
+        # of our pieces and `opp` of the opponent's
+        n = self.connect
+        table = [[0] * (n + 1) for _ in range(n + 1)]
+        for own in range(n + 1):
+            for opp in range(n + 1 - own):
+                empty = n - own - opp
+                score = 0
+                if own == n:
+                    score += LINE_SCORE
+                elif own == n - 1 and empty == 1:
+                    score += OPEN_MINUS_ONE
+                elif own == n - 2 and empty == 2:
+                    score += OPEN_MINUS_TWO
+                if opp == n - 1 and empty == 1:
+                    score += BLOCK_PENALTY
+                table[own][opp] = score
+        return tuple(tuple(row) for row in table)
+
+    def count_lines(self, mask):
+        """Count the windows fully covered by a bitboard."""
+        count = 0
+        for shifts in self.line_shifts:
+            run = mask
+            for shift in shifts:
+                run &= run >> shift
+            count += run.bit_count()
+        return count
+
+
+_geometries = {}
+
+
+def get_geometry(rows=6, columns=7, connect=4):
+    """Return the shared Geometry for a board shape, building it once."""
+    key = (rows, columns, connect)
+    if key not in _geometries:
+        _geometries[key] = Geometry(rows, columns, connect)
+    return _geometries[key]
+
+
+STANDARD = get_geometry()
+
+# The standard board's dimensions under their historic names
+ROW_COUNT = STANDARD.rows
+COLUMN_COUNT = STANDARD.columns
+BOARD_SIZE = STANDARD.size
+
+
+class Position:
+    """Bitboard-backed board state with O(1) make/unmake.
+
+    ``geometry`` is the board's Geometry (STANDARD by default). ``masks[piece]``
+    holds the cells occupied by ``piece``, ``heights[col]`` the number of
+    pieces in each column and ``full`` a bitmask of the full columns. Moves are
+    applied in place with ``play`` and reverted with ``undo``; ``key`` is the
+    Zobrist hash of the pieces on the board and ``mirror_key`` that of the
+    board reflected left to right, both updated incrementally.
+
+    The heuristic score is maintained incrementally as well: ``window_counts``
+    holds each piece's count in every window and ``scores[piece]`` the running
+    score_position value, so a move only touches the windows through its cell
+    and ``score`` is O(1).
+    """
+
+    __slots__ = ("geometry", "masks", "heights", "full", "count", "key", "mirror_key", "window_counts", "scores")
+
+    def __init__(self, geometry=None):
+        self.geometry = geometry if geometry is not None else STANDARD
+        windows = len(self.geometry.window_masks)
+        self.masks = [0, 0, 0]  # Indexed by piece; masks[EMPTY] is unused
+        self.heights = [0] * self.geometry.columns
+        self.full = 0
+        self.count = 0
+        self.key = 0
+        self.mirror_key = 0
+        self.window_counts = [None, [0] * windows, [0] * windows]
+        self.scores = [0, 0, 0]
+
+    # Conversion layer
+    @classmethod
+    def from_string(cls, board_str, geometry=None):
+        """Build a position from a row-major board string (42 chars on the standard board)."""
+        position = cls(geometry)
+        columns = position.geometry.columns
+        if len(board_str) != position.geometry.size:
+            raise ValueError(f"board string has {len(board_str)} cells, expected {position.geometry.size}")
+        for i, cell in enumerate(board_str):
+            piece = int(cell)
+            if piece != EMPTY:
+                position._place(i // columns, i % columns, piece)
+        return position
+
+    @classmethod
+    def from_array(cls, board_array, geometry=None):
+        """Build a position from a (rows, columns) numpy array. Without a
+        ``geometry`` the array's shape with connect-4 lines is assumed."""
+        rows, columns = len(board_array), len(board_array[0])
+        position = cls(geometry if geometry is not None else get_geometry(rows, columns))
+        for r in range(rows):
+            for c in range(columns):
+                piece = int(board_array[r][c])
+                if piece != EMPTY:
+                    position._place(r, c, piece)
+        return position
+
+    def _place(self, row, col, piece):
+        geometry = self.geometry
+        index = col * geometry.h1 + row
+        self.masks[piece] |= 1 << index
+        self.key ^= geometry.zobrist[piece][index]
+        self.mirror_key ^= geometry.mirror_zobrist[piece][index]
+        self._add_to_windows(geometry, index, piece)
+        self.heights[col] = max(self.heights[col], row + 1)
+        if self.heights[col] == geometry.rows:
+            self.full |= 1 << col
+        self.count += 1
+
+    def to_string(self):
+        """Convert back to the row-major board string."""
+        return masks_to_string(self.masks[PLAYER_PIECE], self.masks[AI_PIECE], self.geometry)
+
+    def to_array(self):
+        """Convert back to a (rows, columns) numpy array."""
+        import numpy as np
+        return np.array([int(cell) for cell in self.to_string()]).reshape(self.geometry.rows, self.geometry.columns)
+
+    def snapshot(self):
+        """Return the (player_mask, ai_mask) pair identifying this position."""
+        return self.masks[PLAYER_PIECE], self.masks[AI_PIECE]
+
+    def copy(self):
+        position = Position(self.geometry)
+        position.masks = self.masks[:]
+        position.heights = self.heights[:]
+        position.full = self.full
+        position.count = self.count
+        position.key = self.key
+        position.mirror_key = self.mirror_key
+        position.window_counts = [None, self.window_counts[1][:], self.window_counts[2][:]]
+        position.scores = self.scores[:]
+        return position
+
+    # Core operations
+    def can_play(self, col):
+        return self.heights[col] < self.geometry.rows
+
+    def valid_moves(self):
+        """Playable columns, left to right, as a shared tuple."""
+        return self.geometry.valid_moves[self.full]
+
+    def is_full(self):
+        return self.count == self.geometry.size
+
+    def play(self, col, piece):
+        """Drop ``piece`` into ``col`` in place."""
+        geometry = self.geometry
+        heights = self.heights
+        height = heights[col]
+        index = col * geometry.h1 + height
+        self.masks[piece] |= 1 << index
+        self.key ^= geometry.zobrist[piece][index]
+        self.mirror_key ^= geometry.mirror_zobrist[piece][index]
+        self._add_to_windows(geometry, index, piece)
+        heights[col] = height + 1
+        if height + 1 == geometry.rows:
+            self.full |= 1 << col
+        self.count += 1
+
+    def undo(self, col):
+        """Remove the top piece of ``col``, reverting the matching ``play``."""
+        geometry = self.geometry
+        heights = self.heights
+        height = heights[col] - 1
+        heights[col] = height
+        if height == geometry.rows - 1:
+            self.full ^= 1 << col  # The column was full
+        self.count -= 1
+        index = col * geometry.h1 + height
+        bit = 1 << index
+        masks = self.masks
+        piece = PLAYER_PIECE if masks[PLAYER_PIECE] & bit else AI_PIECE
+        masks[piece] ^= bit
+        self.key ^= geometry.zobrist[piece][index]
+        self.mirror_key ^= geometry.mirror_zobrist[piece][index]
+        self._remove_from_windows(geometry, index, piece)
+
+    # The window updates only visit the windows through the changed cell, so
+    # their cost depends on the line length, not on the board size.
+    def _add_to_windows(self, geometry, index, piece):
+        own_gain = geometry.own_gain
+        opp_change = geometry.opp_change
+        other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        own_counts = self.window_counts[piece]
+        opp_counts = self.window_counts[other]
+        own_delta = opp_delta = 0
+        for w in geometry.cell_windows[index]:
+            own = own_counts[w]
+            opp = opp_counts[w]
+            own_delta += own_gain[own][opp]
+            opp_delta += opp_change[own][opp]
+            own_counts[w] = own + 1
+        self.scores[piece] += own_delta
+        self.scores[other] += opp_delta
+
+    def _remove_from_windows(self, geometry, index, piece):
+        own_gain = geometry.own_gain
+        opp_change = geometry.opp_change
+        other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        own_counts = self.window_counts[piece]
+        opp_counts = self.window_counts[other]
+        own_delta = opp_delta = 0
+        for w in geometry.cell_windows[index]:
+            own = own_counts[w] - 1
+            opp = opp_counts[w]
+            own_delta += own_gain[own][opp]
+            opp_delta += opp_change[own][opp]
+            own_counts[w] = own
+        self.scores[piece] -= own_delta
+        self.scores[other] -= opp_delta
+
+    def search_key(self, maximizingPlayer):
+        """Hash of the position together with the side to move."""
+        return self.key ^ self.geometry.side_key if maximizingPlayer else self.key
+
+    def canonical_key(self, maximizingPlayer):
+        """Return ``(key, mirrored)``: a search key shared by the position and
+        its mirror image, and whether it is the mirror image's. Moves stored
+        under the key are in the orientation of the key, so a mirrored lookup
+        maps them back with ``geometry.columns - 1 - col``."""
+        key = self.key
+        mirrored = self.mirror_key < key
+        if mirrored:
+            key = self.mirror_key
+        return (key ^ self.geometry.side_key if maximizingPlayer else key), mirrored
+
+    def is_symmetric(self):
+        return self.key == self.mirror_key
+
+    def distinct_moves(self):
+        """Valid moves, without the mirror images of other moves when the
+        board is symmetric: they lead to mirrored positions of equal value."""
+        moves = self.geometry.valid_moves[self.full]
+        if self.key != self.mirror_key:
+            return moves
+        last = self.geometry.columns - 1
+        return tuple(col for col in moves if 2 * col <= last)
+
+    # Evaluation
+    def count_fours(self, piece):
+        """Number of completed lines for ``piece`` (same as count_connected_fours)."""
+        return self.geometry.count_lines(self.masks[piece])
+
+    def score(self, piece):
+        """Heuristic score for ``piece`` (same as score_position), in O(1)."""
+        return self.scores[piece]
+
+    def full_score(self, piece):
+        """Heuristic score for ``piece`` recomputed from the masks."""
+        own = self.masks[piece]
+        opp = self.masks[PLAYER_PIECE if piece == AI_PIECE else AI_PIECE]
+        window_scores = self.geometry.window_scores
+        score = 0
+        for window in self.geometry.window_masks:
+            score += window_scores[(own & window).bit_count()][(opp & window).bit_count()]
+        return score
+
+
+def masks_to_string(player_mask, ai_mask, geometry=None):
+    """Convert a pair of bitboards to the row-major board string."""
+    geometry = geometry if geometry is not None else STANDARD
+    cells = []
+    for r in range(geometry.rows):
+        for c in range(geometry.columns):
+            bit = geometry.cell_bit(r, c)
+            if player_mask & bit:
+                cells.append(str(PLAYER_PIECE))
+            elif ai_mask & bit:
+                cells.append(str(AI_PIECE))
+            else:
+                cells.append(str(EMPTY))
+    return ''.join(cells)
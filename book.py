@@ -0,0 +1,192 @@
+"""Opening book: precomputed alpha-beta moves for the first plies of a game.
+
+The book is a binary file of fixed-size records sorted by position key, so a
+lookup is a binary search over a memory-mapped file and nothing is parsed at
+load time. Keys are canonical (see Position.canonical_key), so a position and
+its mirror image share one record. Build it offline, searching positions in
+parallel:
+
+    python book.py build --plies 4 --depth 9 --workers 8
+    python book.py probe 100000000000000000000000000000000000000000
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position
+from ordering import MoveOrderer
+from transposition import TranspositionTable
+from utils import minimax_alpha_beta
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+MAGIC = b"C4B2"  # Version 2: canonical keys
+HEADER = struct.Struct("<4sBBxxI")  # magic, plies, search depth, record count
+RECORD = struct.Struct("<Qbxh")     # canonical_key(True), best column in the key's orientation, score
+KEY = struct.Struct("<Q")
+
+
+class OpeningBook:
+    """Read-only view of a book file; ``lookup`` takes microseconds."""
+
+    def __init__(self, path=BOOK_PATH):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path} is not an opening book")
+        magic, self.plies, self.depth, self.size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.size * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def probe(self, key):
+        """Return ``(col, score)`` stored for a canonical key, or None."""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(self._map, HEADER.size + mid * RECORD.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.size:
+            found, col, score = RECORD.unpack_from(self._map, HEADER.size + lo * RECORD.size)
+            if found == key:
+                return col, score
+        return None
+
+    def lookup(self, board_str):
+        """Return ``(col, score)`` for the AI to move on ``board_str``, or None."""
+        position = Position.from_string(board_str)
+        if position.count > self.plies:
+            return None
+        key, mirrored = position.canonical_key(True)
+        entry = self.probe(key)
+        if entry is not None and mirrored:
+            return position.geometry.columns - 1 - entry[0], entry[1]
+        return entry
+
+
+def load_book(path=BOOK_PATH):
+    """Open the book at ``path``; None when there is no usable book there."""
+    try:
+        return OpeningBook(path)
+    except (OSError, ValueError):
+        return None
+
+
+def book_positions(plies):
+    """Board strings of every position with the AI to move and at most ``plies``
+    pieces, whichever side moved first, by canonical key. Of a position and
+    its mirror image only the one in the key's orientation is listed."""
+    positions = {}
+
+    def walk(position, piece):
+        if piece == AI_PIECE:
+            key, mirrored = position.canonical_key(True)
+            if not mirrored:
+                positions.setdefault(key, position.to_string())
+        if position.count == plies or position.is_full():
+            return
+        for col in position.valid_moves():
+            position.play(col, piece)
+            walk(position, PLAYER_PIECE if piece == AI_PIECE else AI_PIECE)
+            position.undo(col)
+
+    walk(Position(), PLAYER_PIECE)
+    walk(Position(), AI_PIECE)
+    return positions
+
+
+# Builder worker state, one table per process
+_tt = None
+_orderer = None
+
+
+def _init_builder():
+    global _tt, _orderer
+    _tt = TranspositionTable(4)
+    _orderer = MoveOrderer()
+
+
+def _search_book_position(task):
+    key, board_str, depth = task
+    # Each entry is an independent fixed-depth search, so nothing carries over
+    # from the positions this worker searched before; the book is then the same
+    # whatever the worker count and chunking
+    _tt.clear()
+    _orderer.clear()
+    col, score, _ = minimax_alpha_beta(board_str, depth, -math.inf, math.inf, True, _tt, _orderer)
+    return key, col, score
+
+
+def build_book(path=BOOK_PATH, plies=4, depth=9, workers=None, progress=None):
+    """Search every book position at ``depth`` on ``workers`` processes and
+    write the book to ``path``. Returns the number of records."""
+    tasks = [(key, board_str, depth) for key, board_str in book_positions(plies).items()]
+    records = []
+    with ProcessPoolExecutor(workers, initializer=_init_builder) as executor:
+        chunksize = max(1, len(tasks) // ((workers or os.cpu_count()) * 16))
+        for key, col, score in executor.map(_search_book_position, tasks, chunksize=chunksize):
+            records.append((key, col, score))
+            if progress is not None:
+                progress(len(records), len(tasks))
+
+    records.sort()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, plies, depth, len(records)))
+        for key, col, score in records:
+            f.write(RECORD.pack(key, col, int(score)))
+    os.replace(tmp_path, path)  # Readers never see a half-written book
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="search the opening positions and write a book")
+    build.add_argument("--plies", type=int, default=4, help="book positions with up to this many pieces")
+    build.add_argument("--depth", type=int, default=9, help="alpha-beta depth of each book search")
+    build.add_argument("--workers", type=int, default=os.cpu_count())
+    build.add_argument("--output", default=BOOK_PATH)
+    probe = commands.add_parser("probe", help="look up a board string")
+    probe.add_argument("board")
+    probe.add_argument("--book", default=BOOK_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        def progress(done, total):
+            if done % 100 == 0 or done == total:
+                print(f"\r{done}/{total} positions", end="", flush=True)
+        count = build_book(args.output, args.plies, args.depth, args.workers, progress)
+        print(f"\nwrote {count} positions to {args.output} in {time.perf_counter() - start:.1f}s")
+    else:
+        with OpeningBook(args.book) as book:
+            start = time.perf_counter()
+            entry = book.lookup(args.board)
+            elapsed = time.perf_counter() - start
+        print(f"{entry} ({elapsed * 1e6:.1f}us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Persistent search cache shared between processes through a SQLite file.
+
+Holds alpha-beta results like the transposition table, (position key, depth,
+value, bound, best move), but survives restarts, so a new move-service worker
+starts with everything earlier workers searched. SQLite in WAL mode lets any
+number of processes read while one writes; results are buffered and written
+in batches of ``batch_size``.
+
+The file is capped at ``max_entries``: every batch write evicts the least
+recently used entries beyond it, and with ``max_age`` the entries not used for
+that many seconds. Searches consult the cache below their in-memory table and
+only at nodes ``min_depth`` or more plies above the horizon, where a hit saves
+a subtree worth far more than the query.
+
+    python disk_cache.py stats search_cache.sqlite
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from bitboard import STANDARD
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.sqlite")
+FORMAT = 2  # PRAGMA user_version of cache files; version 2 keys entries by canonical_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    key INTEGER PRIMARY KEY,  -- canonical_key() as a signed 64-bit integer
+    depth INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    bound INTEGER NOT NULL,
+    move INTEGER,             -- in the key's orientation
+    used REAL NOT NULL        -- time.time() of the last store or hit
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+"""
+
+UPSERT = """
+INSERT INTO entries (key, depth, value, bound, move, used) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    depth = excluded.depth, value = excluded.value, bound = excluded.bound, move = excluded.move, used = excluded.used
+WHERE excluded.depth >= entries.depth
+"""
+
+
+def _to_sql(key):
+    """SQLite integers are signed; map the unsigned 64-bit key onto them."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class DiskCache:
+    """Search results of one board ``geometry`` kept in a SQLite file.
+
+    ``lookup`` and ``store`` mirror TranspositionTable. Stores and the use
+    times of hits are buffered until ``flush``, which searches call when they
+    finish; ``hits``, ``misses`` and ``stores`` are counted as in the table.
+    """
+
+    def __init__(self, path=CACHE_PATH, geometry=None, max_entries=1000000, max_age=None, min_depth=4,
+                 batch_size=1024):
+        self.path = path
+        self.geometry = geometry if geometry is not None else STANDARD
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.min_depth = min_depth
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)  # Transactions are explicit
+        self._db.execute("PRAGMA journal_mode=WAL")  # Readers never wait for the writer
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        new = self._db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+        if version != FORMAT and not new:
+            self._db.close()
+            raise ValueError(f"{path} is a version {version} cache, not version {FORMAT}; delete it")
+        self._db.executescript(SCHEMA)
+        self._db.execute(f"PRAGMA user_version = {FORMAT}")
+        shape = f"{self.geometry.rows}x{self.geometry.columns}/{self.geometry.connect}"
+        self._db.execute("INSERT OR IGNORE INTO meta VALUES ('geometry', ?)", (shape,))
+        stored = self._db.execute("SELECT value FROM meta WHERE name = 'geometry'").fetchone()[0]
+        if stored != shape:
+            self._db.close()
+            raise ValueError(f"{path} caches {stored} positions, not {shape}")
+        self._pending = {}     # Key -> (depth, value, bound, move) not yet written
+        self._touched = set()  # Keys hit since the last flush
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def lookup(self, key):
+        """Return ``(depth, value, bound, move)`` for ``key`` or None."""
+        entry = self._pending.get(key)
+        if entry is None:
+            row = self._db.execute("SELECT depth, value, bound, move FROM entries WHERE key = ?",
+                                   (_to_sql(key),)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            entry = row
+            self._touched.add(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, bound, move):
+        """Buffer a search result; a deeper one already buffered is kept."""
+        pending = self._pending.get(key)
+        if pending is None or depth >= pending[0]:
+            self._pending[key] = (depth, int(value), bound, move)
+            self.stores += 1
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered results and hit times in one transaction, then evict."""
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        rows = [(_to_sql(key), depth, value, bound, move, now)
+                for key, (depth, value, bound, move) in self._pending.items()]
+        touched = [(now, _to_sql(key)) for key in self._touched]
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(UPSERT, rows)
+            self._db.executemany("UPDATE entries SET used = ? WHERE key = ?", touched)
+            self._evict(now)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, now):
+        if self.max_age is not None:
+            self._db.execute("DELETE FROM entries WHERE used < ?", (now - self.max_age,))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._db.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)",
+                             (excess,))
+
+    def clear(self):
+        """Drop every entry, written or buffered."""
+        self._pending.clear()
+        self._touched.clear()
+        self._db.execute("DELETE FROM entries")
+        self.hits = self.misses = self.stores = 0
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def stats(self):
+        """Return the counters and size as a dict."""
+        probes = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "file_bytes": sum(os.path.getsize(name) for name in (self.path, self.path + "-wal")
+                              if os.path.exists(name)),
+        }
+
+
+def open_cache(path=CACHE_PATH, geometry=None, **options):
+    """Open the cache at ``path``; None when it cannot be used."""
+    try:
+        return DiskCache(path, geometry, **options)
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats = commands.add_parser("stats", help="print the size of a cache")
+    stats.add_argument("path", nargs="?", default=CACHE_PATH)
+    clear = commands.add_parser("clear", help="drop every entry of a cache")
+    clear.add_argument("path", nargs="?", default=CACHE_PATH)
+    args = parser.parse_args()
+
+    with DiskCache(args.path) as cache:
+        if args.command == "clear":
+            cache.clear()
+        print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
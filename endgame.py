@@ -0,0 +1,136 @@
+import math
+
+from bitboard import AI_PIECE, PLAYER_PIECE
+from transposition import EXACT, LOWER, UPPER
+
+ENDGAME_CELLS = 12  # Solve exactly once this few cells are empty
+MAX_ENTRIES = 1 << 18  # Memoized positions a solver keeps, about 140 bytes each
+
+
+def final_score(position):
+    """The game's real result on a full board: AI fours minus player fours."""
+    count_lines = position.geometry.count_lines
+    return count_lines(position.masks[AI_PIECE]) - count_lines(position.masks[PLAYER_PIECE])
+
+
+def score_bounds(position):
+    """Lowest and highest final_score still reachable from ``position``.
+
+    Fours already on the board stay there, and a side can at best complete
+    every window it has not been blocked from, so filling all empty cells with
+    one side's pieces bounds that side's final count.
+    """
+    count_lines = position.geometry.count_lines
+    ai = position.masks[AI_PIECE]
+    player = position.masks[PLAYER_PIECE]
+    empty = position.geometry.board_mask & ~(ai | player)
+    return count_lines(ai) - count_lines(player | empty), count_lines(ai | empty) - count_lines(player)
+
+
+class EndgameSolver:
+    """Exact alpha-beta on the final four-count difference.
+
+    Positions are memoized in ``table`` by canonical key, so a position and
+    its mirror image share an entry, together with the kind of bound their
+    value is, as in the transposition table; keep one solver around to reuse
+    it between moves of the same game. The table is emptied once it holds
+    ``max_entries`` positions.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.table = {}  # canonical key -> (value, bound, best column in the key's orientation)
+        self.max_entries = max_entries
+        self.nodes = 0
+
+    def clear(self):
+        """Forget every memoized position, as for a new game."""
+        self.table = {}
+
+    def solve(self, position, maximizingPlayer, alpha=-math.inf, beta=math.inf, context=None):
+        """Return ``(col, value)``: the best move and the exact final_score
+        with best play, or a bound on it when it lies outside (alpha, beta).
+
+        A utils.SearchContext passed as ``context`` counts the nodes against
+        its budgets and raises SearchAborted once one is spent or the search
+        is cancelled. ``position`` is then left mid-search, so solve a copy;
+        the table only ever holds finished results and stays usable."""
+        self.nodes += 1
+        if context is not None:
+            context.visit()
+        if position.is_full():
+            return None, final_score(position)
+
+        lower, upper = score_bounds(position)
+        if lower == upper:
+            return position.valid_moves()[0], lower  # Every continuation ends the same
+        if lower >= beta:
+            return position.valid_moves()[0], lower
+        if upper <= alpha:
+            return position.valid_moves()[0], upper
+        alpha = max(alpha, lower)
+        beta = min(beta, upper)
+
+        key, mirrored = position.canonical_key(maximizingPlayer)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            value, bound, table_move = entry
+            if mirrored and table_move is not None:
+                table_move = position.geometry.columns - 1 - table_move
+            if bound == EXACT:
+                return table_move, value
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return table_move, value
+        alpha_orig, beta_orig = alpha, beta
+
+        moves = list(position.geometry.center_moves[position.valid_moves()])
+        if table_move is not None:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        piece = AI_PIECE if maximizingPlayer else PLAYER_PIECE
+        best_col = None
+        value = -math.inf if maximizingPlayer else math.inf
+        for col in moves:
+            position.play(col, piece)
+            _, new_score = self.solve(position, not maximizingPlayer, alpha, beta, context)
+            position.undo(col)
+            if maximizingPlayer:
+                if new_score > value:
+                    value, best_col = new_score, col
+                alpha = max(alpha, value)
+            else:
+                if new_score < value:
+                    value, best_col = new_score, col
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if value <= alpha_orig:
+            bound = UPPER
+        elif value >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if len(self.table) >= self.max_entries:
+            self.table = {}
+        if mirrored and best_col is not None:
+            self.table[key] = (value, bound, position.geometry.columns - 1 - best_col)
+        else:
+            self.table[key] = (value, bound, best_col)
+        return best_col, value
+
+
+def should_solve(position, endgame_cells=ENDGAME_CELLS):
+    """True when ``position`` is close enough to the end to solve exactly."""
+    return endgame_cells is not None and position.geometry.size - position.count <= endgame_cells
+
+
+def solve_endgame(position, maximizingPlayer=True, solver=None):
+    """Return ``(col, value)`` with the exact final_score under best play."""
+    solver = solver if solver is not None else EndgameSolver()
+    return solver.solve(position, maximizingPlayer)
@@ -3,17 +3,21 @@ import sys
 import numpy as np
 import math
 from utils import *
+from ordering import MoveOrderer
+from endgame import EndgameSolver
+from search import iterative_deepening
+from transposition import TranspositionTable
+from tree import TREE_SAMPLED
+from bitboard import STANDARD, Position, get_geometry
+from worker import SearchJob
+from book import load_book
+from render import BoardView, TextCache, get_font
+from tree_view import TreeView
 
 # Constants
-SQUARESIZE = 100
-RADIUS = int(SQUARESIZE / 2 - 5)
-COLUMN_COUNT = 7
-ROW_COUNT = 6
-WIDTH = COLUMN_COUNT * SQUARESIZE
-HEIGHT = (ROW_COUNT + 1) * SQUARESIZE
+MAX_SQUARESIZE = 100
+BOARD_AREA = 700  # Largest width and height of the board area; squares shrink to fit big boards
 SIDE_PANEL_WIDTH = 250  # Width for the side panel to display scores and button
-TOTAL_WIDTH = WIDTH + SIDE_PANEL_WIDTH
-SIZE = (TOTAL_WIDTH, HEIGHT)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -29,16 +33,41 @@ AI_PIECE = 2
 EMPTY = 0
 
 class ConnectFourGUI:
-    def __init__(self):
+    def __init__(self, geometry=None):
+        self.geometry = geometry if geometry is not None else STANDARD
+        columns, rows = self.geometry.columns, self.geometry.rows
+        self.square = min(MAX_SQUARESIZE, BOARD_AREA // columns, BOARD_AREA // (rows + 1))
+        self.radius = int(self.square / 2 - 5)
+        self.width = columns * self.square
+        self.height = (rows + 1) * self.square
+        self.total_width = self.width + SIDE_PANEL_WIDTH
+        self.size = (self.total_width, self.height)
+
         pygame.init()
-        self.screen = pygame.display.set_mode(SIZE)
+        self.screen = pygame.display.set_mode(self.size)
         pygame.display.set_caption("Connect 4")
-        self.font = pygame.font.SysFont("monospace", 50)
-        self.small_font = pygame.font.SysFont("monospace", 30)
-        self.smaller_font = pygame.font.SysFont("monospace", 18)
+        self.font = get_font("monospace", 50)
+        self.small_font = get_font("monospace", 30)
+        self.smaller_font = get_font("monospace", 18)
         self.clock = pygame.time.Clock()
 
-        self.depth = 4
+        # Drawing only touches what changed: rendered text is cached, the board
+        # view blits the cells that differ from the last frame and the changed
+        # rectangles collect in `dirty` until `present` pushes them to the display
+        self.text = TextCache()
+        self.board_view = BoardView(self.geometry, self.square, self.radius, BLUE, BLACK,
+                                    {PLAYER_PIECE: RED, AI_PIECE: YELLOW})
+        self.dirty = []
+        self.shown = None  # Key of the screen on display; a different key means a full redraw
+        self.sidebar_background = None  # The unchanging part of the sidebar, once drawn
+
+        self.depth = 4  # Maximum depth; alpha-beta deepens iteratively up to it
+        self.move_time = 2.0  # Seconds the alpha-beta AI may think per move
+        self.tt = TranspositionTable()
+        self.orderer = MoveOrderer(geometry=self.geometry)
+        self.solver = EndgameSolver()  # Kept for the game, so pondering fills its table too
+        # Opening book consulted before the alpha-beta search, or None; books cover the standard board only
+        self.book = load_book() if self.geometry is STANDARD else None
         self.algorithm = minimax_alpha_beta
         self.algorithm_name = "Minimax Alpha-Beta"
         self.game_over = False
@@ -51,48 +80,94 @@ class ConnectFourGUI:
 
         # Add a flag to control when to update the scoreboard and button
         self.update_sidebar = True
-        self.current_root = None  # Initialize the current root for visualization
-        self.new_current_root = None  # For navigation
+        self.minimax_tree = None  # Root TreeNode of the last AI search
+        self.tree_mode = TREE_SAMPLED  # Record search trees for the visualizer ...
+        self.tree_max_nodes = 200000  # ... up to this many nodes per move
+
+        # Background search state
+        self.search_job = None  # SearchJob computing the AI's move
+        self.ponder_job = None  # SearchJob thinking on the predicted human reply
+        self.ponder_move = None  # The human reply the ponder job assumes
+        self.shown_progress = None  # Progress last drawn in the sidebar
 
     def draw_menu(self):
+        play_button = pygame.Rect(self.total_width // 2 - 100, self.height // 2 - 100, 200, 50)
+        settings_button = pygame.Rect(self.total_width // 2 - 100, self.height // 2, 200, 50)
+        if self.shown == "menu":
+            return play_button, settings_button  # Nothing on the menu changes while it is shown
+
         self.screen.fill(BLACK)
-        title_text = self.font.render("Connect 4", True, BLUE)
-        play_button = pygame.Rect(TOTAL_WIDTH // 2 - 100, HEIGHT // 2 - 100, 200, 50)
-        settings_button = pygame.Rect(TOTAL_WIDTH // 2 - 100, HEIGHT // 2, 200, 50)
+        title_text = self.text.render(self.font, "Connect 4", BLUE)
 
         pygame.draw.rect(self.screen, GRAY, play_button)
         pygame.draw.rect(self.screen, GRAY, settings_button)
 
-        play_text = self.small_font.render("Play", True, BLACK)
-        settings_text = self.small_font.render("Settings", True, BLACK)
+        play_text = self.text.render(self.small_font, "Play", BLACK)
+        settings_text = self.text.render(self.small_font, "Settings", BLACK)
 
-        self.screen.blit(title_text, (TOTAL_WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 4))
+        self.screen.blit(title_text, (self.total_width // 2 - title_text.get_width() // 2, self.height // 4))
         self.screen.blit(play_text, (
             play_button.x + (play_button.width - play_text.get_width()) // 2, play_button.y + 5))
         self.screen.blit(settings_text, (
             settings_button.x + (settings_button.width - settings_text.get_width()) // 2, settings_button.y + 5))
 
-        pygame.display.update()
+        self.shown = "menu"
+        self.dirty.append(self.screen.get_rect())
         return play_button, settings_button
 
     def draw_settings(self):
-        self.screen.fill(BLACK)
-
         # Depth settings
-        depth_text = self.small_font.render(f"Depth: {self.depth}", True, WHITE)
-        depth_up_button = pygame.Rect(TOTAL_WIDTH // 2 + 80, HEIGHT // 4 - 15, 30, 30)
-        depth_down_button = pygame.Rect(TOTAL_WIDTH // 2 - 110, HEIGHT // 4 - 15, 30, 30)
+        depth_up_button = pygame.Rect(self.total_width // 2 + 80, self.height // 4 - 15, 30, 30)
+        depth_down_button = pygame.Rect(self.total_width // 2 - 110, self.height // 4 - 15, 30, 30)
 
         # Algorithm settings
-        algorithm_text = self.small_font.render(f"Algorithm: {self.algorithm_name}", True, WHITE)
-        algo_toggle_button = pygame.Rect(TOTAL_WIDTH // 2 - 200, HEIGHT // 2 - 15, 400, 50)
+        algo_toggle_button = pygame.Rect(self.total_width // 2 - 200, self.height // 2 - 15, 400, 50)
 
         # Back button
-        back_button = pygame.Rect(TOTAL_WIDTH // 2 - 50, HEIGHT - 100, 100, 50)
+        back_button = pygame.Rect(self.total_width // 2 - 50, self.height - 100, 100, 50)
+
+        # Redraw only when a setting changed since the screen was last drawn
+        shown = ("settings", self.depth, self.algorithm_name)
+        if self.shown != shown:
+            self.shown = shown
+            self.draw_settings_screen(depth_up_button, depth_down_button, algo_toggle_button, back_button)
+
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                pos = pygame.mouse.get_pos()
+                if depth_up_button.collidepoint(pos):
+                    self.depth += 1
+                    self.update_sidebar = True  # Update sidebar
+                elif depth_down_button.collidepoint(pos) and self.depth > 1:
+                    self.depth -= 1
+                    self.update_sidebar = True  # Update sidebar
+                elif algo_toggle_button.collidepoint(pos):
+                    # Toggle algorithm and update the function reference and name
+                    if self.algorithm_name == "Minimax Alpha-Beta":
+                        self.algorithm_name = "Expectiminimax"
+                        self.algorithm = expecti_minimax  # Assign function reference
+                    elif self.algorithm_name == "Expectiminimax":
+                        self.algorithm_name = "Minimax"
+                        self.algorithm = minimax  # Assign function reference
+                    else:
+                        self.algorithm_name = "Minimax Alpha-Beta"
+                        self.algorithm = minimax_alpha_beta  # Assign function reference
+                    self.update_sidebar = True  # Update sidebar
+                elif back_button.collidepoint(pos):
+                    self.state = "menu"
+
+    def draw_settings_screen(self, depth_up_button, depth_down_button, algo_toggle_button, back_button):
+        self.screen.fill(BLACK)
+        depth_text = self.text.render(self.small_font, f"Depth: {self.depth}", WHITE)
+        algorithm_text = self.text.render(self.small_font, f"Algorithm: {self.algorithm_name}", WHITE)
 
         # Draw depth controls
         self.screen.blit(depth_text, (
-            TOTAL_WIDTH // 2 - depth_text.get_width() // 2, HEIGHT // 4 - 50))
+            self.total_width // 2 - depth_text.get_width() // 2, self.height // 4 - 50))
 
         pygame.draw.rect(self.screen, GRAY, depth_up_button)
         pygame.draw.polygon(
@@ -116,9 +191,9 @@ class ConnectFourGUI:
 
         # Draw algorithm toggle
         self.screen.blit(algorithm_text, (
-            TOTAL_WIDTH // 2 - algorithm_text.get_width() // 2, HEIGHT // 2 - 50))
+            self.total_width // 2 - algorithm_text.get_width() // 2, self.height // 2 - 50))
         pygame.draw.rect(self.screen, GRAY, algo_toggle_button)
-        algo_toggle_text = self.small_font.render("Toggle Algorithm", True, BLACK)
+        algo_toggle_text = self.text.render(self.small_font, "Toggle Algorithm", BLACK)
         self.screen.blit(
             algo_toggle_text,
             (
@@ -129,137 +204,16 @@ class ConnectFourGUI:
 
         # Draw back button
         pygame.draw.rect(self.screen, GRAY, back_button)
-        back_text = self.small_font.render("Back", True, BLACK)
+        back_text = self.text.render(self.small_font, "Back", BLACK)
         self.screen.blit(
             back_text,
             (back_button.x + (back_button.width - back_text.get_width()) // 2, back_button.y + 10),
         )
-
-        pygame.display.update()
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
-                if depth_up_button.collidepoint(pos):
-                    self.depth += 1
-                    self.update_sidebar = True  # Update sidebar
-                elif depth_down_button.collidepoint(pos) and self.depth > 1:
-                    self.depth -= 1
-                    self.update_sidebar = True  # Update sidebar
-                elif algo_toggle_button.collidepoint(pos):
-                    # Toggle algorithm and update the function reference and name
-                    if self.algorithm_name == "Minimax Alpha-Beta":
-                        self.algorithm_name = "Expectiminimax"
-                        self.algorithm = expecti_minimax  # Assign function reference
-                    elif self.algorithm_name == "Expectiminimax":
-                        self.algorithm_name = "Minimax"
-                        self.algorithm = minimax  # Assign function reference
-                    else:
-                        self.algorithm_name = "Minimax Alpha-Beta"
-                        self.algorithm = minimax_alpha_beta  # Assign function reference
-                    self.update_sidebar = True  # Update sidebar
-                elif back_button.collidepoint(pos):
-                    self.state = "menu"
+        self.dirty.append(self.screen.get_rect())
 
     def draw_board(self, board):
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT):
-                pygame.draw.rect(self.screen, BLUE, (
-                    c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE, SQUARESIZE, SQUARESIZE))
-                pygame.draw.circle(self.screen, BLACK, (
-                    int(c * SQUARESIZE + SQUARESIZE / 2),
-                    int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT):
-                if board[r][c] == PLAYER_PIECE:
-                    pygame.draw.circle(self.screen, RED, (
-                        int(c * SQUARESIZE + SQUARESIZE / 2),
-                        HEIGHT - int(r * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-                elif board[r][c] == AI_PIECE:
-                    pygame.draw.circle(self.screen, YELLOW, (
-                        int(c * SQUARESIZE + SQUARESIZE / 2),
-                        HEIGHT - int(r * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-    
-    def reset_expanded_state(self, node):
-        node.expanded = False
-        for child in node.children:
-            self.reset_expanded_state(child)
-    
-    def handle_node_click(self, node, pos):
-        if node.rect and node.rect.collidepoint(pos):
-            if node == self.current_root and node.parent:
-                # Clicking on the current root node and it has a parent, so navigate back
-                self.new_current_root = node.parent
-                self.reset_expanded_state(self.new_current_root)  # Reset expanded state when navigating back
-                self.new_current_root.expanded = True  # Ensure the new current root is expanded
-            elif node != self.current_root:
-                # Clicking on a child node, navigate to it
-                self.new_current_root = node
-                node.expanded = True  # Expand the clicked node
-            # If node == self.current_root and no parent, do nothing (we're at the top)
-            return True
-        # Check child nodes
-        for child in node.children:
-            if self.handle_node_click(child, pos):
-                return True
-        return False
-
-    def draw_tree(self, screen, node, x, y):
-        node_radius = 40  # Larger node radius for better visibility
-        node_color = RED if node.player == PLAYER_PIECE else YELLOW
-        pygame.draw.circle(screen, node_color, (x, y), node_radius)
-        pygame.draw.circle(screen, WHITE, (x, y), node_radius, 2)
-
-        font = pygame.font.SysFont("monospace", 20)
-        # Display score inside the circle
-        score_text = font.render(f"{node.score}", True, BLACK)
-        score_rect = score_text.get_rect(center=(x, y))
-        screen.blit(score_text, score_rect)
-
-        # Display move number below the circle
-        move_text = font.render(f"Move: {node.move}", True, WHITE)
-        move_rect = move_text.get_rect(center=(x, y + node_radius + 20))
-        screen.blit(move_text, move_rect)
-
-        # Assign position and rect for click detection
-        node.position = (x, y)
-        node.rect = pygame.Rect(x - node_radius, y - node_radius, node_radius * 2, node_radius * 2)
-
-        # Draw immediate children if the node is expanded
-        if node.expanded and node.children:
-            num_children = len(node.children)
-            spacing = 800 // (num_children + 1)  # Adjust horizontal spacing
-            for i, child in enumerate(node.children):
-                child_x = spacing * (i + 1)
-                child_y = y + 200  # Vertical distance to child nodes
-
-                # Draw the connection line
-                pygame.draw.line(screen, WHITE, (x, y + node_radius), (child_x, child_y - 30))
-
-                # Draw child node
-                child_radius = 40  # Larger child node radius
-                child_color = RED if child.player == PLAYER_PIECE else YELLOW
-                pygame.draw.circle(screen, child_color, (child_x, child_y), child_radius)
-                pygame.draw.circle(screen, WHITE, (child_x, child_y), child_radius, 2)
-
-                # Display child's score inside the circle
-                child_score_text = font.render(f"{child.score}", True, BLACK)
-                child_score_rect = child_score_text.get_rect(center=(child_x, child_y))
-                screen.blit(child_score_text, child_score_rect)
-
-                # Display child's move number below the circle
-                child_move_text = font.render(f"Move: {child.move}", True, WHITE)
-                child_move_rect = child_move_text.get_rect(center=(child_x, child_y + child_radius + 20))
-                screen.blit(child_move_text, child_move_rect)
-
-              # Assign position and rect for click detection
-                child.position = (child_x, child_y)
-                child.rect = pygame.Rect(child_x - child_radius, child_y - child_radius, child_radius * 2, child_radius * 2)
-                child.parent = node  # Ensure the parent reference is set
+        """Blit the cells that changed since the board was last drawn."""
+        self.dirty.extend(self.board_view.draw(self.screen, board))
 
     def visualize_tree(self):
         saved_screen = self.screen
@@ -267,76 +221,91 @@ class ConnectFourGUI:
         pygame.display.set_caption("Minimax Tree Visualization")
         running = True
 
-        if self.minimax_tree:
-            self.current_root = self.minimax_tree
-            self.new_current_root = None
-            self.reset_expanded_state(self.minimax_tree)  # Reset expanded state
-            self.current_root.expanded = True  # Ensure the root node is expanded
-        else:
+        if self.minimax_tree is None:
             # Display a message if the tree is not available
-            font = pygame.font.SysFont("monospace", 30)
-            text = font.render("No tree to display", True, WHITE)
+            text = self.text.render(self.small_font, "No tree to display", WHITE)
             visualize_screen.fill(BLACK)
             visualize_screen.blit(text, (100, 100))
             pygame.display.update()
             pygame.time.wait(2000)
-            pygame.display.set_mode(SIZE)
-            pygame.display.set_caption("Connect 4")
-            self.screen = saved_screen
+            self.close_visualizer(saved_screen)
             return
 
+        # Only the node on display and one page of its children are drawn
+        view = TreeView(self.minimax_tree.tree, self.minimax_tree.index, 800, 600, self.text)
+        redraw = True  # The view only changes on a click or key
         while running:
             for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                     running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    pos = event.pos
-                    self.handle_node_click(self.current_root, pos)
-                    if self.new_current_root:
-                        self.current_root = self.new_current_root
-                        self.new_current_root = None
+                else:
+                    redraw |= view.handle_event(event)
 
-            visualize_screen.fill(BLACK)
-            if self.current_root:
-                self.draw_tree(visualize_screen, self.current_root, 400, 100)
-            else:
-                font = pygame.font.SysFont("monospace", 30)
-                text = font.render("No tree to display", True, WHITE)
-                visualize_screen.blit(text, (100, 100))
-            pygame.display.update()
+            if redraw:
+                view.draw(visualize_screen)
+                pygame.display.update()
+                redraw = False
             self.clock.tick(30)
 
-        pygame.display.set_mode(SIZE)
+        self.close_visualizer(saved_screen)
+
+    def close_visualizer(self, saved_screen):
+        """Go back to the game window, which is then drawn again in full."""
+        pygame.display.set_mode(self.size)
         pygame.display.set_caption("Connect 4")
         self.screen = saved_screen
+        self.shown = None
 
     def draw_sidebar(self):
-        # Draw the sidebar background
-        pygame.draw.rect(self.screen, DARK_GRAY, (WIDTH, 0, SIDE_PANEL_WIDTH, HEIGHT))
+        # The background, buttons and fixed labels are drawn once and kept
+        sidebar = pygame.Rect(self.width, 0, SIDE_PANEL_WIDTH, self.height)
+        if self.sidebar_background is None:
+            self.draw_sidebar_background(sidebar)
+            self.sidebar_background = self.screen.subsurface(sidebar).copy()
+        else:
+            self.screen.blit(self.sidebar_background, sidebar)
+        self.dirty.append(sidebar)
 
         # Draw the scores
-        player_score_text = self.small_font.render(f"Player: {self.player_score}", True, RED)
-        ai_score_text = self.small_font.render(f"AI: {self.ai_score}", True, YELLOW)
-        self.screen.blit(player_score_text, (WIDTH + 10, 20))
-        self.screen.blit(ai_score_text, (WIDTH + 10, 60))
+        player_score_text = self.text.render(self.small_font, f"Player: {self.player_score}", RED)
+        ai_score_text = self.text.render(self.small_font, f"AI: {self.ai_score}", YELLOW)
+        self.screen.blit(player_score_text, (self.width + 10, 20))
+        self.screen.blit(ai_score_text, (self.width + 10, 60))
 
         # Draw the current algorithm
-        algorithm_label = self.small_font.render("Algorithm:", True, WHITE)
-        algorithm_name_text = self.smaller_font.render(self.algorithm_name, True, WHITE)  # Use smaller font
-        self.screen.blit(algorithm_label, (WIDTH + 10, 110))
-        self.screen.blit(algorithm_name_text, (WIDTH + 10, 140))
+        algorithm_name_text = self.text.render(self.smaller_font, self.algorithm_name, WHITE)  # Use smaller font
+        self.screen.blit(algorithm_name_text, (self.width + 10, 140))
 
         # Draw the current depth
-        depth_text = self.small_font.render(f"Depth: {self.depth}", True, WHITE)
-        self.screen.blit(depth_text, (WIDTH + 10, 180))
+        depth_text = self.text.render(self.small_font, f"Depth: {self.depth}", WHITE)
+        self.screen.blit(depth_text, (self.width + 10, 180))
+        time_text = self.text.render(self.smaller_font, f"Time limit: {self.move_time}s", WHITE)
+        self.screen.blit(time_text, (self.width + 10, 220))
+
+        # Draw the progress of the running search
+        if self.search_job is not None:
+            if self.search_job.progress is not None:
+                depth, col, _, nps = self.search_job.progress
+                lines = ["Thinking...", f"depth {depth}, best {col}", f"{nps / 1000:.1f}k nodes/s"]
+            else:
+                lines = ["Thinking..."]
+            for i, line in enumerate(lines):
+                progress_text = self.text.render(self.smaller_font, line, WHITE)
+                self.screen.blit(progress_text, (self.width + 10, 255 + i * 22))
+
+    def draw_sidebar_background(self, sidebar):
+        # Draw the sidebar background
+        pygame.draw.rect(self.screen, DARK_GRAY, sidebar)
+        algorithm_label = self.text.render(self.small_font, "Algorithm:", WHITE)
+        self.screen.blit(algorithm_label, (self.width + 10, 110))
 
         # Draw the "Visualize Tree" button
-        visualize_button = pygame.Rect(WIDTH + 10, HEIGHT - 190, 180, 80)
+        visualize_button = pygame.Rect(self.width + 10, self.height - 190, 180, 80)
         pygame.draw.rect(self.screen, GRAY, visualize_button)
         
         # Split the text into two lines
-        visualize_text_line1 = self.small_font.render("Visualize", True, BLACK)
-        visualize_text_line2 = self.small_font.render("Tree", True, BLACK)
+        visualize_text_line1 = self.text.render(self.small_font, "Visualize", BLACK)
+        visualize_text_line2 = self.text.render(self.small_font, "Tree", BLACK)
         self.screen.blit(
             visualize_text_line1,
             (
@@ -353,9 +322,9 @@ class ConnectFourGUI:
         )
 
         # Draw the "Back" button
-        back_button = pygame.Rect(WIDTH + 10, HEIGHT - 90, 180, 40)
+        back_button = pygame.Rect(self.width + 10, self.height - 90, 180, 40)
         pygame.draw.rect(self.screen, GRAY, back_button)
-        back_text = self.small_font.render("Back", True, BLACK)
+        back_text = self.text.render(self.small_font, "Back", BLACK)
         self.screen.blit(
             back_text,
             (
@@ -364,113 +333,218 @@ class ConnectFourGUI:
             ),
         )
 
-    def main_loop(self):
-        while True:
-            if self.state == "menu":
-                play_button, settings_button = self.draw_menu()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        pos = pygame.mouse.get_pos()
-                        if play_button.collidepoint(pos):
-                            self.state = "game"
-                            self.game_over = False
-                            self.board = np.zeros((ROW_COUNT, COLUMN_COUNT))
-                            self.turn = 0
-                            # Reset scores
-                            self.player_score = 0
-                            self.ai_score = 0
-                            self.update_sidebar = True  # Update sidebar on game start
-                        elif settings_button.collidepoint(pos):
-                            self.state = "settings"
-
-            elif self.state == "settings":
-                self.draw_settings()
-
-            elif self.state == "game":
-                self.draw_board(self.board)
-                if self.update_sidebar:
-                    self.draw_sidebar()
-                    self.update_sidebar = False  # Reset flag after updating
-
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    if event.type == pygame.MOUSEMOTION and self.turn == 0:
-                        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
-                        posx = event.pos[0]
-                        if posx < WIDTH:
-                            pygame.draw.circle(self.screen, RED, (
-                                posx, int(SQUARESIZE / 2)), RADIUS)
-                        pygame.display.update()
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        pos = event.pos
-                        if pos[0] > WIDTH:
-                            # Check if the "Visualize Tree" button is clicked
-                            visualize_button = pygame.Rect(WIDTH + 10, HEIGHT - 190, 180, 80)
-                            back_button = pygame.Rect(WIDTH + 10, HEIGHT - 90, 180, 40)
-                            if visualize_button.collidepoint(pos):
-                                self.visualize_tree()
-                            elif back_button.collidepoint(pos):
-                                self.state = "menu"
-                        elif self.turn == 0 and pos[0] < WIDTH:
-                            pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
-                            posx = pos[0]
-                            col = int(math.floor(posx / SQUARESIZE))
-
-                            if is_valid_location(self.board, col):
-                                row = get_next_open_row(self.board, col)
-                                drop_piece(self.board, row, col, PLAYER_PIECE)
-
-                                # Update player score after move
-                                self.player_score = count_connected_fours(self.board, PLAYER_PIECE)
-                                self.update_sidebar = True  # Update sidebar after move
-
-                                self.turn = 1
-                                self.draw_board(self.board)
-
-                if self.turn == 1 and not self.game_over:
-                    # AI's Turn
-                    board_str = array_to_string(self.board)
-                    if self.algorithm_name == "Minimax":
-                        col, _, minimax_tree_root = self.algorithm(board_str, self.depth, True)
-                        self.minimax_tree = minimax_tree_root
-                    else:
-                        col, _, minimax_tree_root = self.algorithm(board_str, self.depth, -math.inf, math.inf, True)
-                        self.minimax_tree = minimax_tree_root
+    def start_search(self, board_str, time_limit):
+        """Start a SearchJob for the AI to move on ``board_str``.
+
+        Every algorithm stops when the job is cancelled; only alpha-beta
+        reports progress and honours ``time_limit``, since the full-width
+        searches have no move to return before they finish. Alpha-beta plays
+        book positions straight from the opening book.
+        """
+        depth = self.depth
+        tree_mode = self.tree_mode
+        max_nodes = self.tree_max_nodes
+        geometry = self.geometry
+        book_entry = None
+        if self.algorithm_name == "Minimax Alpha-Beta" and self.book is not None:
+            book_entry = self.book.lookup(board_str)
+        if book_entry is not None:
+            def search(stop_event, report):
+                return book_entry[0], book_entry[1], None  # No search tree for a book move
+        elif self.algorithm_name == "Minimax Alpha-Beta":
+            def search(stop_event, report):
+                return iterative_deepening(
+                    board_str, depth, time_limit=time_limit, tt=self.tt, orderer=self.orderer,
+                    tree_mode=tree_mode, max_nodes=max_nodes, stop_event=stop_event, on_iteration=report,
+                    geometry=geometry, solver=self.solver)[:3]
+        elif self.algorithm_name == "Minimax":
+            algorithm = self.algorithm
+            def search(stop_event, report):
+                return algorithm(board_str, depth, True, tree_mode=tree_mode, max_nodes=max_nodes, geometry=geometry,
+                                 stop_event=stop_event)
+        else:
+            algorithm = self.algorithm
+            def search(stop_event, report):
+                return algorithm(board_str, depth, -math.inf, math.inf, True, tree_mode=tree_mode, max_nodes=max_nodes,
+                                 geometry=geometry, stop_event=stop_event)
+        return SearchJob(search).start()
+
+    def start_ponder(self):
+        """Think on the reply the last search expects from the human."""
+        if self.algorithm_name != "Minimax Alpha-Beta":
+            return
+        position = Position.from_array(self.board, self.geometry)
+        if position.is_full():
+            return
+        key, mirrored = position.canonical_key(False)
+        entry = self.tt.lookup(key)
+        if entry is None or entry[3] is None:
+            return
+        move = self.geometry.columns - 1 - entry[3] if mirrored else entry[3]
+        if not position.can_play(move):
+            return
+        self.ponder_move = move
+        position.play(self.ponder_move, PLAYER_PIECE)
+        if position.is_full():
+            return
+        self.ponder_job = self.start_search(position.to_string(), None)
 
-                    if is_valid_location(self.board, col):
-                        row = get_next_open_row(self.board, col)
-                        drop_piece(self.board, row, col, AI_PIECE)
+    def cancel_searches(self, wait=True):
+        """Stop the background searches; without ``wait`` their daemon threads
+        are left to wind down on their own, as when the window closes."""
+        for job in (self.search_job, self.ponder_job):
+            if job is not None:
+                job.cancel(wait)
+        self.search_job = None
+        self.ponder_job = None
 
-                        # Update AI score after move
-                        self.ai_score = count_connected_fours(self.board, AI_PIECE)
-                        self.update_sidebar = True  # Update sidebar after move
+    def main_loop(self):
+        while True:
+            self.frame()
+            self.present()
+            self.clock.tick(60)
 
+    def frame(self):
+        """Handle the events of one frame and draw what they changed."""
+        if self.state == "menu":
+            play_button, settings_button = self.draw_menu()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    pos = pygame.mouse.get_pos()
+                    if play_button.collidepoint(pos):
+                        self.state = "game"
+                        self.game_over = False
+                        self.board = np.zeros((self.geometry.rows, self.geometry.columns))
+                        self.tt.clear()
+                        self.solver.clear()
                         self.turn = 0
-                        self.draw_board(self.board)
-
-                # **Only set game over when the board is full**
-                if np.count_nonzero(self.board) == ROW_COUNT * COLUMN_COUNT:
-                    # Determine the winner based on scores
-                    if self.player_score > self.ai_score:
-                        label = self.font.render(f"Player wins! ({self.player_score}-{self.ai_score})", True, RED)
-                    elif self.ai_score > self.player_score:
-                        label = self.font.render(f"AI wins! ({self.ai_score}-{self.player_score})", True, YELLOW)
-                    else:
-                        label = self.font.render("It's a tie!", True, BLUE)
+                        # Reset scores
+                        self.player_score = 0
+                        self.ai_score = 0
+                        self.update_sidebar = True  # Update sidebar on game start
+                    elif settings_button.collidepoint(pos):
+                        self.state = "settings"
+
+        elif self.state == "settings":
+            self.draw_settings()
+
+        elif self.state == "game":
+            if self.shown != "game":
+                # Coming from another screen: clear it and draw everything once
+                self.screen.fill(BLACK)
+                self.board_view.invalidate()
+                self.dirty.append(self.screen.get_rect())
+                self.update_sidebar = True
+                self.shown = "game"
+            self.draw_board(self.board)
+            if self.search_job is not None and self.search_job.progress != self.shown_progress:
+                self.shown_progress = self.search_job.progress
+                self.update_sidebar = True  # Stream search progress
+            if self.update_sidebar:
+                self.draw_sidebar()
+                self.update_sidebar = False  # Reset flag after updating
 
-                    self.screen.blit(label, (40, 10))
-                    pygame.display.update()
-                    pygame.time.wait(5000)
-                    self.state = "menu"
-                    continue  # Restart loop to go back to menu
-
-            self.clock.tick(60)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.cancel_searches(wait=False)
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.MOUSEMOTION and self.turn == 0:
+                    posx = event.pos[0]
+                    self.dirty.extend(self.board_view.draw_held(
+                        self.screen, posx if posx < self.width else None, PLAYER_PIECE))
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    pos = event.pos
+                    if pos[0] > self.width:
+                        # Check if the "Visualize Tree" button is clicked
+                        visualize_button = pygame.Rect(self.width + 10, self.height - 190, 180, 80)
+                        back_button = pygame.Rect(self.width + 10, self.height - 90, 180, 40)
+                        if visualize_button.collidepoint(pos):
+                            self.visualize_tree()
+                        elif back_button.collidepoint(pos):
+                            self.cancel_searches()
+                            self.state = "menu"
+                    elif self.turn == 0 and pos[0] < self.width:
+                        self.dirty.extend(self.board_view.draw_held(self.screen, None, PLAYER_PIECE))
+                        posx = pos[0]
+                        col = int(math.floor(posx / self.square))
+
+                        if is_valid_location(self.board, col):
+                            row = get_next_open_row(self.board, col)
+                            drop_piece(self.board, row, col, PLAYER_PIECE)
+
+                            # Update player score after move
+                            self.player_score = count_connected_fours(self.board, PLAYER_PIECE, self.geometry)
+                            self.update_sidebar = True  # Update sidebar after move
+
+                            self.turn = 1
+                            self.draw_board(self.board)
+
+                            if self.ponder_job is not None:
+                                if col == self.ponder_move:
+                                    # Ponder hit: keep its search, now on the clock
+                                    self.search_job = self.ponder_job
+                                    self.search_job.stop_after(self.move_time)
+                                else:
+                                    self.ponder_job.cancel()
+                                self.ponder_job = None
+
+            if self.turn == 1 and not self.game_over and self.state == "game":
+                # AI's Turn, searched on a background thread so events keep flowing
+                if self.search_job is None:
+                    self.search_job = self.start_search(array_to_string(self.board), self.move_time)
+                    self.update_sidebar = True
+
+            if self.turn == 1 and self.search_job is not None and self.search_job.done():
+                col, _, minimax_tree_root = self.search_job.get_result()
+                self.minimax_tree = minimax_tree_root
+                self.search_job = None
+                self.update_sidebar = True
+
+                if col is not None and is_valid_location(self.board, col):
+                    row = get_next_open_row(self.board, col)
+                    drop_piece(self.board, row, col, AI_PIECE)
+
+                    # Update AI score after move
+                    self.ai_score = count_connected_fours(self.board, AI_PIECE, self.geometry)
+                    self.update_sidebar = True  # Update sidebar after move
+
+                    self.turn = 0
+                    self.draw_board(self.board)
+                    self.start_ponder()
+
+            # **Only set game over when the board is full**
+            if np.count_nonzero(self.board) == self.geometry.rows * self.geometry.columns:
+                # Determine the winner based on scores
+                if self.player_score > self.ai_score:
+                    label = self.font.render(f"Player wins! ({self.player_score}-{self.ai_score})", True, RED)
+                elif self.ai_score > self.player_score:
+                    label = self.font.render(f"AI wins! ({self.ai_score}-{self.player_score})", True, YELLOW)
+                else:
+                    label = self.font.render("It's a tie!", True, BLUE)
+
+                self.dirty.append(self.screen.blit(label, (40, 10)))
+                self.present()
+                self.cancel_searches()
+                pygame.time.wait(5000)
+                self.state = "menu"
+                return  # Back to the menu next frame
+
+    def present(self):
+        """Push the rectangles changed since the last call to the display."""
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
 
 if __name__ == "__main__":
-    game = ConnectFourGUI()
+    import argparse
+    parser = argparse.ArgumentParser(description="Play Connect Four against the AI.")
+    parser.add_argument("--rows", type=int, default=STANDARD.rows)
+    parser.add_argument("--columns", type=int, default=STANDARD.columns)
+    parser.add_argument("--connect", type=int, default=STANDARD.connect, help="pieces in a row that score a line")
+    args = parser.parse_args()
+    game = ConnectFourGUI(get_geometry(args.rows, args.columns, args.connect))
     game.main_loop()
\ No newline at end of file
@@ -1,14 +1,20 @@
 from utils import *
+from search import iterative_deepening
+from endgame import EndgameSolver
+from stats import SearchStats
+from book import load_book
+from bitboard import STANDARD
 import numpy as np
 import pygame
 import sys
 import math
 
 # Constants
-ROW_COUNT = 6
-COLUMN_COUNT = 7
+GEOMETRY = STANDARD  # Board shape; e.g. bitboard.get_geometry(8, 9) for a larger board
+ROW_COUNT = GEOMETRY.rows
+COLUMN_COUNT = GEOMETRY.columns
 
-SQUARESIZE = 100
+SQUARESIZE = min(100, 700 // COLUMN_COUNT, 700 // (ROW_COUNT + 1))  # Shrink squares to fit large boards
 RADIUS = int(SQUARESIZE / 2 - 5)
 BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
@@ -19,7 +25,10 @@ EMPTY = 0
 AI_PIECE = 2
 PLAYER_PIECE = 1
 
-DEPTH = 1  # Depth for the Minimax algorithm
+DEPTH = 4  # Maximum depth for the iterative-deepening search
+MOVE_TIME = 1.0  # Seconds the AI may think per move
+BOOK = load_book() if GEOMETRY is STANDARD else None  # Opening book, or None when opening_book.bin has not been built
+SOLVER = EndgameSolver()  # One for the game, so each move reuses the last one's endgame table
 
 def draw_board(board):
     for c in range(COLUMN_COUNT):
@@ -81,8 +90,8 @@ while not game_over:
 
                 if np.count_nonzero(board) == ROW_COUNT * COLUMN_COUNT:
                     # Count connected fours and display results
-                    player_score = count_connected_fours(board, PLAYER_PIECE)
-                    ai_score = count_connected_fours(board, AI_PIECE)
+                    player_score = count_connected_fours(board, PLAYER_PIECE, GEOMETRY)
+                    ai_score = count_connected_fours(board, AI_PIECE, GEOMETRY)
 
                     if player_score > ai_score:
                         label = myfont.render(f"Player wins! ({player_score}-{ai_score})", 1, RED)
@@ -99,9 +108,15 @@ while not game_over:
 
     if turn == 1 and not game_over:  # AI turn
         board_str = array_to_string(board)  # Convert board to string
-        print(f"Board string: {board_str}")  # Debugging print statement
-        col, _, minimax_tree_root = minimax(board_str, DEPTH, True)
-        traverse_tree(minimax_tree_root)
+        book_entry = BOOK.lookup(board_str) if BOOK is not None else None
+        if book_entry is not None:
+            col, score = book_entry
+            print(f"Book move: {col} (score {score})")
+        else:
+            stats = SearchStats()
+            col, score, _, _ = iterative_deepening(board_str, DEPTH, time_limit=MOVE_TIME, stats=stats, geometry=GEOMETRY,
+                                                   solver=SOLVER)
+            stats.log(board=board_str, move=col, score=score)  # One JSON line per AI move on stderr
 
         if is_valid_location(board, col):
             row = get_next_open_row(board, col)
@@ -109,8 +124,8 @@ while not game_over:
 
             if np.count_nonzero(board) == ROW_COUNT * COLUMN_COUNT:
                 # Count connected fours and display results
-                player_score = count_connected_fours(board, PLAYER_PIECE)
-                ai_score = count_connected_fours(board, AI_PIECE)
+                player_score = count_connected_fours(board, PLAYER_PIECE, GEOMETRY)
+                ai_score = count_connected_fours(board, AI_PIECE, GEOMETRY)
 
                 if player_score > ai_score:
                     label = myfont.render(f"Player wins! ({player_score}-{ai_score})", 1, RED)
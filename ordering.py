@@ -0,0 +1,84 @@
+from bitboard import STANDARD
+
+
+def _promote(moves, col, front):
+    """Move ``col`` to index ``front`` unless it is absent or already ahead of it.
+
+    Returns the (possibly copied) moves and the next front index.
+    """
+    if col is None or col not in moves:
+        return moves, front
+    i = moves.index(col)
+    if i < front:
+        return moves, front
+    if i > front:
+        moves = list(moves) if isinstance(moves, tuple) else moves
+        moves.insert(front, moves.pop(i))
+    return moves, front + 1
+
+
+class MoveOrderer:
+    """Orders moves for alpha-beta, each heuristic individually switchable.
+
+    Moves are tried in this order: the transposition table's best move, then
+    the killer moves recorded for the current ply, then the remaining moves by
+    history score, with center-first (or plain left-to-right) order breaking
+    ties. Searches call ``record_cutoff`` whenever a move causes a cutoff.
+    The tables are sized for one board ``geometry`` (STANDARD by default).
+    """
+
+    def __init__(self, center=True, killers=True, history=True, tt_move=True, geometry=None):
+        self.center = center
+        self.use_killers = killers
+        self.use_history = history
+        self.tt_move = tt_move
+        self.geometry = geometry if geometry is not None else STANDARD
+        self.killers = [[None, None] for _ in range(self.geometry.size + 1)]  # Two slots per ply
+        self.history = [[0] * self.geometry.bits for _ in range(3)]  # By piece, then cell index
+
+    def order(self, position, moves, ply, piece, tt_move=None):
+        """Return ``moves`` (columns) in the order they should be searched.
+
+        The result may be ``moves`` itself or a shared tuple; callers must not
+        modify it. At most one new list is built per call.
+        """
+        if self.center:
+            moves = self.geometry.center_moves[tuple(moves)]
+        if self.use_history:
+            history = self.history[piece]
+            heights = position.heights
+            h1 = self.geometry.h1
+            moves = sorted(moves, key=lambda col: -history[col * h1 + heights[col]])
+
+        # Bring the TT move, then the killers, to the front
+        front = 0
+        if self.tt_move:
+            moves, front = _promote(moves, tt_move, front)
+        if self.use_killers:
+            killers = self.killers[ply]
+            moves, front = _promote(moves, killers[0], front)
+            moves, front = _promote(moves, killers[1], front)
+        return moves
+
+    def record_cutoff(self, position, col, ply, piece, depth):
+        """Update killers and history after ``col`` caused a cutoff (position already undone)."""
+        if self.use_killers:
+            slots = self.killers[ply]
+            if slots[0] != col:
+                slots[1] = slots[0]
+                slots[0] = col
+        if self.use_history:
+            self.history[piece][col * self.geometry.h1 + position.heights[col]] += depth * depth
+
+    def clear(self):
+        """Forget killers and history entirely, as for an unrelated position."""
+        self.killers = [[None, None] for _ in range(self.geometry.size + 1)]
+        self.history = [[0] * self.geometry.bits for _ in range(3)]
+
+    def new_search(self):
+        """Forget killers and age the history table before the next move's search."""
+        for slots in self.killers:
+            slots[0] = slots[1] = None
+        for table in self.history:
+            for i in range(len(table)):
+                table[i] //= 2
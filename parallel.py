@@ -0,0 +1,173 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from bitboard import AI_PIECE, PLAYER_PIECE, STANDARD, Position
+from ordering import MoveOrderer
+from utils import SearchContext, minimax_alpha_beta, _minimax_alpha_beta
+
+# Worker process state, set up by _init_worker
+_shared_bound = None  # Best exact root value found so far (alpha, or beta for a minimizing root)
+_refuted = None       # _refuted[col] is set once root move col is known not to be best
+_orderer = None
+_geometry = STANDARD
+
+
+def _init_worker(shared_bound, refuted, geometry):
+    global _shared_bound, _refuted, _orderer, _geometry
+    _shared_bound = shared_bound
+    _refuted = refuted
+    _geometry = geometry
+    _orderer = MoveOrderer(geometry=geometry)
+
+
+def _search_task(board_str, moves, depth, maximizingPlayer):
+    """Search the position reached by ``moves`` from the root.
+
+    The window is one point wider than the shared bound, so a result strictly
+    inside it is exact and ties with the current best are still detected.
+    Returns ``(value, bound_used, nodes)``; value is None if the task's root
+    move was refuted before it started.
+    """
+    root_move = moves[0]
+    if _refuted[root_move]:
+        return None, None, 0
+
+    position = Position.from_string(board_str, _geometry)
+    mover = maximizingPlayer
+    for col in moves:
+        position.play(col, AI_PIECE if mover else PLAYER_PIECE)
+        mover = not mover
+
+    bound = _shared_bound.value
+    if maximizingPlayer:
+        alpha, beta = bound - 1, math.inf
+    else:
+        alpha, beta = -math.inf, bound + 1
+    context = SearchContext(orderer=_orderer)
+    _, value = _minimax_alpha_beta(position, depth - len(moves), alpha, beta, mover, context, ply=len(moves))
+    return value, bound, context.nodes
+
+
+def _is_refutation(value, bound, maximizingPlayer):
+    """True when a task's result is only a bound proving its root move is worse than the best."""
+    if maximizingPlayer:
+        return value <= bound - 1
+    return value >= bound + 1
+
+
+class ParallelSearcher:
+    """Alpha-beta with the root moves split across a process pool.
+
+    Root moves (or, with ``split_ply=2``, every root move/reply pair) are
+    searched as separate tasks. The best exact root value found so far is kept
+    in shared memory and read by every task as its alpha (beta for a
+    minimizing root). Following the Young Brothers Wait Concept, the first
+    root move is searched before the others are handed out so they start with
+    a bound. Scores are integers, which lets tasks detect ties with the bound
+    exactly, so the returned move and score equal minimax_alpha_beta's at the
+    same depth.
+
+    One searcher runs one search at a time on boards of one ``geometry``;
+    keep it around to reuse the warm worker processes.
+    """
+
+    def __init__(self, workers=None, geometry=None):
+        self.workers = workers or os.cpu_count()
+        self.geometry = geometry if geometry is not None else STANDARD
+        context = multiprocessing.get_context()
+        self._bound = context.Value('d', 0.0)
+        self._refuted = context.Array('b', self.geometry.columns)
+        self._executor = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(self._bound, self._refuted, self.geometry))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def search(self, board_str, depth, maximizingPlayer=True, split_ply=1):
+        """Return ``(col, score, nodes)`` for the position ``board_str``."""
+        position = Position.from_string(board_str, self.geometry)
+        root_moves = position.distinct_moves()  # Mirrored root moves of a symmetric board are worth the same
+        if depth < 2 or not root_moves or position.is_full():
+            col, score, _ = minimax_alpha_beta(board_str, depth, -math.inf, math.inf, maximizingPlayer,
+                                               geometry=self.geometry)
+            return col, score, 0
+
+        # Expand the root (and optionally the replies) into task move sequences
+        tasks = {}
+        for col in root_moves:
+            if split_ply >= 2 and depth > 2:
+                position.play(col, AI_PIECE if maximizingPlayer else PLAYER_PIECE)
+                replies = position.valid_moves() if not position.is_full() else []
+                position.undo(col)
+            else:
+                replies = []
+            tasks[col] = [(col, reply) for reply in replies] or [(col,)]
+
+        self._bound.value = -math.inf if maximizingPlayer else math.inf
+        for col in range(self.geometry.columns):
+            self._refuted[col] = 0
+
+        pending_replies = {col: len(sequences) for col, sequences in tasks.items()}
+        values = {}  # Exact value of each root move whose tasks have all finished
+        partial = {col: (math.inf if maximizingPlayer else -math.inf) for col in root_moves}
+        nodes = 0
+
+        def finish(col, result):
+            nonlocal nodes
+            value, bound, task_nodes = result
+            nodes += task_nodes
+            pending_replies[col] -= 1
+            if value is None or self._refuted[col]:
+                return
+            if _is_refutation(value, bound, maximizingPlayer):
+                self._refuted[col] = 1
+                return
+            # A root move's value is the min (max) over its replies
+            partial[col] = min(partial[col], value) if maximizingPlayer else max(partial[col], value)
+            if pending_replies[col] == 0:
+                values[col] = partial[col]
+                with self._bound.get_lock():
+                    if maximizingPlayer:
+                        self._bound.value = max(self._bound.value, values[col])
+                    else:
+                        self._bound.value = min(self._bound.value, values[col])
+
+        def run(cols):
+            futures = {}
+            for col in cols:
+                for sequence in tasks[col]:
+                    future = self._executor.submit(_search_task, board_str, sequence, depth, maximizingPlayer)
+                    futures[future] = col
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    col = futures.pop(future)
+                    finish(col, future.result())
+
+        run(root_moves[:1])  # Eldest brother first
+        run(root_moves[1:])
+
+        # Same tie-break as the serial search: the first root move with the best value
+        best_col = None
+        best_value = None
+        for col in root_moves:
+            if col not in values:
+                continue
+            if best_value is None or (values[col] > best_value if maximizingPlayer else values[col] < best_value):
+                best_col, best_value = col, values[col]
+        return best_col, best_value, nodes
+
+
+def parallel_root_search(board_str, depth, maximizingPlayer=True, workers=None, split_ply=1, geometry=None):
+    """One-off parallel search; see ParallelSearcher."""
+    with ParallelSearcher(workers, geometry) as searcher:
+        return searcher.search(board_str, depth, maximizingPlayer, split_ply)
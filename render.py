@@ -0,0 +1,122 @@
+"""Cached drawing for the pygame GUI.
+
+Whatever the GUI draws again and again is rendered once and blitted after
+that: fonts are opened once per (name, size), text is kept by (font, text,
+colour), and the board is built from pre-rendered cell sprites over a
+pre-rendered empty frame. Drawing returns the screen rectangles it changed so
+the GUI passes only those to ``pygame.display.update``; a frame in which
+nothing changed costs nothing.
+"""
+import numpy as np
+import pygame
+
+EMPTY = 0
+
+_fonts = {}
+
+
+def get_font(name, size):
+    """Return the SysFont ``name`` at ``size``, opened on first use."""
+    key = (name, size)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.SysFont(name, size)
+    return _fonts[key]
+
+
+class TextCache:
+    """Rendered text surfaces by (font, text, colour).
+
+    Labels that change all the time, such as node rates, would grow the cache
+    without bound, so it is emptied once it holds ``max_entries`` surfaces.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._surfaces = {}
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_entries:
+                self._surfaces.clear()
+            surface = self._surfaces[key] = font.render(text, True, color)
+        return surface
+
+
+class BoardView:
+    """Draws a board below a strip for the piece held over the columns.
+
+    ``board`` arrays are (rows, columns) with row 0 at the bottom, as in
+    utils. The view remembers what it drew last, so ``draw`` only blits the
+    cells that changed; ``invalidate`` forces a full redraw, for instance
+    after something else painted over the board.
+    """
+
+    def __init__(self, geometry, square, radius, frame_color, hole_color, piece_colors):
+        self.geometry = geometry
+        self.square = square
+        self.width = geometry.columns * square
+        self.height = (geometry.rows + 1) * square
+        self.hole_color = hole_color
+
+        # One sprite per cell content: the frame around a hole or a piece
+        self.sprites = {}
+        for piece, color in [(EMPTY, hole_color)] + list(piece_colors.items()):
+            sprite = pygame.Surface((square, square)).convert()
+            sprite.fill(frame_color)
+            pygame.draw.circle(sprite, color, (square // 2, square // 2), radius)
+            self.sprites[piece] = sprite
+        # Loose pieces for the strip above the board, transparent around the circle
+        self.pieces = {}
+        for piece, color in piece_colors.items():
+            sprite = pygame.Surface((square, square)).convert()
+            sprite.fill(hole_color)
+            sprite.set_colorkey(hole_color)
+            pygame.draw.circle(sprite, color, (square // 2, square // 2), radius)
+            self.pieces[piece] = sprite
+        self.frame = pygame.Surface((self.width, self.height - square)).convert()
+        for r in range(geometry.rows):
+            for c in range(geometry.columns):
+                self.frame.blit(self.sprites[EMPTY], (c * square, r * square))
+
+        self.shown = None       # Copy of the board last drawn, None to redraw everything
+        self.held_rect = None   # Where the piece in the strip was last drawn
+
+    def invalidate(self):
+        self.shown = None
+        self.held_rect = None
+
+    def cell_rect(self, row, col):
+        return pygame.Rect(col * self.square, self.height - (row + 1) * self.square, self.square, self.square)
+
+    def draw(self, surface, board):
+        """Draw ``board`` and return the list of rectangles that changed."""
+        if self.shown is None:
+            surface.blit(self.frame, (0, self.square))
+            self.shown = np.zeros((self.geometry.rows, self.geometry.columns))
+            dirty = [pygame.Rect(0, self.square, self.width, self.height - self.square)]
+        else:
+            dirty = []
+        for r, c in np.argwhere(board != self.shown):
+            rect = self.cell_rect(r, c)
+            surface.blit(self.sprites[int(board[r][c])], rect)
+            dirty.append(rect)
+        if dirty:
+            self.shown = np.array(board)
+        return dirty
+
+    def draw_held(self, surface, x, piece):
+        """Show ``piece`` in the strip centred on ``x``, or nothing when ``x``
+        is None; returns the rectangles that changed."""
+        dirty = []
+        if self.held_rect is not None:
+            surface.fill(self.hole_color, self.held_rect)
+            dirty.append(self.held_rect)
+            self.held_rect = None
+        if x is not None:
+            surface.set_clip(pygame.Rect(0, 0, self.width, self.square))  # Keep it off the sidebar
+            self.held_rect = surface.blit(self.pieces[piece], (x - self.square // 2, 0))
+            surface.set_clip(None)
+            dirty.append(self.held_rect)
+        return dirty
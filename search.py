@@ -0,0 +1,116 @@
+import math
+import time
+
+from bitboard import Position
+from endgame import ENDGAME_CELLS, EndgameSolver, should_solve
+from tree import NO_PARENT, TREE_OFF, SearchTree
+from utils import AI_PIECE, PLAYER_PIECE, SearchAborted, SearchContext, _minimax_alpha_beta
+
+
+def iterative_deepening(board_str, max_depth, maximizingPlayer=True, time_limit=None, node_limit=None,
+                        tt=None, orderer=None, tree_mode=TREE_OFF, max_nodes=None, batch_leaves=False, stop_event=None,
+                        on_iteration=None, stats=None, endgame_cells=ENDGAME_CELLS, geometry=None, cache=None,
+                        solver=None):
+    """Run alpha-beta at depth 1, 2, ... until ``max_depth`` or a budget runs out.
+
+    ``time_limit`` is a wall-clock budget in seconds and ``node_limit`` a budget
+    of visited nodes, both shared by all iterations. An iteration that runs out
+    of budget is abandoned and the result of the last completed iteration is
+    returned, so a move is always available: depth 1 is searched without limits.
+    Setting ``stop_event`` (a threading.Event) from another thread ends the
+    search the same way.
+    A TranspositionTable passed as ``tt`` and a MoveOrderer passed as
+    ``orderer`` are shared between iterations. The search tree of the returned
+    iteration is recorded according to ``tree_mode`` and ``max_nodes``;
+    ``batch_leaves`` and a DiskCache passed as ``cache`` are passed on to the
+    alpha-beta search, and the cache is flushed when the search ends.
+
+    ``on_iteration(depth, col, score, nodes)`` is called after every completed
+    iteration. A SearchStats passed as ``stats`` collects counters over all
+    iterations and the time and node count of each completed one. Returns
+    ``(col, score, root, depth)`` where ``root`` is the TreeNode of the
+    recorded tree (or None) and ``depth`` the last completed depth.
+
+    With ``endgame_cells`` or fewer empty cells the position is solved exactly
+    by the endgame solver instead (None disables this); the score is then the
+    final four-count difference rather than a heuristic value, no tree is
+    recorded and ``depth`` is the number of empty cells. The solve spends the
+    same budgets and can be cancelled the same way; if it stops early, the
+    iterations above run on whatever budget is left. An EndgameSolver passed
+    as ``solver`` keeps its table between calls, as ``tt`` does.
+
+    ``board_str`` is read with ``geometry``, the standard board by default.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit if time_limit is not None else None
+    position = Position.from_string(board_str, geometry)  # Convert once at the boundary
+    nodes = 0
+    if should_solve(position, endgame_cells):
+        solver = solver if solver is not None else EndgameSolver()
+        context = SearchContext(deadline=deadline, node_limit=node_limit, stop_event=stop_event)
+        try:
+            col, score = solver.solve(position.copy(), maximizingPlayer, context=context)
+        except SearchAborted:
+            nodes = context.nodes  # Fall back to the heuristic search below
+            if stats is not None:
+                stats.nodes += context.nodes
+        else:
+            empty = position.geometry.size - position.count
+            if stats is not None:
+                elapsed = time.perf_counter() - start
+                stats.nodes += context.nodes
+                stats.max_ply = max(stats.max_ply, empty)
+                stats.seconds += elapsed
+                stats.record_iteration(empty, elapsed, context.nodes, col, score)
+            if on_iteration is not None:
+                on_iteration(empty, col, score, context.nodes)
+            return col, score, None, empty
+
+    if orderer is not None:
+        orderer.new_search()
+
+    best = (None, None)
+    best_tree = None
+    completed_depth = 0
+    for depth in range(1, max_depth + 1):
+        tree = SearchTree.for_mode(tree_mode, max_nodes)
+        if depth == 1:
+            context = SearchContext(tt, orderer=orderer, tree=tree, batch_leaves=batch_leaves, stats=stats,
+                                    cache=cache)
+        else:
+            remaining_nodes = node_limit - nodes if node_limit is not None else None
+            context = SearchContext(tt, deadline, remaining_nodes, orderer, tree, batch_leaves, stop_event, stats,
+                                    cache)
+        index = tree.add(NO_PARENT, None, AI_PIECE if maximizingPlayer else PLAYER_PIECE) if tree is not None else -1
+        iteration_start = time.perf_counter()
+        try:
+            result = _minimax_alpha_beta(position.copy(), depth, -math.inf, math.inf, maximizingPlayer, context, index)
+        except SearchAborted:
+            if stats is not None:
+                stats.nodes += context.nodes
+            break
+        nodes += context.nodes
+        if stats is not None:
+            stats.nodes += context.nodes
+            stats.record_iteration(depth, time.perf_counter() - iteration_start, context.nodes, result[0], result[1])
+        best = result
+        best_tree = tree
+        completed_depth = depth
+        if on_iteration is not None:
+            on_iteration(depth, result[0], result[1], nodes)
+
+        if position.is_full() or depth >= position.geometry.size - position.count:
+            break  # Searched to the end of the game; deeper iterations are identical
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        if node_limit is not None and nodes >= node_limit:
+            break
+        if stop_event is not None and stop_event.is_set():
+            break
+
+    if cache is not None:
+        cache.flush()
+    if stats is not None:
+        stats.seconds += time.perf_counter() - start
+    col, score = best
+    return col, score, best_tree.root() if best_tree is not None else None, completed_depth
@@ -0,0 +1,412 @@
+"""Local HTTP move service.
+
+Serves engine moves to any number of clients over plain HTTP, using only the
+standard library:
+
+    python server.py --port 8000 --workers 4
+    curl -s localhost:8000/move -d '{"board": "000000000000000000000000000000000000000000", "depth": 8}'
+
+``POST /move`` returns the move for the AI (piece 2) to play on ``board``;
+``POST /analyze`` also returns the value of every legal move and the search
+stats. Both take a JSON object:
+
+    board        row-major board string (required)
+    algorithm    "alphabeta" (default), "minimax" or "expecti"
+    depth        search depth, deepened iteratively up to; full-width
+                 searches are capped lower on wider boards (see max_depth)
+    time_limit   seconds the search may take (MAX_TIME_LIMIT at most and by default)
+    node_limit   nodes the search may visit
+    rows, columns, connect   board geometry, one of SHAPES; the standard 6x7 board by default
+
+Searches run on a pool of worker processes started with the server. Each
+worker keeps its transposition tables, move orderers, endgame solvers and
+the opening book warm between requests; with --cache the workers also share a persistent
+search cache (see disk_cache.py) that outlives them. Concurrent requests for
+the same search are coalesced into one pool task whose result they all
+receive. Every search stops at its time limit, so no request holds a worker
+for longer than that: ``/move`` returns the deepest completed iteration, and
+``/analyze`` reports a null score for a move whose search ran out of time.
+``GET /stats`` reports the request counters.
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bitboard import AI_PIECE, STANDARD, Position, get_geometry
+from book import BOOK_PATH, load_book
+from disk_cache import open_cache
+from endgame import EndgameSolver, should_solve
+from ordering import MoveOrderer
+from search import iterative_deepening
+from stats import SearchStats
+from transposition import TranspositionTable
+from utils import MAIN_WEIGHT, NEIGHBOUR_WEIGHT, SearchAborted, SearchContext, expecti_minimax, minimax, minimax_alpha_beta
+
+ENDPOINTS = ("/move", "/analyze")
+ALGORITHMS = ("alphabeta", "minimax", "expecti")
+DEFAULT_DEPTH = {"alphabeta": 8, "minimax": 4, "expecti": 4}
+MAX_DEPTH = {"alphabeta": 42, "minimax": 6, "expecti": 6}
+FULL_WIDTH_NODES = 7 ** 6  # Leaves a full-width search may have: depth 6 on the standard board
+MAX_TIME_LIMIT = 10.0  # Longest search; iterative deepening stops there even without a limit
+MAX_BODY = 64 * 1024
+# Board shapes served, as (rows, columns, connect). Their tables are built at
+# import, in the server and in every worker, so a request can neither make a
+# handler thread build a huge geometry nor grow the geometry cache.
+SHAPES = ((6, 7, 4), (5, 6, 4), (6, 8, 4), (7, 8, 4), (7, 9, 4), (7, 10, 4), (8, 8, 4), (6, 9, 5))
+GEOMETRIES = {shape: get_geometry(*shape) for shape in SHAPES}
+REQUEST_TIMEOUT = 60.0  # Seconds a client waits for its search before getting a 504
+TT_SIZE_MB = 16
+
+
+class RequestError(ValueError):
+    """A malformed request, answered with 400 Bad Request."""
+
+
+def max_depth(algorithm, geometry):
+    """Deepest search served; full-width searches go less deep on wider boards."""
+    depth = MAX_DEPTH[algorithm]
+    if algorithm != "alphabeta":
+        while depth > 1 and geometry.columns ** depth > FULL_WIDTH_NODES:
+            depth -= 1
+    return depth
+
+
+def parse_request(endpoint, body):
+    """Validate a request body; returns the task tuple searched for it.
+
+    Equal tasks ask for the same search, so the tuple doubles as the key
+    concurrent requests are coalesced on.
+    """
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise RequestError("body is not valid JSON")
+    if not isinstance(request, dict):
+        raise RequestError("body must be a JSON object")
+
+    def integer(name, default, low, high):
+        value = request.get(name, default)
+        if value is None:
+            return None
+        if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+            raise RequestError(f"{name} must be an integer from {low} to {high}")
+        return value
+
+    shape = tuple(request.get(name, default) for name, default in
+                  (("rows", STANDARD.rows), ("columns", STANDARD.columns), ("connect", STANDARD.connect)))
+    if any(not isinstance(value, int) or isinstance(value, bool) for value in shape) or shape not in GEOMETRIES:
+        served = ", ".join(f"{rows}x{columns}/{connect}" for rows, columns, connect in SHAPES)
+        raise RequestError(f"rows x columns / connect must be one of {served}")
+    geometry = GEOMETRIES[shape]
+
+    algorithm = request.get("algorithm", "alphabeta")
+    if algorithm not in ALGORITHMS:
+        raise RequestError(f"algorithm must be one of {', '.join(ALGORITHMS)}")
+    deepest = max_depth(algorithm, geometry)
+    depth = integer("depth", min(DEFAULT_DEPTH[algorithm], deepest), 1, deepest)
+    node_limit = integer("node_limit", None, 1, 2 ** 62)
+    time_limit = request.get("time_limit")
+    if time_limit is not None:
+        if not isinstance(time_limit, (int, float)) or isinstance(time_limit, bool) or not time_limit > 0:
+            raise RequestError("time_limit must be a positive number of seconds")
+        time_limit = min(float(time_limit), MAX_TIME_LIMIT)
+
+    board_str = request.get("board")
+    if not isinstance(board_str, str):
+        raise RequestError("board must be a board string")
+    if len(board_str) != geometry.size or set(board_str) - set("012"):
+        raise RequestError(f"board must be {geometry.size} characters of 0, 1 and 2")
+    if Position.from_string(board_str, geometry).is_full():
+        raise RequestError("board is full")
+    return endpoint, board_str, algorithm, depth, time_limit, node_limit, shape
+
+
+# Worker process state, kept between requests
+_book = None
+_cache = None  # DiskCache of standard-board search results, or None
+_engines = {}  # Geometry -> (TranspositionTable, MoveOrderer)
+
+
+def _init_worker(book_path, cache_path=None):
+    global _book, _cache
+    _book = load_book(book_path) if book_path is not None else None
+    _cache = open_cache(cache_path) if cache_path is not None else None
+
+
+def _engine(geometry):
+    """This worker's alpha-beta tables and endgame solver for a geometry,
+    allocated on first use."""
+    engine = _engines.get(geometry)
+    if engine is None:
+        engine = _engines[geometry] = (TranspositionTable(TT_SIZE_MB), MoveOrderer(geometry=geometry),
+                                       EndgameSolver())
+    return engine
+
+
+def _warm_up():
+    _engine(STANDARD)
+    return os.getpid()
+
+
+def _search(board_str, algorithm, depth, time_limit, node_limit, geometry, stats):
+    """Search for the AI's move within ``time_limit`` seconds and ``node_limit``
+    nodes; returns ``(col, score, completed depth)``."""
+    if algorithm == "alphabeta":
+        tt, orderer, solver = _engine(geometry)
+        col, score, _, completed = iterative_deepening(
+            board_str, depth, time_limit=time_limit, node_limit=node_limit, tt=tt, orderer=orderer, stats=stats,
+            geometry=geometry, cache=_cache if geometry is STANDARD else None, solver=solver)
+        return col, score, completed
+
+    # Full-width searches deepen iteratively too, so a budget that runs out
+    # still leaves the last completed depth's move; depth 1 runs without limits
+    deadline = time.perf_counter() + time_limit
+    result = None
+    completed = 0
+    for iteration in range(1, depth + 1):
+        budget = {}
+        if iteration > 1:
+            budget = {"time_limit": max(0.0, deadline - time.perf_counter()),
+                      "node_limit": node_limit - stats.nodes if node_limit is not None else None}
+        try:
+            if algorithm == "minimax":
+                col, score, _ = minimax(board_str, iteration, True, stats=stats, geometry=geometry, **budget)
+            else:
+                col, score, _ = expecti_minimax(board_str, iteration, -math.inf, math.inf, True, stats=stats,
+                                                geometry=geometry, **budget)
+        except SearchAborted:
+            break
+        result = (col, score)
+        completed = iteration
+        if time.perf_counter() >= deadline or (node_limit is not None and stats.nodes >= node_limit):
+            break
+    return result[0], result[1], completed
+
+
+def _move_values(board_str, algorithm, depth, geometry, time_limit):
+    """Value of every legal AI move at ``depth``, in column order; None for a
+    move whose search did not finish within ``time_limit`` seconds."""
+    deadline = time.perf_counter() + time_limit
+    position = Position.from_string(board_str, geometry)
+    values = {}
+    # Exact final four-count differences when iterative_deepening solved the
+    # position too; a solve that ran out of time left depth at a heuristic one
+    if algorithm == "alphabeta" and should_solve(position) and depth == geometry.size - position.count:
+        solver = _engine(geometry)[2]
+        context = SearchContext(deadline=deadline)
+        try:
+            for col in position.valid_moves():
+                child = position.copy()
+                child.play(col, AI_PIECE)
+                values[col] = solver.solve(child, False, context=context)[1]
+            return [{"move": col, "score": score} for col, score in values.items()]
+        except SearchAborted:
+            values = {}  # Heuristic values below, as far as the time left allows
+
+    last = position.geometry.columns - 1
+    symmetric = position.is_symmetric()
+    for col in position.valid_moves():
+        if symmetric and last - col in values:
+            values[col] = values[last - col]  # The mirror image of a move already searched
+            continue
+        position.play(col, AI_PIECE)
+        child = position.to_string()
+        position.undo(col)
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            values[col] = None
+            continue
+        try:
+            if algorithm == "alphabeta":
+                tt, orderer, _ = _engine(geometry)
+                values[col] = minimax_alpha_beta(child, depth - 1, -math.inf, math.inf, False, tt, orderer,
+                                                 geometry=geometry, cache=_cache if geometry is STANDARD else None,
+                                                 time_limit=remaining)[1]
+            elif algorithm == "minimax":
+                values[col] = minimax(child, depth - 1, False, geometry=geometry, time_limit=remaining)[1]
+            else:
+                values[col] = expecti_minimax(child, depth - 1, -math.inf, math.inf, False, geometry=geometry,
+                                              time_limit=remaining)[1]
+        except SearchAborted:
+            values[col] = None
+    if algorithm == "expecti":
+        # values holds each drop; a move is worth its drops weighted as in expecti_minimax
+        drops = values
+        values = {}
+        for col in drops:
+            neighbours = [d for d in (col - 1, col + 1) if d in drops]
+            if drops[col] is None or any(drops[d] is None for d in neighbours):
+                values[col] = None  # A drop it depends on ran out of time
+            else:
+                values[col] = MAIN_WEIGHT * drops[col] + sum(NEIGHBOUR_WEIGHT * drops[d] for d in neighbours)
+    return [{"move": col, "score": score} for col, score in values.items()]
+
+
+def _run_task(task):
+    endpoint, board_str, algorithm, depth, time_limit, node_limit, shape = task
+    geometry = get_geometry(*shape)
+    start = time.perf_counter()
+    if endpoint == "/move" and algorithm == "alphabeta" and _book is not None and geometry is STANDARD:
+        entry = _book.lookup(board_str)
+        if entry is not None:
+            return {"move": entry[0], "score": entry[1], "depth": _book.depth, "nodes": 0, "book": True,
+                    "seconds": time.perf_counter() - start}
+
+    if time_limit is None:
+        time_limit = MAX_TIME_LIMIT
+    stats = SearchStats()
+    col, score, completed = _search(board_str, algorithm, depth, time_limit, node_limit, geometry, stats)
+    result = {"move": col, "score": score, "depth": completed, "nodes": stats.nodes, "book": False}
+    if endpoint == "/analyze":
+        result["moves"] = _move_values(board_str, algorithm, completed, geometry, time_limit)
+        result["stats"] = stats.to_dict()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+class Coalescer:
+    """Submits tasks to the pool, sharing one future between equal tasks in flight."""
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._pending = {}  # Task tuple -> Future of its search
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, task):
+        """Return ``(future, shared)``; ``shared`` is True when the task joined a running search."""
+        with self._lock:
+            future = self._pending.get(task)
+            if future is not None:
+                self.coalesced += 1
+                return future, True
+            future = self._pending[task] = self._executor.submit(_run_task, task)
+            self.submitted += 1
+        future.add_done_callback(lambda done: self._forget(task, done))
+        return future, False
+
+    def _forget(self, task, future):
+        with self._lock:
+            if self._pending.get(task) is future:
+                del self._pending[task]
+
+
+class MoveRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    server_version = "ConnectFourAI/1.0"
+
+    def do_POST(self):
+        if self.path not in ENDPOINTS:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True  # The unread body would be taken for the next request
+            self._send(413, {"error": "request body too large"})
+            return
+        try:
+            task = parse_request(self.path, self.rfile.read(length))
+        except RequestError as error:
+            self.server.count("rejected")
+            self._send(400, {"error": str(error)})
+            return
+
+        future, shared = self.server.coalescer.submit(task)
+        try:
+            result = future.result(timeout=self.server.request_timeout)
+        except concurrent.futures.TimeoutError:
+            self.server.count("timed_out")
+            self._send(504, {"error": "search did not finish in time"})
+            return
+        except Exception as error:
+            self.server.count("failed")
+            self._send(500, {"error": f"search failed: {error!r}"})
+            return
+        self.server.count("served")
+        self._send(200, dict(result, coalesced=shared))
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.server.stats())
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MoveServer(ThreadingHTTPServer):
+    """HTTP server answering each connection on its own thread and searching
+    on a pool of ``workers`` processes, all started before it returns."""
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, book_path=BOOK_PATH, request_timeout=REQUEST_TIMEOUT, verbose=False,
+                 cache_path=None):
+        super().__init__(address, MoveRequestHandler)
+        self.workers = workers or os.cpu_count()
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(book_path, cache_path))
+        # Start every worker and allocate its tables now rather than during the first requests
+        concurrent.futures.wait([self._executor.submit(_warm_up) for _ in range(self.workers)])
+        self.coalescer = Coalescer(self._executor)
+        self._counts_lock = threading.Lock()
+        self._counts = {"served": 0, "rejected": 0, "timed_out": 0, "failed": 0}
+        self.started = time.time()
+
+    def count(self, name):
+        with self._counts_lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._counts_lock:
+            counts = dict(self._counts)
+        counts.update(workers=self.workers, searches=self.coalescer.submitted, coalesced=self.coalescer.coalesced,
+                      uptime=time.time() - self.started)
+        return counts
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--book", default=BOOK_PATH, help="opening book for alpha-beta moves")
+    parser.add_argument("--cache", help="persistent search cache file shared by the workers")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = MoveServer((args.host, args.port), args.workers, args.book, verbose=args.verbose, cache_path=args.cache)
+    print(f"serving on http://{args.host}:{server.server_port} with {server.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
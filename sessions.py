@@ -0,0 +1,246 @@
+"""Asyncio manager for many simultaneous games.
+
+Each game is a Session holding only its two bitboards and a few settings, so
+thousands of idle games cost a few hundred bytes each. AI moves are searched
+on a process pool; requests wait in per-owner queues that are served round
+robin, so an owner with many games cannot starve the others, and each search
+gets whatever is left of its session's ``move_time`` once it leaves the queue.
+
+    async with SessionManager(workers=4) as manager:
+        game = await manager.new_game(owner="alice")
+        await manager.play(game, 3)
+        col = await manager.ai_move(game)
+        print(await manager.state(game))
+"""
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import AI_PIECE, PLAYER_PIECE, STANDARD, Position, masks_to_string
+from book import BOOK_PATH
+from server import _init_worker, _run_task
+
+DEFAULT_DEPTH = 8
+DEFAULT_MOVE_TIME = 1.0  # Seconds from an ai_move call to its answer, queueing included
+
+
+class GameError(ValueError):
+    """An unknown game or a move that is not allowed in it."""
+
+
+class Session:
+    """One game: the pieces as bitboards, whose turn it is and the AI settings."""
+
+    __slots__ = ("owner", "geometry", "player_mask", "ai_mask", "ai_turn", "depth", "move_time", "search")
+
+    def __init__(self, owner, geometry, ai_first, depth, move_time):
+        self.owner = owner
+        self.geometry = geometry
+        self.player_mask = 0
+        self.ai_mask = 0
+        self.ai_turn = ai_first
+        self.depth = depth
+        self.move_time = move_time
+        self.search = None  # Future of the AI move being searched, if any
+
+    def count(self):
+        return (self.player_mask | self.ai_mask).bit_count()
+
+    def is_over(self):
+        return self.count() == self.geometry.size
+
+    def drop(self, col, piece):
+        """Drop ``piece`` into ``col``; GameError if the column is not playable."""
+        geometry = self.geometry
+        if not 0 <= col < geometry.columns:
+            raise GameError(f"no column {col}")
+        column = ((self.player_mask | self.ai_mask) >> (col * geometry.h1)) & ((1 << geometry.rows) - 1)
+        height = column.bit_count()
+        if height == geometry.rows:
+            raise GameError(f"column {col} is full")
+        if piece == PLAYER_PIECE:
+            self.player_mask |= geometry.cell_bit(height, col)
+        else:
+            self.ai_mask |= geometry.cell_bit(height, col)
+        self.ai_turn = piece == PLAYER_PIECE
+
+    def to_string(self):
+        return masks_to_string(self.player_mask, self.ai_mask, self.geometry)
+
+
+class SessionManager:
+    """Holds the games and schedules their AI searches.
+
+    ``workers`` searches run at once, on ``executor`` if one is given and on
+    a process pool with warm per-process tables otherwise; ``cache_path``
+    gives that pool a persistent search cache. Use it as an async context
+    manager, or call ``close`` when done.
+    """
+
+    def __init__(self, workers=None, executor=None, book_path=BOOK_PATH, cache_path=None):
+        self._own_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                         initargs=(book_path, cache_path))
+        self.workers = workers or os.cpu_count()
+        self._sessions = {}
+        self._ids = itertools.count(1)
+        self._queues = {}      # Owner -> deque of queued (game, future, deadline)
+        self._owners = deque()  # Owners with queued searches, in the order they are served
+        self._queued = None    # asyncio.Semaphore counting queued searches
+        self._dispatchers = []
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    async def close(self):
+        """Stop searching; every ai_move still waiting fails with GameError."""
+        self._closed = True
+        for queue in self._queues.values():
+            for game, future, _ in queue:
+                self._abandon(game, future)
+        self._queues.clear()
+        self._owners.clear()
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()  # A dispatcher abandons the search it is running
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._own_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _abandon(self, game, future):
+        session = self._sessions.get(game)
+        if session is not None and session.search is future:
+            session.search = None
+        if not future.done():
+            future.set_exception(GameError("the session manager was closed"))
+
+    def _session(self, game):
+        session = self._sessions.get(game)
+        if session is None:
+            raise GameError(f"no game {game}")
+        return session
+
+    async def new_game(self, owner=None, ai_first=False, depth=DEFAULT_DEPTH, move_time=DEFAULT_MOVE_TIME,
+                       geometry=None, board=None):
+        """Start a game and return its id. Games of the same ``owner`` share one
+        place in the fair queue; a game without an owner is queued on its own.
+        ``board`` starts the game from a board string instead of an empty
+        board, with the AI to move if ``ai_first``."""
+        game = next(self._ids)
+        geometry = geometry if geometry is not None else STANDARD
+        session = Session(owner if owner is not None else game, geometry, ai_first, depth, move_time)
+        if board is not None:
+            session.player_mask, session.ai_mask = Position.from_string(board, geometry).snapshot()
+        self._sessions[game] = session
+        return game
+
+    async def close_game(self, game):
+        """Forget a game; a search still running for it is discarded."""
+        self._sessions.pop(game, None)
+
+    async def play(self, game, col):
+        """Play the human's move in ``col`` and return the new state."""
+        session = self._session(game)
+        if session.is_over():
+            raise GameError("the game is over")
+        if session.ai_turn:
+            raise GameError("it is the AI's turn")
+        session.drop(col, PLAYER_PIECE)
+        return self._state(session)
+
+    async def ai_move(self, game):
+        """Search and play the AI's move; returns its column.
+
+        The answer is due ``move_time`` seconds after the call. A search that
+        waited in the queue gets only what is left, but always completes
+        depth 1, so a late move is shallow rather than missing.
+        """
+        if self._closed:
+            raise GameError("the session manager was closed")
+        session = self._session(game)
+        if session.search is not None:
+            return await asyncio.shield(session.search)  # Already searching: share its answer
+        if session.is_over():
+            raise GameError("the game is over")
+        if not session.ai_turn:
+            raise GameError("it is the player's turn")
+
+        loop = asyncio.get_running_loop()
+        if not self._dispatchers:
+            self._queued = asyncio.Semaphore(0)
+            self._dispatchers = [loop.create_task(self._dispatch()) for _ in range(self.workers)]
+        session.search = future = loop.create_future()
+        queue = self._queues.get(session.owner)
+        if queue is None:
+            queue = self._queues[session.owner] = deque()
+            self._owners.append(session.owner)
+        queue.append((game, future, time.perf_counter() + session.move_time))
+        self._queued.release()
+        return await asyncio.shield(future)  # A cancelled caller leaves the search queued for the game
+
+    async def _dispatch(self):
+        """Worker loop: take queued searches round robin by owner and run them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._queued.acquire()
+            owner = self._owners.popleft()
+            queue = self._queues[owner]
+            game, future, deadline = queue.popleft()
+            if queue:
+                self._owners.append(owner)  # Back of the line for its next search
+            else:
+                del self._queues[owner]
+
+            session = self._sessions.get(game)
+            if session is None:
+                future.set_exception(GameError(f"game {game} was closed"))
+                continue
+            geometry = session.geometry
+            task = ("/move", session.to_string(), "alphabeta", session.depth,
+                    max(0.0, deadline - time.perf_counter()), None,
+                    (geometry.rows, geometry.columns, geometry.connect))
+            try:
+                result = await loop.run_in_executor(self._executor, _run_task, task)
+            except asyncio.CancelledError:
+                self._abandon(game, future)
+                raise
+            except Exception as error:
+                session.search = None
+                future.set_exception(error)
+                continue
+            session.drop(result["move"], AI_PIECE)
+            session.search = None
+            future.set_result(result["move"])
+
+    async def state(self, game):
+        """Return the board string, side to move and scores of a game."""
+        return self._state(self._session(game))
+
+    def _state(self, session):
+        count_lines = session.geometry.count_lines
+        player_score = count_lines(session.player_mask)
+        ai_score = count_lines(session.ai_mask)
+        over = session.is_over()
+        winner = None
+        if over and player_score != ai_score:
+            winner = "player" if player_score > ai_score else "ai"
+        return {
+            "board": session.to_string(),
+            "turn": "ai" if session.ai_turn else "player",
+            "moves": session.count(),
+            "player_score": player_score,
+            "ai_score": ai_score,
+            "over": over,
+            "winner": winner,
+            "searching": session.search is not None,
+        }
@@ -0,0 +1,68 @@
+import json
+import sys
+
+
+class SearchStats:
+    """Counters collected by a search when passed as its ``stats`` argument.
+
+    The searches only touch these counters when a SearchStats is given, so
+    leaving it out costs one ``is None`` check at leaves, table probes and
+    cutoffs. Counters accumulate over every search the object is passed to;
+    iterative_deepening adds one entry to ``iterations`` per completed depth.
+    """
+
+    def __init__(self):
+        self.nodes = 0            # Nodes visited, including aborted iterations
+        self.leaves = 0           # Nodes scored by the evaluation (horizon or full board)
+        self.evaluations = 0      # Boards passed to the evaluation, batched ones included
+        self.cutoffs = []         # cutoffs[i]: cutoffs caused by the i-th move searched at a node
+        self.max_ply = 0          # Deepest ply reached
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.iterations = []      # {"depth", "seconds", "nodes", "col", "score"} per completed depth
+        self.seconds = 0.0
+
+    def record_cutoff(self, move_index):
+        while len(self.cutoffs) <= move_index:
+            self.cutoffs.append(0)
+        self.cutoffs[move_index] += 1
+
+    def record_iteration(self, depth, seconds, nodes, col, score):
+        self.iterations.append({"depth": depth, "seconds": seconds, "nodes": nodes, "col": col, "score": score})
+
+    def first_move_cutoff_rate(self):
+        """Fraction of cutoffs caused by the first move searched; a move-ordering quality measure."""
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else None
+
+    def branching_factor(self):
+        """Effective branching factor: the b for which b ** max_ply is the node count."""
+        if self.max_ply == 0 or self.nodes <= 1:
+            return None
+        return self.nodes ** (1 / self.max_ply)
+
+    def to_dict(self):
+        return {
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "evaluations": self.evaluations,
+            "cutoffs": list(self.cutoffs),
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "max_ply": self.max_ply,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "branching_factor": self.branching_factor(),
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes / self.seconds if self.seconds > 0 else None,
+            "iterations": list(self.iterations),
+        }
+
+    def log(self, file=None, **fields):
+        """Write the stats, plus any extra ``fields``, as one JSON line (stderr by default)."""
+        record = dict(fields)
+        record.update(self.to_dict())
+        print(json.dumps(record), file=file if file is not None else sys.stderr, flush=True)
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, leaves={self.leaves}, max_ply={self.max_ply}, "
+                f"cutoffs={self.cutoffs}, tt_hits={self.tt_hits}/{self.tt_probes})")
@@ -0,0 +1,22 @@
+"""Random positions shared by the tests."""
+from bitboard import AI_PIECE, PLAYER_PIECE, Position
+
+# Boards the geometry-dependent tests run on: rows, columns, connect
+SHAPES = ((6, 7, 4), (5, 6, 4), (8, 9, 4), (6, 9, 5))
+
+
+def random_position(rng, pieces, geometry=None):
+    """Random playout of ``pieces`` moves from the empty board, the player first;
+    stops early on a full board. The AI is to move when ``pieces`` is odd."""
+    position = Position(geometry)
+    for i in range(pieces):
+        if position.is_full():
+            break
+        position.play(rng.choice(list(position.valid_moves())), PLAYER_PIECE if i % 2 == 0 else AI_PIECE)
+    return position
+
+
+def mirrored(board_str, geometry):
+    """``board_str`` reflected left to right."""
+    columns = geometry.columns
+    return "".join(board_str[i:i + columns][::-1] for i in range(0, len(board_str), columns))
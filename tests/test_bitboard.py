@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position, get_geometry
+from tests.boards import SHAPES, mirrored, random_position
+from utils import count_connected_fours, score_position
+
+
+def state(position):
+    """Everything play and undo maintain, for comparing positions."""
+    return (list(position.masks), list(position.heights), position.full, position.count, position.key,
+            position.mirror_key, [None if c is None else list(c) for c in position.window_counts],
+            list(position.scores))
+
+
+class IncrementalTest(unittest.TestCase):
+    def test_score_matches_full_evaluation(self):
+        # The running score after every move of random games, and after undoing them
+        rng = random.Random(0)
+        for shape in SHAPES:
+            geometry = get_geometry(*shape)
+            for _ in range(5):
+                position = Position(geometry)
+                played = []
+                while not position.is_full():
+                    col = rng.choice(list(position.valid_moves()))
+                    position.play(col, PLAYER_PIECE if len(played) % 2 == 0 else AI_PIECE)
+                    played.append(col)
+                    for piece in (PLAYER_PIECE, AI_PIECE):
+                        self.assertEqual(position.score(piece), position.full_score(piece), shape)
+                for col in reversed(played[len(played) // 2:]):
+                    position.undo(col)
+                    for piece in (PLAYER_PIECE, AI_PIECE):
+                        self.assertEqual(position.score(piece), position.full_score(piece), shape)
+
+    def test_matches_array_evaluation(self):
+        rng = random.Random(1)
+        for shape in SHAPES:
+            geometry = get_geometry(*shape)
+            for _ in range(10):
+                position = random_position(rng, rng.randrange(geometry.size + 1), geometry)
+                board = position.to_array()
+                for piece in (PLAYER_PIECE, AI_PIECE):
+                    self.assertEqual(position.score(piece), score_position(board, piece, geometry))
+                    self.assertEqual(position.count_fours(piece), count_connected_fours(board, piece, geometry))
+
+    def test_undo_restores_everything(self):
+        rng = random.Random(2)
+        for shape in SHAPES:
+            geometry = get_geometry(*shape)
+            position = random_position(rng, geometry.size // 2, geometry)
+            before = state(position)
+            for col in position.valid_moves():
+                position.play(col, AI_PIECE)
+                position.undo(col)
+                self.assertEqual(state(position), before)
+
+    def test_string_round_trip(self):
+        rng = random.Random(3)
+        for shape in SHAPES:
+            geometry = get_geometry(*shape)
+            position = random_position(rng, geometry.size // 3, geometry)
+            board = position.to_string()
+            self.assertEqual(state(Position.from_string(board, geometry)), state(position))
+            self.assertEqual(state(Position.from_array(position.to_array(), geometry)), state(position))
+
+
+class MirrorTest(unittest.TestCase):
+    def test_mirror_key_is_key_of_reflected_board(self):
+        rng = random.Random(4)
+        for shape in SHAPES:
+            geometry = get_geometry(*shape)
+            for _ in range(10):
+                position = random_position(rng, rng.randrange(geometry.size), geometry)
+                reflection = Position.from_string(mirrored(position.to_string(), geometry), geometry)
+                self.assertEqual(position.mirror_key, reflection.key)
+                self.assertEqual(position.key, reflection.mirror_key)
+                for maximizing in (True, False):
+                    key, flipped = position.canonical_key(maximizing)
+                    mirror_key, mirror_flipped = reflection.canonical_key(maximizing)
+                    self.assertEqual(key, mirror_key)
+                    if not position.is_symmetric():
+                        self.assertNotEqual(flipped, mirror_flipped)
+
+    def test_distinct_moves(self):
+        geometry = get_geometry()
+        position = Position(geometry)
+        self.assertTrue(position.is_symmetric())
+        self.assertEqual(tuple(position.distinct_moves()), (0, 1, 2, 3))
+        position.play(1, PLAYER_PIECE)
+        self.assertFalse(position.is_symmetric())
+        self.assertEqual(tuple(position.distinct_moves()), tuple(position.valid_moves()))
+        position.play(5, PLAYER_PIECE)
+        self.assertTrue(position.is_symmetric())
+        self.assertEqual(tuple(position.distinct_moves()), (0, 1, 2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import os
+import tempfile
+import unittest
+
+from book import build_book
+
+
+class BuildTest(unittest.TestCase):
+    def test_same_book_for_any_worker_count(self):
+        # Positions are chunked differently across workers; no search may depend on the ones before it
+        with tempfile.TemporaryDirectory() as directory:
+            books = []
+            for workers in (1, 3):
+                path = os.path.join(directory, f"book{workers}.bin")
+                build_book(path, plies=3, depth=5, workers=workers)
+                with open(path, "rb") as f:
+                    books.append(f.read())
+            self.assertEqual(books[0], books[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import random
+import threading
+import unittest
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position, get_geometry
+from endgame import EndgameSolver, final_score
+from search import iterative_deepening
+
+
+def random_position(empty, seed, geometry=None):
+    """Random playout stopped with ``empty`` cells left, the AI to move."""
+    rng = random.Random(seed)
+    position = Position(geometry)
+    piece = PLAYER_PIECE
+    while position.geometry.size - position.count > empty or piece != AI_PIECE:
+        position.play(rng.choice(list(position.valid_moves())), piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return position
+
+
+def brute_force(position, maximizingPlayer):
+    if position.is_full():
+        return final_score(position)
+    values = []
+    for col in position.valid_moves():
+        position.play(col, AI_PIECE if maximizingPlayer else PLAYER_PIECE)
+        values.append(brute_force(position, not maximizingPlayer))
+        position.undo(col)
+    return max(values) if maximizingPlayer else min(values)
+
+
+class SolverTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        solver = EndgameSolver()  # Shared, so later positions also hit earlier entries
+        for seed in range(20):
+            position = random_position(7, seed)
+            self.assertEqual(solver.solve(position.copy(), True)[1], brute_force(position, True))
+
+    def test_reused_solver_is_exact(self):
+        solver = EndgameSolver(max_entries=64)  # Emptied many times over
+        for seed in range(10):
+            position = random_position(10, seed)
+            self.assertEqual(solver.solve(position.copy(), True), EndgameSolver().solve(position.copy(), True))
+
+
+class BudgetTest(unittest.TestCase):
+    def test_node_limit_falls_back_to_heuristic(self):
+        for shape in ((6, 7, 4), (7, 10, 4), (6, 9, 5)):
+            position = random_position(12, 0, get_geometry(*shape))
+            board = position.to_string()
+            col, _, _, depth = iterative_deepening(board, 8, node_limit=50, geometry=position.geometry)
+            self.assertIn(col, list(position.valid_moves()))
+            self.assertLess(depth, 12)  # The last completed heuristic iteration, not the solve
+
+    def test_stop_event_cancels_the_solve(self):
+        stop_event = threading.Event()
+        stop_event.set()
+        position = random_position(12, 1, get_geometry(7, 10, 4))
+        solver = EndgameSolver()
+        col, _, _, depth = iterative_deepening(position.to_string(), 8, stop_event=stop_event,
+                                               geometry=position.geometry, solver=solver)
+        self.assertIn(col, list(position.valid_moves()))
+        self.assertEqual(depth, 1)
+        # The aborted solve left the table usable
+        board = position.to_string()
+        self.assertEqual(iterative_deepening(board, 8, geometry=position.geometry, solver=solver)[:2],
+                         EndgameSolver().solve(position.copy(), True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import math
+import random
+import unittest
+
+from tests.boards import random_position
+from utils import expecti_minimax
+
+EPSILON = 1e-6
+
+
+class WindowTest(unittest.TestCase):
+    def assertWindowResult(self, board, depth, alpha, beta, maximizing):
+        exact = expecti_minimax(board, depth, -math.inf, math.inf, maximizing)[1]
+        score = expecti_minimax(board, depth, alpha, beta, maximizing)[1]
+        message = f"{board} depth {depth} window ({alpha}, {beta}): exact {exact}, got {score}"
+        if exact <= alpha:
+            self.assertLessEqual(score, alpha + EPSILON, message)
+        elif exact >= beta:
+            self.assertGreaterEqual(score, beta - EPSILON, message)
+        else:
+            self.assertAlmostEqual(score, exact, delta=EPSILON, msg=message)
+
+    def test_edge_column_drop(self):
+        # A drop weighted by less than 1 scores below the position's evaluation bound
+        self.assertWindowResult("111212112122102122120112221002021200101200", 3, 296.2, 315.8, True)
+
+    def test_finite_windows_match_full_window(self):
+        rng = random.Random(0)
+        for _ in range(60):
+            board = random_position(rng, rng.randrange(36)).to_string()
+            depth = rng.randrange(1, 4)
+            for maximizing in (True, False):
+                exact = expecti_minimax(board, depth, -math.inf, math.inf, maximizing)[1]
+                for _ in range(3):
+                    center = exact + rng.uniform(-30, 30)
+                    width = rng.uniform(0.1, 40)
+                    self.assertWindowResult(board, depth, center - width / 2, center + width / 2, maximizing)
+
+
+if __name__ == "__main__":
+    unittest.main()
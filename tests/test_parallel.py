@@ -0,0 +1,27 @@
+import math
+import random
+import unittest
+
+from parallel import ParallelSearcher
+from tests.boards import random_position
+from utils import minimax_alpha_beta
+
+
+class ParallelTest(unittest.TestCase):
+    def test_matches_serial_search(self):
+        # Same move and score as the serial search, ties included, for both sides and split plies
+        rng = random.Random(0)
+        with ParallelSearcher(workers=2) as searcher:
+            for _ in range(6):
+                position = random_position(rng, rng.randrange(30))
+                board = position.to_string()
+                for maximizing in (True, False):
+                    for depth in (1, 2, 3, 4):
+                        serial = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[:2]
+                        for split_ply in (1, 2):
+                            self.assertEqual(searcher.search(board, depth, maximizing, split_ply)[:2], serial,
+                                             f"{board} depth {depth} split {split_ply}")
+
+
+if __name__ == "__main__":
+    unittest.main()
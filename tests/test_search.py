@@ -0,0 +1,120 @@
+import math
+import random
+import unittest
+
+from bitboard import AI_PIECE, PLAYER_PIECE, Position, get_geometry
+from ordering import MoveOrderer
+from search import iterative_deepening
+from tests.boards import mirrored, random_position
+from transposition import TranspositionTable
+from utils import minimax, minimax_alpha_beta
+
+
+def positions(seed, count, geometry=None):
+    """``count`` random (board string, maximizing) pairs, either side to move."""
+    rng = random.Random(seed)
+    size = (geometry or get_geometry()).size
+    result = []
+    while len(result) < count:
+        position = random_position(rng, rng.randrange(size - 8), geometry)
+        result.append((position.to_string(), position.count % 2 == 1))
+    return result
+
+
+def child_value(board, col, depth, maximizing, geometry=None):
+    """Full-window alpha-beta value of playing ``col`` on ``board``."""
+    position = Position.from_string(board, geometry)
+    position.play(col, AI_PIECE if maximizing else PLAYER_PIECE)
+    return minimax_alpha_beta(position.to_string(), depth - 1, -math.inf, math.inf, not maximizing,
+                              geometry=geometry)[1]
+
+
+class AlphaBetaTest(unittest.TestCase):
+    def test_matches_minimax(self):
+        for board, maximizing in positions(0, 20):
+            for depth in (1, 2, 3):
+                self.assertEqual(minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[1],
+                                 minimax(board, depth, maximizing)[1], f"{board} depth {depth}")
+
+    def test_tables_and_batching_keep_scores(self):
+        # Transposition table, move ordering and batched leaves change the work, never the value
+        variants = {
+            "tt": lambda: {"tt": TranspositionTable(1)},
+            "ordering": lambda: {"orderer": MoveOrderer()},
+            "tt+ordering": lambda: {"tt": TranspositionTable(1), "orderer": MoveOrderer()},
+            "batch": lambda: {"batch_leaves": True},
+        }
+        for board, maximizing in positions(1, 15):
+            for depth in (2, 3, 4, 5):
+                score = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[1]
+                for name, options in variants.items():
+                    result = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing, **options())
+                    self.assertEqual(result[1], score, f"{name}: {board} depth {depth}")
+                    self.assertEqual(child_value(board, result[0], depth, maximizing), score,
+                                     f"{name} move: {board} depth {depth}")
+
+    def test_batching_keeps_moves(self):
+        for board, maximizing in positions(2, 10):
+            for depth in (1, 2, 3, 4):
+                batched = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing, batch_leaves=True)
+                self.assertEqual(batched[:2], minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[:2])
+
+    def test_shared_table_between_searches(self):
+        # One table across many positions and depths, as the GUI and server use it
+        tt = TranspositionTable(1)
+        orderer = MoveOrderer()
+        for board, maximizing in positions(3, 15):
+            for depth in (3, 4, 5):
+                score = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[1]
+                self.assertEqual(minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing, tt, orderer)[1],
+                                 score, f"{board} depth {depth}")
+
+    def test_iterative_deepening_matches_fixed_depth(self):
+        tt = TranspositionTable(1)
+        orderer = MoveOrderer()
+        for board, maximizing in positions(4, 10):
+            for depth in (1, 3, 5):
+                score = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[1]
+                result = iterative_deepening(board, depth, maximizing, tt=tt, orderer=orderer, endgame_cells=None)
+                self.assertEqual(result[1], score, f"{board} depth {depth}")
+                self.assertEqual(result[3], min(depth, board.count("0")))
+
+    def test_other_geometries(self):
+        for shape in ((5, 6, 4), (8, 9, 4), (6, 9, 5)):
+            geometry = get_geometry(*shape)
+            for board, maximizing in positions(5, 4, geometry):
+                score = minimax(board, 3, maximizing, geometry=geometry)[1]
+                result = minimax_alpha_beta(board, 3, -math.inf, math.inf, maximizing, TranspositionTable(1),
+                                            MoveOrderer(geometry=geometry), geometry=geometry)
+                self.assertEqual(result[1], score, f"{shape}: {board}")
+
+
+class MirrorTest(unittest.TestCase):
+    def test_mirror_image_has_the_same_value(self):
+        geometry = get_geometry()
+        tt = TranspositionTable(1)  # Shared, so the mirror image's search reads the entries of the first
+        for board, maximizing in positions(6, 15):
+            reflection = mirrored(board, geometry)
+            for depth in (3, 5):
+                score = minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing, tt)[1]
+                mirror_col, mirror_score, _ = minimax_alpha_beta(reflection, depth, -math.inf, math.inf, maximizing,
+                                                                 tt)
+                self.assertEqual(mirror_score, score, f"{board} depth {depth}")
+                self.assertEqual(child_value(reflection, mirror_col, depth, maximizing), score)
+
+    def test_symmetric_roots(self):
+        # Only half the root moves are searched; the value is still the full search's
+        for moves in ("", "3", "33", "2343", "1353", "330066"):
+            position = Position()
+            for i, col in enumerate(moves):
+                position.play(int(col), PLAYER_PIECE if i % 2 == 0 else AI_PIECE)
+            self.assertTrue(position.is_symmetric())
+            board = position.to_string()
+            maximizing = len(moves) % 2 == 1
+            for depth in (2, 3, 4):
+                self.assertEqual(minimax_alpha_beta(board, depth, -math.inf, math.inf, maximizing)[1],
+                                 minimax(board, depth, maximizing)[1], f"{moves} depth {depth}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sessions import GameError, SessionManager
+
+
+class CloseTest(unittest.IsolatedAsyncioTestCase):
+    async def test_close_fails_waiting_ai_moves(self):
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        manager = SessionManager(workers=1, executor=executor)
+        # One search running and one queued behind it, each too deep to end before its second is up
+        games = [await manager.new_game(owner=owner, ai_first=True, depth=20, move_time=1.0) for owner in ("a", "b")]
+        moves = [asyncio.create_task(manager.ai_move(game)) for game in games]
+        await asyncio.sleep(0.1)
+        self.assertTrue((await manager.state(games[0]))["searching"])
+
+        start = time.perf_counter()
+        await manager.close()
+        for move in moves:
+            with self.assertRaises(GameError):
+                await asyncio.wait_for(move, 1)
+        self.assertLess(time.perf_counter() - start, 0.5)  # Not left to finish the search
+        for game in games:
+            self.assertFalse((await manager.state(game))["searching"])
+        with self.assertRaises(GameError):
+            await manager.ai_move(games[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
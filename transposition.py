@@ -0,0 +1,97 @@
+from array import array
+
+# Bound types
+EXACT = 0
+LOWER = 1  # Stored value is a lower bound (search failed high)
+UPPER = 2  # Stored value is an upper bound (search failed low)
+
+NO_MOVE = -1
+
+# key (Q) + value (q) + depth (b) + bound (b) + move (b)
+ENTRY_BYTES = 8 + 8 + 1 + 1 + 1
+
+
+class TranspositionTable:
+    """Fixed-size transposition table keyed by Zobrist hash.
+
+    Entries live in preallocated parallel arrays, so memory use is fixed at
+    construction. Each bucket has two slots: a depth-preferred slot that is only
+    replaced by an equal or deeper search, and an always-replace slot that takes
+    everything else. ``hits``, ``misses`` and ``collisions`` (misses where the
+    bucket was occupied by other positions) are counted for sizing.
+    """
+
+    def __init__(self, size_mb=16):
+        buckets = 1
+        while buckets * 4 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.bucket_mask = buckets - 1
+        slots = buckets * 2
+
+        self.keys = array('Q', [0]) * slots
+        self.values = array('q', [0]) * slots
+        self.depths = array('b', [-1]) * slots  # -1 marks an empty slot
+        self.bounds = array('b', [EXACT]) * slots
+        self.moves = array('b', [NO_MOVE]) * slots
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _find(self, key):
+        slot = (key & self.bucket_mask) << 1
+        if self.depths[slot] >= 0 and self.keys[slot] == key:
+            return slot
+        if self.depths[slot + 1] >= 0 and self.keys[slot + 1] == key:
+            return slot + 1
+        return -1
+
+    def lookup(self, key):
+        """Return ``(depth, value, bound, move)`` for ``key`` or None."""
+        slot = self._find(key)
+        if slot < 0:
+            self.misses += 1
+            base = (key & self.bucket_mask) << 1
+            if self.depths[base] >= 0 or self.depths[base + 1] >= 0:
+                self.collisions += 1
+            return None
+        self.hits += 1
+        move = self.moves[slot]
+        return self.depths[slot], self.values[slot], self.bounds[slot], (None if move == NO_MOVE else move)
+
+    def store(self, key, depth, value, bound, move):
+        """Store a search result, honouring the two-tier replacement policy."""
+        slot = (key & self.bucket_mask) << 1
+        if self.keys[slot] == key or depth >= self.depths[slot]:
+            pass  # Depth-preferred slot: same position or a search at least as deep
+        else:
+            slot += 1  # Always-replace slot
+        self.keys[slot] = key
+        self.values[slot] = int(value)
+        self.depths[slot] = min(depth, 127)
+        self.bounds[slot] = bound
+        self.moves[slot] = NO_MOVE if move is None else move
+        self.stores += 1
+
+    def clear(self):
+        """Empty the table and reset the counters."""
+        self.depths = array('b', [-1]) * len(self.depths)
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def stats(self):
+        """Return the counters and occupancy as a dict."""
+        probes = self.hits + self.misses
+        return {
+            "slots": len(self.keys),
+            "size_bytes": len(self.keys) * ENTRY_BYTES,
+            "used": len(self.depths) - self.depths.count(-1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
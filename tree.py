@@ -0,0 +1,183 @@
+from array import array
+import math
+
+import numpy as np
+
+from bitboard import AI_PIECE
+
+# Recording modes
+TREE_OFF = "off"          # Record nothing
+TREE_ROOT = "root"        # Record the root and its children only
+TREE_FULL = "full"        # Record every visited node
+TREE_SAMPLED = "sampled"  # Record visited nodes until max_nodes are stored
+
+TREE_MODES = (TREE_OFF, TREE_ROOT, TREE_FULL, TREE_SAMPLED)
+
+NO_PARENT = -1
+
+
+class SearchTree:
+    """Search tree stored as parallel arrays instead of one object per node.
+
+    Node ``i`` was reached from ``parents[i]`` (-1 for the root) by playing
+    ``moves[i]``, has ``players[i]`` to move and was scored ``scores[i]``.
+    Nodes are appended in search order, so children appear after their parent
+    in the order they were searched.
+    """
+
+    def __init__(self, mode=TREE_FULL, max_nodes=None):
+        if mode not in (TREE_ROOT, TREE_FULL, TREE_SAMPLED):
+            raise ValueError(f"cannot record a tree in mode {mode!r}")
+        if mode == TREE_SAMPLED and max_nodes is None:
+            raise ValueError("sampled mode needs max_nodes")
+        self.mode = mode
+        self.max_nodes = max_nodes if mode == TREE_SAMPLED else None
+        self.parents = array('i')
+        self.moves = array('b')
+        self.players = array('b')
+        self.scores = array('d')
+        self._child_offsets = None  # CSR child index, built on first use
+        self._child_indices = None
+
+    @classmethod
+    def for_mode(cls, mode, max_nodes=None):
+        """Return a tree recording in ``mode``, or None when mode is TREE_OFF."""
+        if mode == TREE_OFF:
+            return None
+        return cls(mode, max_nodes)
+
+    @classmethod
+    def from_arrays(cls, parents, moves, players, scores):
+        """A full tree over existing node arrays (array('i'), 'b', 'b' and 'd'),
+        for instance read back from a file."""
+        tree = cls(TREE_FULL)
+        tree.parents, tree.moves, tree.players, tree.scores = parents, moves, players, scores
+        return tree
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent, move, player):
+        """Record a node and return its index, or -1 if the mode skips it."""
+        if self.mode == TREE_ROOT and parent > 0:
+            return -1
+        if self.max_nodes is not None and len(self.parents) >= self.max_nodes:
+            return -1
+        self.parents.append(parent)
+        self.moves.append(-1 if move is None else move)
+        self.players.append(player)
+        self.scores.append(math.nan)
+        self._child_offsets = None
+        return len(self.parents) - 1
+
+    def children(self, index):
+        """Indices of the recorded children of ``index`` in search order."""
+        if self._child_offsets is None:
+            self._build_children()
+        return self._child_indices[self._child_offsets[index]:self._child_offsets[index + 1]]
+
+    def _build_children(self):
+        # Vectorized: a stable sort by parent keeps siblings in search order,
+        # so a million-node tree is indexed in tens of milliseconds
+        count = len(self.parents)
+        parents = np.frombuffer(self.parents, dtype=np.intc)
+        order = np.argsort(parents, kind="stable")
+        indices = order[np.count_nonzero(parents < 0):]  # Roots sort first and have no parent slot
+        offsets = np.zeros(count + 1, dtype=np.intc)
+        np.cumsum(np.bincount(parents[parents >= 0], minlength=count), out=offsets[1:])
+        self._child_offsets = array('i', offsets.tobytes())
+        self._child_indices = array('i', indices.astype(np.intc).tobytes())
+
+    def child_count(self, index):
+        if self._child_offsets is None:
+            self._build_children()
+        return self._child_offsets[index + 1] - self._child_offsets[index]
+
+    def subtree_depths(self, index=0, max_depth=None):
+        """Depth below ``index`` of every node in its subtree, at most
+        ``max_depth``, as a numpy array holding -1 for the other nodes."""
+        if self._child_offsets is None:
+            self._build_children()
+        offsets = np.frombuffer(self._child_offsets, dtype=np.intc)
+        indices = np.frombuffer(self._child_indices, dtype=np.intc)
+        depths = np.full(len(self.parents), -1, dtype=np.intc)
+        frontier = np.array([index], dtype=np.intc)
+        depth = 0
+        # One level at a time: the children of the whole frontier in one gather
+        while len(frontier):
+            depths[frontier] = depth
+            if depth == max_depth:
+                break
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            first = np.cumsum(counts) - counts
+            frontier = indices[np.arange(counts.sum()) + np.repeat(starts - first, counts)]
+            depth += 1
+        return depths
+
+    def best_child(self, index):
+        """The child the search chose at ``index``: the first in search order
+        with the best score for the player to move, or -1 without scored children."""
+        maximizing = self.players[index] == AI_PIECE
+        best = -1
+        best_score = None
+        for child in self.children(index):
+            score = self.scores[child]
+            if math.isnan(score):
+                continue
+            if best < 0 or (score > best_score if maximizing else score < best_score):
+                best, best_score = child, score
+        return best
+
+    def principal_variation(self, index=0):
+        """Indices of the nodes below ``index`` along the best line, in order."""
+        line = []
+        index = self.best_child(index)
+        while index >= 0:
+            line.append(index)
+            index = self.best_child(index)
+        return line
+
+    def root(self):
+        return TreeNode(self, 0) if len(self.parents) else None
+
+
+class TreeNode:
+    """Read-only view of one node of a SearchTree with the old Node attributes."""
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, TreeNode) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    @property
+    def move(self):
+        move = self.tree.moves[self.index]
+        return None if move < 0 else move
+
+    @property
+    def score(self):
+        score = self.tree.scores[self.index]
+        if math.isnan(score):
+            return None
+        return int(score) if score.is_integer() else score
+
+    @property
+    def player(self):
+        return self.tree.players[self.index]
+
+    @property
+    def parent(self):
+        parent = self.tree.parents[self.index]
+        return None if parent < 0 else TreeNode(self.tree, parent)
+
+    @property
+    def children(self):
+        return [TreeNode(self.tree, i) for i in self.tree.children(self.index)]
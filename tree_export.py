@@ -0,0 +1,261 @@
+"""Search trees written to files and read back.
+
+A recorded SearchTree can hold a million nodes, far too many to print. The
+exporter streams it to a file in chunks instead, either as compact binary
+records or as JSON lines, optionally cut at ``max_depth`` plies below the
+root or reduced to the principal variation. Nodes are numbered again in the
+file, parents before children and siblings in search order.
+
+    binary  a header, then one 14-byte record per node: parent number,
+            move, player to move and score (NaN when unscored)
+    jsonl   a header line, then {"node", "parent", "move", "player", "score"}
+            per line, with null for the root's move and unscored nodes
+
+TreeReader reads either format lazily: binary files are memory-mapped and
+records unpacked only when asked for. ``tree()`` loads the whole file as a
+SearchTree for the visualizer.
+
+    python tree_export.py search 100000000000000000000000000000000000000000 --depth 6 --out tree.c4t
+    python tree_export.py show tree.c4t --depth 2
+    python tree_export.py view tree.c4t
+"""
+import argparse
+import json
+import math
+import mmap
+import struct
+from array import array
+
+import numpy as np
+
+from tree import TREE_FULL, SearchTree
+
+MAGIC = b"C4T1"
+HEADER = struct.Struct("<4shBx")  # magic, depth limit (-1 for none), PV only
+RECORD = struct.Struct("<ibbd")   # parent (-1 for the root), move (-1 for the root), player, score
+RECORD_DTYPE = np.dtype([("parent", "<i4"), ("move", "i1"), ("player", "i1"), ("score", "<f8")])
+FORMATS = ("binary", "jsonl")
+CHUNK = 65536  # Records gathered and written at a time
+
+
+def _selected_nodes(tree, root, max_depth, pv_only):
+    """Indices of the exported nodes in file order."""
+    if pv_only:
+        line = tree.principal_variation(root)
+        return np.array([root] + line[:max_depth], dtype=np.intc)
+    return np.flatnonzero(tree.subtree_depths(root, max_depth) >= 0).astype(np.intc)
+
+
+def export_tree(tree, path, root=0, fmt="binary", max_depth=None, pv_only=False):
+    """Write the subtree of ``root`` to ``path``; returns the number of nodes written.
+
+    ``max_depth`` keeps the nodes that many plies below ``root`` at most and
+    ``pv_only`` only ``root`` and the principal variation below it."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown tree format {fmt!r}")
+    selected = _selected_nodes(tree, root, max_depth, pv_only) if len(tree) else np.zeros(0, dtype=np.intc)
+    # File numbers of the exported nodes, so parents can be renumbered
+    numbers = np.full(len(tree), -1, dtype=np.intc)
+    numbers[selected] = np.arange(len(selected), dtype=np.intc)
+    parents = np.frombuffer(tree.parents, dtype=np.intc)
+    moves = np.frombuffer(tree.moves, dtype=np.int8)
+    players = np.frombuffer(tree.players, dtype=np.int8)
+    scores = np.frombuffer(tree.scores, dtype=np.float64)
+
+    with open(path, "wb") as f:
+        if fmt == "binary":
+            f.write(HEADER.pack(MAGIC, -1 if max_depth is None else max_depth, pv_only))
+        else:
+            header = {"format": MAGIC.decode(), "max_depth": max_depth, "pv_only": pv_only}
+            f.write((json.dumps(header) + "\n").encode())
+        for start in range(0, len(selected), CHUNK):
+            chunk = selected[start:start + CHUNK]
+            records = np.empty(len(chunk), dtype=RECORD_DTYPE)
+            records["parent"] = np.where(chunk == root, -1, numbers[parents[chunk]])
+            records["move"] = moves[chunk]
+            records["player"] = players[chunk]
+            records["score"] = scores[chunk]
+            if fmt == "binary":
+                f.write(records.tobytes())
+            else:
+                f.write("".join(_json_line(start + i, *record) for i, record in enumerate(records.tolist())).encode())
+    return len(selected)
+
+
+def _json_line(node, parent, move, player, score):
+    if math.isnan(score):
+        score = "null"
+    elif score.is_integer():
+        score = int(score)
+    move = "null" if move < 0 else move
+    return f'{{"node": {node}, "parent": {parent}, "move": {move}, "player": {player}, "score": {score}}}\n'
+
+
+class TreeReader:
+    """An exported tree, read as needed.
+
+    Iterating yields ``(parent, move, player, score)`` per node in file
+    order, with None for the root's move and unscored nodes as in TreeNode.
+    Binary files also support ``len`` and indexing without reading the rest.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = None
+        if self._file.read(len(MAGIC)) == MAGIC:
+            self.format = "binary"
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Too short to map
+                self._file.close()
+                raise ValueError(f"{path} is not a search tree file")
+            _, limit, pv_only = HEADER.unpack_from(self._map, 0)
+            if (len(self._map) - HEADER.size) % RECORD.size:
+                self.close()
+                raise ValueError(f"{path} is truncated")
+            self.size = (len(self._map) - HEADER.size) // RECORD.size
+        else:
+            self.format = "jsonl"
+            self._file.seek(0)
+            try:
+                header = json.loads(self._file.readline())
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get("format") != MAGIC.decode():
+                self._file.close()
+                raise ValueError(f"{path} is not a search tree file")
+            limit = header["max_depth"]
+            pv_only = header["pv_only"]
+            self.size = None  # Unknown until the file is read
+        self.max_depth = None if limit is None or limit < 0 else limit
+        self.pv_only = bool(pv_only)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        if self.size is None:
+            raise TypeError("the node count of a JSON lines tree is only known once it is read")
+        return self.size
+
+    def __getitem__(self, node):
+        if self._map is None:
+            raise TypeError("only binary tree files can be indexed")
+        if not 0 <= node < self.size:
+            raise IndexError(node)
+        return _node_tuple(*RECORD.unpack_from(self._map, HEADER.size + node * RECORD.size))
+
+    def __iter__(self):
+        if self._map is not None:
+            for node in range(self.size):
+                yield _node_tuple(*RECORD.unpack_from(self._map, HEADER.size + node * RECORD.size))
+            return
+        self._file.seek(0)
+        self._file.readline()  # Header
+        for line in self._file:
+            record = json.loads(line)
+            yield record["parent"], record["move"], record["player"], record["score"]
+
+    def tree(self):
+        """Load every node as a SearchTree; its root is node 0."""
+        if self._map is not None:
+            records = np.frombuffer(self._map, dtype=RECORD_DTYPE, offset=HEADER.size)
+            try:
+                arrays = (array('i', records["parent"].astype(np.intc).tobytes()),
+                          array('b', records["move"].tobytes()),
+                          array('b', records["player"].tobytes()),
+                          array('d', records["score"].tobytes()))
+            finally:
+                del records  # The map cannot be closed while numpy holds it
+            return SearchTree.from_arrays(*arrays)
+        parents, moves, players, scores = array('i'), array('b'), array('b'), array('d')
+        for parent, move, player, score in self:
+            parents.append(parent)
+            moves.append(-1 if move is None else move)
+            players.append(player)
+            scores.append(math.nan if score is None else score)
+        return SearchTree.from_arrays(parents, moves, players, scores)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def _node_tuple(parent, move, player, score):
+    if math.isnan(score):
+        score = None
+    elif score.is_integer():
+        score = int(score)
+    return parent, None if move < 0 else move, player, score
+
+
+def view(tree):
+    """Browse ``tree`` in a pygame window until it is closed."""
+    import pygame
+    from render import TextCache
+    from tree_view import TreeView
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("Minimax Tree Visualization")
+    clock = pygame.time.Clock()
+    browser = TreeView(tree, 0, 800, 600, TextCache())
+    redraw = True
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            else:
+                redraw |= browser.handle_event(event)
+        if redraw:
+            browser.draw(screen)
+            pygame.display.update()
+            redraw = False
+        clock.tick(30)
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="search a board and export its tree")
+    search.add_argument("board", help="board string as in utils.array_to_string")
+    search.add_argument("--depth", type=int, default=5)
+    search.add_argument("--out", required=True)
+    search.add_argument("--format", choices=FORMATS, default="binary")
+    search.add_argument("--max-depth", type=int, help="export this many plies below the root at most")
+    search.add_argument("--pv-only", action="store_true", help="export only the principal variation")
+    show = commands.add_parser("show", help="print an exported tree")
+    show.add_argument("path")
+    show.add_argument("--depth", type=int, help="print this many plies below the root at most")
+    browse = commands.add_parser("view", help="browse an exported tree in the visualizer")
+    browse.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "search":
+        from utils import minimax_alpha_beta
+        from transposition import TranspositionTable
+        col, score, root = minimax_alpha_beta(args.board, args.depth, -math.inf, math.inf, True,
+                                              tt=TranspositionTable(), tree_mode=TREE_FULL)
+        count = export_tree(root.tree, args.out, root.index, args.format, args.max_depth, args.pv_only)
+        print(f"move {col}, score {score}: {count} of {len(root.tree)} nodes written to {args.out}")
+        return
+
+    with TreeReader(args.path) as reader:
+        tree = reader.tree()
+    if args.command == "show":
+        from utils import traverse_tree
+        traverse_tree(tree.root(), max_depth=args.depth)
+    else:
+        view(tree)
+
+
+if __name__ == "__main__":
+    main()
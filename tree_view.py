@@ -0,0 +1,211 @@
+"""Paged view of a recorded search tree for the visualizer window.
+
+A tree can hold a million nodes, so the view never walks it: it keeps the
+path from the root to the node on display and a page of that node's
+children, and only the nodes on screen are read, drawn and hit-tested. Work
+per interaction depends on the page size and the branching factor, never on
+the size of the tree.
+
+    click a child        open it
+    click the node       back to its parent (also Up or Backspace)
+    Left / Right         previous / next page of children
+    P                    one ply along the principal variation
+    End                  to the end of the principal variation
+    Home                 back to the root
+"""
+import math
+
+import pygame
+
+from bitboard import PLAYER_PIECE
+from render import get_font
+
+PAGE_SIZE = 7  # Children shown at once
+NODE_RADIUS = 40
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+YELLOW = (255, 255, 0)
+GREEN = (0, 200, 0)
+GRAY = (200, 200, 200)
+
+
+def _score_label(score):
+    if math.isnan(score):
+        return "-"
+    return str(int(score)) if score.is_integer() else f"{score:.1f}"
+
+
+class TreeView:
+    """Navigation state and drawing for a SearchTree seen from ``root``.
+
+    ``handle_event`` returns True when the view changed and needs ``draw``.
+    """
+
+    def __init__(self, tree, root=0, width=800, height=600, text=None):
+        self.tree = tree
+        self.path = [root]  # Indices from the root to the node on display
+        self.page = 0
+        self.width = width
+        self.height = height
+        self.text = text  # A render.TextCache, or None to render labels every frame
+        self.hits = []  # (rect, action, argument) of what can be clicked in the last frame
+
+    @property
+    def current(self):
+        return self.path[-1]
+
+    def page_count(self):
+        return max(1, -(-self.tree.child_count(self.current) // PAGE_SIZE))
+
+    def visible_children(self):
+        start = self.page * PAGE_SIZE
+        children = self.tree.children(self.current)
+        return children[start:start + PAGE_SIZE]
+
+    # Navigation
+
+    def open(self, child):
+        self.path.append(child)
+        self.page = 0
+
+    def up(self):
+        if len(self.path) == 1:
+            return False
+        child = self.path.pop()
+        # Show the page holding the node we came from
+        self.page = list(self.tree.children(self.current)).index(child) // PAGE_SIZE
+        return True
+
+    def home(self):
+        if len(self.path) == 1 and self.page == 0:
+            return False
+        del self.path[1:]
+        self.page = 0
+        return True
+
+    def turn_page(self, step):
+        page = min(max(self.page + step, 0), self.page_count() - 1)
+        changed = page != self.page
+        self.page = page
+        return changed
+
+    def follow_pv(self, plies=None):
+        """Go ``plies`` moves down the principal variation, or to its end."""
+        moved = False
+        while plies is None or plies > 0:
+            child = self.tree.best_child(self.current)
+            if child < 0:
+                break
+            self.open(child)
+            moved = True
+            if plies is not None:
+                plies -= 1
+        return moved
+
+    def click(self, action, argument):
+        if action == "open":
+            self.open(argument)
+            return True
+        if action == "up":
+            return self.up()
+        return self.turn_page(argument)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for rect, action, argument in self.hits:
+                if rect.collidepoint(event.pos):
+                    return self.click(action, argument)
+            return False
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_LEFT:
+            return self.turn_page(-1)
+        if event.key == pygame.K_RIGHT:
+            return self.turn_page(1)
+        if event.key in (pygame.K_UP, pygame.K_BACKSPACE):
+            return self.up()
+        if event.key == pygame.K_HOME:
+            return self.home()
+        if event.key == pygame.K_p:
+            return self.follow_pv(1)
+        if event.key == pygame.K_END:
+            return self.follow_pv()
+        return False
+
+    # Drawing
+
+    def _label(self, font, text, color):
+        if self.text is not None:
+            return self.text.render(font, text, color)
+        return font.render(text, True, color)
+
+    def _blit_centered(self, surface, font, text, color, center):
+        label = self._label(font, text, color)
+        surface.blit(label, label.get_rect(center=center))
+
+    def _draw_node(self, surface, index, center, outline, width):
+        color = RED if self.tree.players[index] == PLAYER_PIECE else YELLOW
+        pygame.draw.circle(surface, color, center, NODE_RADIUS)
+        pygame.draw.circle(surface, outline, center, NODE_RADIUS, width)
+        font = get_font("monospace", 20)
+        self._blit_centered(surface, font, _score_label(self.tree.scores[index]), BLACK, center)
+        move = self.tree.moves[index]
+        self._blit_centered(surface, font, "Root" if move < 0 else f"Move: {move}", WHITE,
+                            (center[0], center[1] + NODE_RADIUS + 20))
+        return pygame.Rect(center[0] - NODE_RADIUS, center[1] - NODE_RADIUS, NODE_RADIUS * 2, NODE_RADIUS * 2)
+
+    def draw(self, surface):
+        """Draw the node on display and one page of its children."""
+        surface.fill(BLACK)
+        small = get_font("monospace", 16)
+        self.hits = []
+
+        # Moves from the root, the oldest dropped when they do not fit
+        moves = [str(self.tree.moves[i]) for i in self.path[1:]]
+        breadcrumb = "Path: root " + " ".join(moves)
+        limit = self.width // 10
+        if len(breadcrumb) > limit:
+            breadcrumb = "Path: ... " + breadcrumb[len(breadcrumb) - limit + 10:]
+        surface.blit(self._label(small, breadcrumb, WHITE), (10, 10))
+
+        count = self.tree.child_count(self.current)
+        start = self.page * PAGE_SIZE
+        status = f"Depth {len(self.path) - 1}   {count} children"
+        if count > PAGE_SIZE:
+            status += f"   {start + 1}-{min(start + PAGE_SIZE, count)}   page {self.page + 1}/{self.page_count()}"
+        surface.blit(self._label(small, status, GRAY), (10, 32))
+
+        top = (self.width // 2, 140)
+        rect = self._draw_node(surface, self.current, top, WHITE, 2)
+        self.hits.append((rect, "up", None))
+
+        best = self.tree.best_child(self.current)
+        children = self.visible_children()
+        spacing = self.width // (len(children) + 1)
+        y = top[1] + 230
+        for i, child in enumerate(children):
+            center = (spacing * (i + 1), y)
+            pygame.draw.line(surface, WHITE, (top[0], top[1] + NODE_RADIUS + 35), (center[0], center[1] - NODE_RADIUS))
+            on_pv = child == best
+            rect = self._draw_node(surface, child, center, GREEN if on_pv else WHITE, 5 if on_pv else 2)
+            grandchildren = self.tree.child_count(child)
+            if grandchildren:
+                label = f"{grandchildren} child" if grandchildren == 1 else f"{grandchildren} children"
+                self._blit_centered(surface, small, label, GRAY,
+                                    (center[0], center[1] + NODE_RADIUS + 42))
+            self.hits.append((rect, "open", child))
+
+        # Page arrows beside the children
+        if self.page > 0:
+            rect = pygame.Rect(0, y - 30, 30, 60)
+            self._blit_centered(surface, get_font("monospace", 32), "<", WHITE, rect.center)
+            self.hits.append((rect, "page", -1))
+        if self.page < self.page_count() - 1:
+            rect = pygame.Rect(self.width - 30, y - 30, 30, 60)
+            self._blit_centered(surface, get_font("monospace", 32), ">", WHITE, rect.center)
+            self.hits.append((rect, "page", 1))
+
+        help_text = "Click: open/up  </>: page  Up: parent  P: PV step  End: PV end  Home: root"
+        self._blit_centered(surface, small, help_text, GRAY, (self.width // 2, self.height - 20))
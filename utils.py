@@ -1,47 +1,107 @@
 import numpy as np
 import math
-
-# Constants
-ROW_COUNT = 6
-COLUMN_COUNT = 7
-EMPTY = 0
-PLAYER_PIECE = 1
-AI_PIECE = 2
-
-class Node:
-    def __init__(self, board_str, move=None, score=None, parent=None, player=None):
-        self.board_str = board_str    # Board state as a string
-        self.move = move              # The move (column index) that led to this node
-        self.score = score            # Heuristic score of the node
-        self.parent = parent          # Parent node
-        self.children = []            # List of child nodes
-        self.player = player          # Which player's move it is
-        # Visualization attributes
-        self.position = None          # (x, y) position on the screen
-        self.expanded = False         # Whether the node's children are displayed
-        self.rect = None              # pygame.Rect for clickable area
+import time
+from bitboard import AI_PIECE, COLUMN_COUNT, EMPTY, PLAYER_PIECE, ROW_COUNT, STANDARD, Position, get_geometry
+from transposition import EXACT, LOWER, UPPER
+from tree import SearchTree, TREE_OFF, NO_PARENT
+
+class SearchAborted(Exception):
+    """Raised inside a search when its time or node budget is exhausted or it is cancelled."""
+
+class SearchContext:
+    """Per-search state threaded through the recursive alpha-beta search."""
+    CHECK_INTERVAL = 1024  # Nodes between clock checks
+
+    def __init__(self, tt=None, deadline=None, node_limit=None, orderer=None, tree=None, batch_leaves=False,
+                 stop_event=None, stats=None, cache=None):
+        self.tt = tt                  # Optional TranspositionTable
+        self.tree = tree              # Optional SearchTree to record visited nodes in
+        self.batch_leaves = batch_leaves  # Score the children of depth-1 nodes in one batched call
+        self.orderer = orderer        # Optional ordering.MoveOrderer; None keeps columns left to right
+        self.deadline = deadline      # time.perf_counter() value to stop at, or None
+        self.node_limit = node_limit  # Maximum nodes to visit, or None
+        self.stop_event = stop_event  # Optional threading.Event that cancels the search when set
+        self.stats = stats            # Optional stats.SearchStats to count into
+        self.cache = cache            # Optional disk_cache.DiskCache consulted when the tt misses
+        self.nodes = 0
+
+    def visit(self):
+        """Count a node and abort the search once a budget is spent or it is cancelled."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchAborted()
+        if self.nodes % self.CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchAborted()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchAborted()
 
 # Conversion Functions
-def string_to_array(board_str):
+def string_to_array(board_str, geometry=None):
     """Convert a string board state to a numpy array."""
-    return np.array([int(cell) for cell in board_str]).reshape(ROW_COUNT, COLUMN_COUNT)
+    geometry = geometry if geometry is not None else STANDARD
+    return np.array([int(cell) for cell in board_str]).reshape(geometry.rows, geometry.columns)
 
 def array_to_string(board_array):
     """Convert a numpy array board state to a string."""
     return ''.join(map(str, board_array.flatten().astype(int)))
 
+class _ArrayTables:
+    """Numpy lookup tables of one geometry for the array-based helpers."""
+
+    def __init__(self, geometry):
+        rows, columns = geometry.rows, geometry.columns
+        # Bitboard bit index of each cell in row-major order
+        self.cell_bits = np.array([c * geometry.h1 + r for r in range(rows) for c in range(columns)], dtype=np.intp)
+        self.mask_bytes = (geometry.bits + 7) // 8
+        # Flat (row-major) cell indices of every window, shape (windows, connect)
+        self.window_indices = np.array(geometry.window_cells, dtype=np.intp)
+        # score_table[own][opp] is the score of a window with `own` of the
+        # scored pieces and `opp` of the opponent's
+        self.score_table = np.array(geometry.window_scores)
+
+_array_tables = {}
+
+def _tables(geometry):
+    tables = _array_tables.get(geometry)
+    if tables is None:
+        tables = _array_tables[geometry] = _ArrayTables(geometry)
+    return tables
+
+def _mask_cells(mask, geometry=STANDARD):
+    """Unpack a bitboard into a row-major 0/1 vector of the board's cells."""
+    tables = _tables(geometry)
+    bits = np.unpackbits(np.frombuffer(mask.to_bytes(tables.mask_bytes, 'little'), dtype=np.uint8),
+                         bitorder='little')
+    return bits[tables.cell_bits]
+
+def position_to_array(position):
+    """Convert a Position to a (rows, columns) int8 array without going through a string."""
+    geometry = position.geometry
+    cells = _mask_cells(position.masks[PLAYER_PIECE], geometry) * np.int8(PLAYER_PIECE)
+    cells += _mask_cells(position.masks[AI_PIECE], geometry) * np.int8(AI_PIECE)
+    return cells.astype(np.int8).reshape(geometry.rows, geometry.columns)
+
+def child_boards(position, moves, piece):
+    """Stack the boards reached by dropping ``piece`` in each of ``moves``."""
+    geometry = position.geometry
+    boards = np.repeat(position_to_array(position).reshape(1, -1), len(moves), axis=0)
+    cells = [position.heights[col] * geometry.columns + col for col in moves]
+    boards[np.arange(len(moves)), cells] = piece
+    return boards.reshape(-1, geometry.rows, geometry.columns)
+
 # Core Functions
 def is_valid_location(board_array, col):
     """Check if a move in the column is valid in array state."""
-    return board_array[ROW_COUNT - 1][col] == EMPTY
+    return board_array[len(board_array) - 1][col] == EMPTY
 
 def get_valid_moves(board_array):
     """Get a list of valid columns for a move in array state."""
-    return [col for col in range(COLUMN_COUNT) if is_valid_location(board_array, col)]
+    return [col for col in range(len(board_array[0])) if is_valid_location(board_array, col)]
 
 def get_next_open_row(board_array, col):
     """Get the next available row in a column for an array-based state."""
-    for r in range(ROW_COUNT):
+    for r in range(len(board_array)):
         if board_array[r][col] == EMPTY:
             return r
     return -1  # No valid row found
@@ -52,290 +112,502 @@ def drop_piece(board_array, row, col, player):
 
 def is_terminal_node(board_array):
     """Check if the game has reached a terminal state."""
-    return np.count_nonzero(board_array) == ROW_COUNT * COLUMN_COUNT
-
-def traverse_tree(node, prefix=""):
-    print(f"{prefix}Player: {node.player}, Move: {node.move}, Score: {node.score}")
-    children = node.children
-    for i, child in enumerate(children):
-        if i == len(children) - 1:
-            new_prefix = prefix + "    "
-            branch = "└── "
-        else:
-            new_prefix = prefix + "│   "
-            branch = "├── "
-        traverse_tree(child, new_prefix + branch)
-
-def count_connected_fours(board, piece):
-    count = 0
-    # Check horizontal
-    for r in range(ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            if board[r][c] == piece and board[r][c + 1] == piece and board[r][c + 2] == piece and board[r][c + 3] == piece:
-                count += 1
-    # Check vertical
-    for c in range(COLUMN_COUNT):
-        for r in range(ROW_COUNT - 3):
-            if board[r][c] == piece and board[r + 1][c] == piece and board[r + 2][c] == piece and board[r + 3][c] == piece:
-                count += 1
-    # Check positive diagonals
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            if board[r][c] == piece and board[r + 1][c + 1] == piece and board[r + 2][c + 2] == piece and board[r + 3][c + 3] == piece:
-                count += 1
-    # Check negative diagonals
-    for r in range(3, ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            if board[r][c] == piece and board[r - 1][c + 1] == piece and board[r - 2][c + 2] == piece and board[r - 3][c + 3] == piece:
-                count += 1
-    return count
-
-def evaluate_window(window, piece):
-    score = 0
+    return np.count_nonzero(board_array) == np.size(board_array)
+
+def traverse_tree(node, prefix="", max_depth=None):
+    """Print ``node`` and its subtree, ``max_depth`` levels deep at most.
+
+    Walks with an explicit stack, so deep trees cannot hit the recursion
+    limit; tree_export writes large trees to a file instead."""
+    stack = [(node, prefix, 0)]
+    while stack:
+        node, prefix, depth = stack.pop()
+        print(f"{prefix}Player: {node.player}, Move: {node.move}, Score: {node.score}")
+        if depth == max_depth:
+            continue
+        children = node.children
+        # Pushed last to first so the first child is printed next
+        for i in range(len(children) - 1, -1, -1):
+            if i == len(children) - 1:
+                child_prefix = prefix + "    " + "└── "
+            else:
+                child_prefix = prefix + "│   " + "├── "
+            stack.append((children[i], child_prefix, depth + 1))
+
+def _gather_windows(board, geometry=None):
+    """Return the (..., windows, connect) window contents of one board or a
+    stacked batch. Without a ``geometry`` the board's shape is used, with
+    lines of four."""
+    board = np.asarray(board)
+    if geometry is None:
+        geometry = get_geometry(*board.shape[-2:])
+    flat = board.reshape(board.shape[:-2] + (geometry.size,))
+    return flat[..., _tables(geometry).window_indices], geometry
+
+def count_connected_fours(board, piece, geometry=None):
+    """Count the windows filled by ``piece``. ``board`` may be a Position, a
+    (rows, columns) array, or a stacked (N, rows, columns) batch, in which
+    case an array of N counts is returned."""
+    if isinstance(board, Position):
+        return board.count_fours(piece)
+    windows, _ = _gather_windows(board, geometry)
+    counts = (windows == piece).all(axis=-1).sum(axis=-1)
+    return int(counts) if counts.ndim == 0 else counts
+
+def score_position(board, piece, geometry=None):
+    """Heuristic score of ``board`` for ``piece``. Accepts the same board types
+    as count_connected_fours and scores a stacked batch in one call."""
+    if isinstance(board, Position):
+        return board.score(piece)
     opp_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
-
-    if window.count(piece) == 4:
-        score += 100
-    elif window.count(piece) == 3 and window.count(EMPTY) == 1:
-        score += 5
-    elif window.count(piece) == 2 and window.count(EMPTY) == 2:
-        score += 2
-
-    if window.count(opp_piece) == 3 and window.count(EMPTY) == 1:
-        score -= 4
-
-    return score
-
-def score_position(board, piece):
-    score = 0
-
-    # Horizontal scoring
-    for r in range(ROW_COUNT):
-        row_array = list(board[r, :])
-        for c in range(COLUMN_COUNT - 3):
-            window = row_array[c:c + 4]
-            score += evaluate_window(window, piece)
-
-    # Vertical scoring
-    for c in range(COLUMN_COUNT):
-        col_array = list(board[:, c])
-        for r in range(ROW_COUNT - 3):
-            window = col_array[r:r + 4]
-            score += evaluate_window(window, piece)
-
-    # Positive sloped diagonal
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r + i][c + i] for i in range(4)]
-            score += evaluate_window(window, piece)
-
-    # Negative sloped diagonal
-    for r in range(3, ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r - i][c + i] for i in range(4)]
-            score += evaluate_window(window, piece)
-    return score
-
-def minimax(board_str, depth, maximizingPlayer, parent_node=None):
-    board_array = string_to_array(board_str)  # Convert to array at the start
-    valid_moves = get_valid_moves(board_array)
-    is_terminal = is_terminal_node(board_array)
-
-    player = AI_PIECE if maximizingPlayer else PLAYER_PIECE
-    current_node = Node(board_str=board_str, parent=parent_node, player=player)
+    windows, geometry = _gather_windows(board, geometry)
+    own = (windows == piece).sum(axis=-1)
+    opp = (windows == opp_piece).sum(axis=-1)
+    scores = _tables(geometry).score_table[own, opp].sum(axis=-1)
+    return int(scores) if scores.ndim == 0 else scores
+
+def minimax(board_str, depth, maximizingPlayer, tree_mode=TREE_OFF, max_nodes=None, stats=None, geometry=None,
+            time_limit=None, node_limit=None, stop_event=None):
+    """Plain minimax. Returns ``(col, score, root)`` where ``root`` is the TreeNode
+    of the recorded search tree, or None when ``tree_mode`` is TREE_OFF. Pass a
+    SearchStats as ``stats`` to collect search counters. ``board_str`` is read
+    with ``geometry``, the standard board by default.
+
+    The search raises SearchAborted once ``time_limit`` seconds or
+    ``node_limit`` nodes are spent, or when ``stop_event`` is set."""
+    start = time.perf_counter()
+    position = Position.from_string(board_str, geometry)  # Convert once at the boundary
+    context = _budget_context(start, tree_mode, max_nodes, stats, time_limit, node_limit, stop_event)
+    tree = context.tree
+    index = tree.add(NO_PARENT, None, AI_PIECE if maximizingPlayer else PLAYER_PIECE) if tree is not None else -1
+    best_col, value = _minimax(position, depth, maximizingPlayer, context, index)
+    if stats is not None:
+        _finish_stats(stats, context, position, depth, start)
+    return best_col, value, tree.root() if tree is not None else None
+
+def _budget_context(start, tree_mode, max_nodes, stats, time_limit, node_limit, stop_event):
+    """SearchContext of a full-width search that began at ``start``."""
+    deadline = start + time_limit if time_limit is not None else None
+    return SearchContext(deadline=deadline, node_limit=node_limit, tree=SearchTree.for_mode(tree_mode, max_nodes),
+                         stop_event=stop_event, stats=stats)
+
+def _finish_stats(stats, context, position, depth, start):
+    """Stats of a full-width search: its deepest line reaches the horizon or the full board."""
+    stats.nodes += context.nodes
+    stats.max_ply = max(stats.max_ply, min(depth, position.geometry.size - position.count))
+    stats.seconds += time.perf_counter() - start
+
+def _minimax(position, depth, maximizingPlayer, context, index):
+    context.visit()
+    tree, stats = context.tree, context.stats
+    valid_moves = position.valid_moves()
+    is_terminal = position.is_full()
 
     if depth == 0 or is_terminal:
-        score = score_position(board_array, AI_PIECE)
-        current_node.score = score
-        return None, score, current_node
+        score = position.score(AI_PIECE)
+        if stats is not None:
+            stats.leaves += 1
+            stats.evaluations += 1
+        if index >= 0:
+            tree.scores[index] = score
+        return None, score
             
     if maximizingPlayer:
         value = -math.inf
         best_col = None
         for col in valid_moves:
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, AI_PIECE)
-            
-            _, new_score, child_node = minimax(array_to_string(temp_board), depth - 1, False, current_node)
-            child_node.move = col
-            current_node.children.append(child_node)
+            position.play(col, AI_PIECE)
+            child = tree.add(index, col, PLAYER_PIECE) if index >= 0 else -1
+            _, new_score = _minimax(position, depth - 1, False, context, child)
+            position.undo(col)
             
             if new_score is not None and new_score > value:
                 value = new_score
                 best_col = col
-        current_node.score = value
-        return best_col, value, current_node
     else:
         value = math.inf
         best_col = None
         for col in valid_moves:
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, PLAYER_PIECE)
-
-            _, new_score, child_node = minimax(array_to_string(temp_board), depth - 1, True, current_node)
-            child_node.move = col
-            current_node.children.append(child_node)            
+            position.play(col, PLAYER_PIECE)
+            child = tree.add(index, col, AI_PIECE) if index >= 0 else -1
+            _, new_score = _minimax(position, depth - 1, True, context, child)
+            position.undo(col)
             
             if new_score is not None and new_score < value:
                 value = new_score
                 best_col = col
-        
-        current_node.score = value
-        return best_col, value, current_node
 
-# Updated Minimax
-def minimax_alpha_beta(board_str, depth, alpha, beta, maximizingPlayer, parent_node=None):
-    board_array = string_to_array(board_str)  # Convert string to array
-    valid_moves = get_valid_moves(board_array)
-    is_terminal = is_terminal_node(board_array)
+    if index >= 0:
+        tree.scores[index] = value
+    return best_col, value
 
-    # Create a new node for the current state
+# Updated Minimax
+def minimax_alpha_beta(board_str, depth, alpha, beta, maximizingPlayer, tt=None, orderer=None,
+                       tree_mode=TREE_OFF, max_nodes=None, batch_leaves=False, stats=None, geometry=None,
+                       cache=None, time_limit=None, node_limit=None, stop_event=None):
+    """Alpha-beta search. Pass a TranspositionTable as ``tt`` to memoize positions
+    and a MoveOrderer as ``orderer`` to reorder moves. A DiskCache passed as
+    ``cache`` (with a ``tt``) is consulted on table misses near the root and
+    receives the results found there. With ``batch_leaves`` the
+    children of nodes one ply above the horizon are scored in a single batched
+    score_position call. ``stats``, ``geometry`` and the budgets are as in
+    minimax. Returns ``(col, score, root)`` like minimax."""
+    start = time.perf_counter()
+    position = Position.from_string(board_str, geometry)  # Convert once at the boundary
+    tree = SearchTree.for_mode(tree_mode, max_nodes)
+    deadline = start + time_limit if time_limit is not None else None
+    context = SearchContext(tt, deadline, node_limit, orderer, tree, batch_leaves, stop_event, stats, cache)
+    index = tree.add(NO_PARENT, None, AI_PIECE if maximizingPlayer else PLAYER_PIECE) if tree is not None else -1
+    best_col, value = _minimax_alpha_beta(position, depth, alpha, beta, maximizingPlayer, context, index)
+    if cache is not None:
+        cache.flush()
+    if stats is not None:
+        stats.nodes += context.nodes
+        stats.seconds += time.perf_counter() - start
+    return best_col, value, tree.root() if tree is not None else None
+
+def _minimax_alpha_beta(position, depth, alpha, beta, maximizingPlayer, context, index=-1, ply=0):
+    context.visit()
+    tt = context.tt
+    orderer = context.orderer
+    tree = context.tree
+    stats = context.stats
+    cache = context.cache
+    valid_moves = position.valid_moves()
+    is_terminal = position.is_full()
     player = AI_PIECE if maximizingPlayer else PLAYER_PIECE
-    current_node = Node(board_str=board_str, parent=parent_node, player=player)
 
     if depth == 0 or is_terminal:
-        score = score_position(board_array, AI_PIECE)
-        current_node.score = score
-        return None, score, current_node
-
-    if maximizingPlayer:
+        score = position.score(AI_PIECE)
+        if stats is not None:
+            stats.leaves += 1
+            stats.evaluations += 1
+            stats.max_ply = max(stats.max_ply, ply)
+        if index >= 0:
+            tree.scores[index] = score
+        return None, score
+
+    # Transposition table probe; the root is always searched so it yields a move.
+    # A position and its mirror image share an entry, its move in the key's orientation.
+    tt_move = None
+    if tt is not None:
+        key, mirrored = position.canonical_key(maximizingPlayer)
+        entry = tt.lookup(key)
+        if cache is not None and depth >= cache.min_depth and (entry is None or entry[0] < depth):
+            cached = cache.lookup(key)  # Below the in-memory table; hits are copied up into it
+            if cached is not None and (entry is None or cached[0] > entry[0]):
+                entry = cached
+                tt.store(key, *cached)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        if entry is not None:
+            tt_move = entry[3]
+            if mirrored and tt_move is not None:
+                tt_move = position.geometry.columns - 1 - tt_move
+        if entry is not None and entry[0] >= depth and ply > 0:
+            _, tt_value, tt_bound, _ = entry
+            if tt_bound == EXACT:
+                if index >= 0:
+                    tree.scores[index] = tt_value
+                return tt_move, tt_value
+            if tt_bound == LOWER:
+                alpha = max(alpha, tt_value)
+            else:
+                beta = min(beta, tt_value)
+            if alpha >= beta:
+                if index >= 0:
+                    tree.scores[index] = tt_value
+                return tt_move, tt_value
+        alpha_orig, beta_orig = alpha, beta
+
+    if ply == 0:
+        valid_moves = position.distinct_moves()  # Mirrored root moves are worth the same
+        if tt_move is not None and tt_move not in valid_moves:
+            tt_move = position.geometry.columns - 1 - tt_move
+    if orderer is not None:
+        valid_moves = orderer.order(position, valid_moves, ply, player, tt_move)
+
+    if depth == 1 and context.batch_leaves:
+        best_col, value = _search_frontier(position, valid_moves, alpha, beta, maximizingPlayer, context, index, ply)
+
+    elif maximizingPlayer:
         value = -math.inf
         best_col = None
         for col in valid_moves:
-            # Simulate dropping the piece
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, AI_PIECE)
-            temp_board_str = array_to_string(temp_board)
-
-            # Recursive call
-            _, new_score, child_node = minimax_alpha_beta(temp_board_str, depth - 1, alpha, beta, False, current_node)
-            child_node.move = col
-            current_node.children.append(child_node)  # Add child to current node
+            # Make the move in place, search, then take it back
+            position.play(col, AI_PIECE)
+            child = tree.add(index, col, PLAYER_PIECE) if index >= 0 else -1
+            _, new_score = _minimax_alpha_beta(position, depth - 1, alpha, beta, False, context, child, ply + 1)
+            position.undo(col)
 
             if new_score > value:
                 value = new_score
                 best_col = col
             alpha = max(alpha, value)
             if alpha >= beta:
+                if orderer is not None:
+                    orderer.record_cutoff(position, col, ply, player, depth)
+                if stats is not None:
+                    stats.record_cutoff(valid_moves.index(col))
                 break  # Beta cutoff
 
-        current_node.score = value
-        return best_col, value, current_node
-
     else:
         value = math.inf
         best_col = None
         for col in valid_moves:
-            # Simulate dropping the piece
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, PLAYER_PIECE)
-            temp_board_str = array_to_string(temp_board)
-
-            # Recursive call
-            _, new_score, child_node = minimax_alpha_beta(temp_board_str, depth - 1, alpha, beta, True, current_node)
-            child_node.move = col
-            current_node.children.append(child_node)  # Add child to current node
+            # Make the move in place, search, then take it back
+            position.play(col, PLAYER_PIECE)
+            child = tree.add(index, col, AI_PIECE) if index >= 0 else -1
+            _, new_score = _minimax_alpha_beta(position, depth - 1, alpha, beta, True, context, child, ply + 1)
+            position.undo(col)
 
             if new_score < value:
                 value = new_score
                 best_col = col
             beta = min(beta, value)
             if alpha >= beta:
+                if orderer is not None:
+                    orderer.record_cutoff(position, col, ply, player, depth)
+                if stats is not None:
+                    stats.record_cutoff(valid_moves.index(col))
                 break  # Alpha cutoff
 
-        current_node.score = value
-        return best_col, value, current_node
-
-def expecti_minimax(board_str, depth, alpha, beta, maximizingPlayer, parent_node=None):
-    board_array = string_to_array(board_str)
-    valid_moves = get_valid_moves(board_array)
-    is_terminal = is_terminal_node(board_array)
-
+    if tt is not None:
+        if value <= alpha_orig:
+            bound = UPPER
+        elif value >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        stored_col = best_col
+        if mirrored and best_col is not None:
+            stored_col = position.geometry.columns - 1 - best_col
+        tt.store(key, depth, value, bound, stored_col)
+        if cache is not None and depth >= cache.min_depth:
+            cache.store(key, depth, value, bound, stored_col)
+
+    if index >= 0:
+        tree.scores[index] = value
+    return best_col, value
+
+def _search_frontier(position, valid_moves, alpha, beta, maximizingPlayer, context, index, ply):
+    """Children of a depth-1 node: score them all at once, then apply min/max
+    and cutoffs over the score vector."""
     player = AI_PIECE if maximizingPlayer else PLAYER_PIECE
-    current_node = Node(board_str=board_str, parent=parent_node, player=player)
-
-    if depth == 0 or is_terminal:
-        score = score_position(board_array, AI_PIECE)
-        current_node.score = score
-        return None, score, current_node
-
-    if maximizingPlayer:
-        value = -math.inf
-        best_col = None
-        for col in valid_moves:
-            # Main move
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, AI_PIECE)
-            temp_board_str = array_to_string(temp_board)
-
-            _, new_score, child_node = expecti_minimax(temp_board_str, depth - 1, alpha, beta, False, current_node)
-            child_node.move = col
-            current_node.children.append(child_node)
-
-            weighted_score = 0.6 * new_score
-
-            # Left neighbor
-            if col > 0 and is_valid_location(board_array, col - 1):
-                row_left = get_next_open_row(board_array, col - 1)
-                temp_board_left = board_array.copy()
-                drop_piece(temp_board_left, row_left, col - 1, AI_PIECE)
-                temp_board_left_str = array_to_string(temp_board_left)
-
-                _, new_score_left, left_child_node = expecti_minimax(
-                    temp_board_left_str, depth - 1, alpha, beta, False, current_node
-                )
-                left_child_node.move = col - 1
-                current_node.children.append(left_child_node)
-
-                weighted_score += 0.2 * new_score_left
-
-            # Right neighbor
-            if col < COLUMN_COUNT - 1 and is_valid_location(board_array, col + 1):
-                row_right = get_next_open_row(board_array, col + 1)
-                temp_board_right = board_array.copy()
-                drop_piece(temp_board_right, row_right, col + 1, AI_PIECE)
-                temp_board_right_str = array_to_string(temp_board_right)
-
-                _, new_score_right, right_child_node = expecti_minimax(
-                    temp_board_right_str, depth - 1, alpha, beta, False, current_node
-                )
-                right_child_node.move = col + 1
-                current_node.children.append(right_child_node)
-
-                weighted_score += 0.2 * new_score_right
-
-            # Compare weighted_score to current value
-            if weighted_score > value:
-                value = weighted_score
+    child_player = PLAYER_PIECE if maximizingPlayer else AI_PIECE
+    scores = score_position(child_boards(position, valid_moves, player), AI_PIECE, position.geometry).tolist()
+    tree = context.tree
+    orderer = context.orderer
+    stats = context.stats
+    if stats is not None:
+        stats.evaluations += len(valid_moves)
+        stats.max_ply = max(stats.max_ply, ply + 1)
+
+    value = -math.inf if maximizingPlayer else math.inf
+    best_col = None
+    for col, new_score in zip(valid_moves, scores):
+        context.visit()
+        if stats is not None:
+            stats.leaves += 1
+        if index >= 0:
+            child = tree.add(index, col, child_player)
+            if child >= 0:
+                tree.scores[child] = new_score
+
+        if maximizingPlayer:
+            if new_score > value:
+                value = new_score
                 best_col = col
-
             alpha = max(alpha, value)
-            if alpha >= beta:
-                break  # Beta cutoff
-
-        current_node.score = value
-        return best_col, value, current_node
+        else:
+            if new_score < value:
+                value = new_score
+                best_col = col
+            beta = min(beta, value)
+        if alpha >= beta:
+            if orderer is not None:
+                orderer.record_cutoff(position, col, ply, player, 1)
+            if stats is not None:
+                stats.record_cutoff(valid_moves.index(col))
+            break
+    return best_col, value
+
+# Expectiminimax chance weights: the AI's drop lands in the chosen column with
+# MAIN_WEIGHT and in each neighbouring column with NEIGHBOUR_WEIGHT
+MAIN_WEIGHT = 0.6
+NEIGHBOUR_WEIGHT = 0.2
+MIN_WEIGHT_SUM = MAIN_WEIGHT  # A column whose neighbours are full or off the board
+WINDOW_SLACK = 1e-9  # Widens derived child windows so float rounding never misclassifies a bound
+
+def eval_bounds(position, ai_layers=0):
+    """Bounds on the value of any node reachable from ``position`` with at
+    most ``ai_layers`` AI nodes between it and the leaves.
+
+    Only windows still free of player pieces can ever score above zero (at
+    most a four's score), and only windows free of AI pieces below it (at
+    least the blocked-three penalty); completed fours keep their score. An
+    AI node's weights sum to as little as MIN_WEIGHT_SUM, so each AI layer
+    can shrink a positive lower bound by that factor; the upper bound is
+    never negative and so never grows.
+    """
+    geometry = position.geometry
+    count_lines = geometry.count_lines
+    ai = position.masks[AI_PIECE]
+    player = position.masks[PLAYER_PIECE]
+    empty = geometry.board_mask & ~(ai | player)
+    four = geometry.window_scores[geometry.connect][0]
+    lowest = min(min(row) for row in geometry.window_scores)
+    lower = four * count_lines(ai) + lowest * count_lines(player | empty)
+    if lower > 0:
+        lower *= MIN_WEIGHT_SUM ** ai_layers
+    return lower, four * count_lines(ai | empty)
+
+def expecti_minimax(board_str, depth, alpha, beta, maximizingPlayer, tree_mode=TREE_OFF, max_nodes=None,
+                    stats=None, geometry=None, time_limit=None, node_limit=None, stop_event=None):
+    """Expectiminimax where the AI's drop lands in the chosen column with
+    probability 0.6 and in each neighbour with 0.2, and the player replies
+    uniformly at random. Returns ``(col, score, root)`` like minimax; ``stats``,
+    ``geometry`` and the budgets are as in minimax.
+
+    Values outside (alpha, beta) are returned as that bound, so the full
+    window gives the exact score."""
+    start = time.perf_counter()
+    position = Position.from_string(board_str, geometry)  # Convert once at the boundary
+    context = _budget_context(start, tree_mode, max_nodes, stats, time_limit, node_limit, stop_event)
+    tree = context.tree
+    index = tree.add(NO_PARENT, None, AI_PIECE if maximizingPlayer else PLAYER_PIECE) if tree is not None else -1
+    best_col, value = _expecti_minimax(position, depth, alpha, beta, maximizingPlayer, context, index)
+    if stats is not None:
+        _finish_stats(stats, context, position, depth, start)
+    return best_col, value, tree.root() if tree is not None else None
+
+def _expecti_minimax(position, depth, alpha, beta, maximizingPlayer, context, index):
+    context.visit()
+    tree, stats = context.tree, context.stats
+
+    if depth == 0 or position.is_full():
+        score = position.score(AI_PIECE)
+        if stats is not None:
+            stats.leaves += 1
+            stats.evaluations += 1
+        if index >= 0:
+            tree.scores[index] = score
+        return None, score
 
+    if maximizingPlayer:
+        best_col, value = _expecti_max(position, depth, alpha, beta, context, index)
     else:
-        value = 0
-        for col in valid_moves:
-            row = get_next_open_row(board_array, col)
-            temp_board = board_array.copy()
-            drop_piece(temp_board, row, col, PLAYER_PIECE)
-            temp_board_str = array_to_string(temp_board)
-
-            _, new_score, child_node = expecti_minimax(
-                temp_board_str, depth - 1, alpha, beta, True, current_node
-            )
-            child_node.move = col
-            current_node.children.append(child_node)
-
-            value += new_score / len(valid_moves)
+        best_col, value = None, _expecti_chance(position, depth, alpha, beta, context, index)
+    if index >= 0:
+        tree.scores[index] = value
+    return best_col, value
+
+def _expecti_max(position, depth, alpha, beta, context, index):
+    """AI node: the best column by the 0.6/0.2/0.2 weighted value of the drops.
+
+    Every distinct drop is searched once and its value shared by the up to
+    three columns that weight it. Each search gets the window in which its
+    value decides whether the column being scored beats the best so far, so a
+    drop may come back as a bound only; it is searched again only if a later
+    column needs it more precisely.
+    """
+    stats = context.stats
+    valid_moves = position.valid_moves()
+    lower, upper = eval_bounds(position, (depth - 1) // 2)  # Bounds on the drops' chance nodes
+    known = {col: (lower, upper) for col in valid_moves}  # Interval holding each drop's value
+    child_index = {}
+    value = -math.inf
+    best_col = None
+
+    for col in valid_moves:
+        parts = [(MAIN_WEIGHT, col)]
+        if col - 1 in known:
+            parts.append((NEIGHBOUR_WEIGHT, col - 1))
+        if col + 1 in known:
+            parts.append((NEIGHBOUR_WEIGHT, col + 1))
+        floor = max(alpha, value)
+
+        for weight, drop in parts:
+            lo, hi = known[drop]
+            if lo == hi:
+                continue
+            others_lo = sum(w * known[d][0] for w, d in parts if d != drop)
+            others_hi = sum(w * known[d][1] for w, d in parts if d != drop)
+            child_alpha = (floor - others_hi) / weight - WINDOW_SLACK
+            child_beta = (beta - others_lo) / weight + WINDOW_SLACK
+            score = _expecti_drop(position, drop, depth, child_alpha, child_beta, context, index, child_index)
+            if score <= child_alpha:
+                known[drop] = (lo, min(hi, score))
+            elif score >= child_beta:
+                known[drop] = (max(lo, score), hi)
+            else:
+                known[drop] = (score, score)
+            if sum(w * known[d][1] for w, d in parts) <= floor:
+                break  # This column cannot beat the best one
+            if sum(w * known[d][0] for w, d in parts) >= beta:
+                break
+
+        weighted_lo = sum(w * known[d][0] for w, d in parts)
+        if weighted_lo >= beta:
+            if stats is not None:
+                stats.record_cutoff(valid_moves.index(col))
+            return col, beta  # Beta cutoff
+        if sum(w * known[d][1] for w, d in parts) <= floor:
+            continue
+        for weight, drop in parts:
+            if known[drop][0] != known[drop][1]:  # Left undecided by rounding; settle it
+                score = _expecti_drop(position, drop, depth, -math.inf, math.inf, context, index, child_index)
+                known[drop] = (score, score)
+        weighted_score = sum(w * known[d][0] for w, d in parts)
+        if weighted_score > value:
+            value = weighted_score
+            best_col = col
+
+    if value <= alpha:
+        return best_col, alpha  # Fail low: no column reaches alpha
+    return best_col, value
+
+def _expecti_drop(position, col, depth, alpha, beta, context, index, child_index):
+    """Search the AI drop in ``col`` below the node ``index``; only the first
+    search of a drop is recorded in the tree, later ones update its score."""
+    tree = context.tree
+    position.play(col, AI_PIECE)
+    if col in child_index:
+        child = -1
+    else:
+        child = child_index[col] = tree.add(index, col, PLAYER_PIECE) if index >= 0 else -1
+    _, score = _expecti_minimax(position, depth - 1, alpha, beta, False, context, child)
+    position.undo(col)
+    if child < 0 and child_index.get(col, -1) >= 0:
+        tree.scores[child_index[col]] = score
+    return score
 
-        current_node.score = value
-        return None, value, current_node
\ No newline at end of file
+def _expecti_chance(position, depth, alpha, beta, context, index):
+    """Player node: the average over the player's replies.
+
+    Star1 pruning: once the replies searched so far and the score bounds of
+    the rest put the average outside (alpha, beta), the remaining replies
+    cannot matter. Each reply is searched with the window outside of which
+    that happens.
+    """
+    tree, stats = context.tree, context.stats
+    valid_moves = position.valid_moves()
+    n = len(valid_moves)
+    lower, upper = eval_bounds(position, depth // 2)  # Bounds on the replies' AI nodes
+    value = 0
+    for i, col in enumerate(valid_moves):
+        remaining = n - i - 1
+        child_alpha = n * (alpha - value) - upper * remaining - WINDOW_SLACK
+        child_beta = n * (beta - value) - lower * remaining + WINDOW_SLACK
+        position.play(col, PLAYER_PIECE)
+        child = tree.add(index, col, AI_PIECE) if index >= 0 else -1
+        _, new_score = _expecti_minimax(position, depth - 1, child_alpha, child_beta, True, context, child)
+        position.undo(col)
+
+        if new_score <= child_alpha or new_score >= child_beta:
+            if stats is not None:
+                stats.record_cutoff(i)
+            return alpha if new_score <= child_alpha else beta
+        value += new_score / n
+    return value
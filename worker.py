@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class SearchJob:
+    """Runs one AI search on a background thread.
+
+    ``search(stop_event, report)`` is called on the worker thread and its
+    return value becomes ``result``. It should end early once ``stop_event`` is
+    set, and may call ``report(depth, col, score, nodes)`` after each completed
+    iteration; the latest report is exposed as ``progress``.
+    """
+
+    def __init__(self, search):
+        self.stop_event = threading.Event()
+        self.progress = None  # (depth, col, score, nodes_per_second) of the last completed iteration
+        self.result = None
+        self.error = None
+        self._search = search
+        self._started = None
+        self._timer = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._search(self.stop_event, self._report)
+        except Exception as error:  # Surfaced to the caller through result()
+            self.error = error
+
+    def _report(self, depth, col, score, nodes):
+        elapsed = time.perf_counter() - self._started
+        self.progress = (depth, col, score, nodes / elapsed if elapsed > 0 else 0.0)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def get_result(self):
+        """Return the search result of a finished job, re-raising its error."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def stop_after(self, seconds):
+        """Let the search run for at most ``seconds`` more."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(seconds, self.stop_event.set)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self, wait=True):
+        """Stop the search; with ``wait`` block until the thread has exited."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.stop_event.set()
+        if wait:
+            self._thread.join()